@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Fake Vectara API server for local testing
+Serves the /v1/index, /v1/delete-doc, /v1/query, /v2/chats and /v2/chats/{id}/turns shapes VectaraClient uses, with
+configurable latency distributions, error and hang rates, rate limiting and slow-drip streaming, so the
+real HTTP path (pooling, timeouts, retries, fallbacks) runs on a laptop.
+
+Usage (from the backend directory):
+    python benchmarks/fake_vectara.py --port 8010 --latency lognormal:250,0.6 --latency chat=lognormal:900,0.8 \\
+        --error-rate 0.02 --error-rate chat=0.1 --hang-rate 0.005 --rate-limit 50 --drip-ms exponential:40
+    VECTARA_BASE_URL=http://localhost:8010 VECTARA_CUSTOMER_ID=1 VECTARA_CORPUS_ID=1 VECTARA_API_KEY=fake \\
+        uvicorn main:app
+
+Faults can be changed while it runs: curl -X PATCH localhost:8010/_fake/config -d '{"error_rate": {"chat": 0.5}}'
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ENDPOINTS = ("index", "delete", "query", "chat", "turn")
+
+
+class Latency:
+    """
+    Delay distribution in milliseconds, parsed from "fixed:MS", "uniform:MIN,MAX",
+    "exponential:MEAN" or "lognormal:MEDIAN,SIGMA" ("0" for none)
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(value) for value in params.split(",") if value.strip()]
+        expected = {"0": 0, "none": 0, "fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec '{spec}'")
+
+    def sample(self, rng: random.Random) -> float:
+        """One delay in seconds"""
+        if self.kind in ("0", "none"):
+            return 0.0
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.params)
+        elif self.kind == "exponential":
+            ms = rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        else:
+            median, sigma = self.params
+            ms = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return max(0.0, ms) / 1000
+
+
+class FaultConfig:
+    """Behaviour of the fake server; every field can be changed at runtime through /_fake/config"""
+
+    FIELDS = (
+        "latency", "error_rate", "error_statuses", "hang_rate", "hang_seconds", "rate_limit",
+        "drip", "stream_words", "stream_abort_rate", "require_api_key"
+    )
+
+    def __init__(
+        self,
+        latency: Optional[Dict[str, str]] = None,
+        error_rate: Optional[Dict[str, float]] = None,
+        error_statuses: Optional[List[int]] = None,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 120.0,
+        rate_limit: float = 0.0,
+        drip: str = "fixed:20",
+        stream_words: int = 40,
+        stream_abort_rate: float = 0.0,
+        require_api_key: bool = True
+    ):
+        # Endpoint name (or "default") -> latency spec / share of requests failed
+        self.latency = {"default": "0", **(latency or {})}
+        self.error_rate = {"default": 0.0, **(error_rate or {})}
+        self.error_statuses = error_statuses or [500, 502, 503]
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        # Requests per second across all endpoints (token bucket, burst of one second); 0 disables
+        self.rate_limit = rate_limit
+        self.drip = drip
+        self.stream_words = stream_words
+        self.stream_abort_rate = stream_abort_rate
+        self.require_api_key = require_api_key
+        self._compile()
+
+    def _compile(self) -> None:
+        self._latency = {name: Latency(spec) for name, spec in self.latency.items()}
+        self._drip = Latency(self.drip)
+
+    def update(self, changes: Dict[str, Any]) -> None:
+        unknown = set(changes) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown config fields: {', '.join(sorted(unknown))}")
+        changes = dict(changes)
+        if isinstance(changes.get("error_rate"), (int, float)):
+            changes["error_rate"] = {"default": changes["error_rate"]}
+        # Per-endpoint settings are merged, so {"error_rate": {"chat": 1}} leaves the other endpoints alone
+        for name in ("latency", "error_rate"):
+            if name in changes:
+                changes[name] = {**getattr(self, name), **changes[name]}
+        previous = self.to_dict()
+        for name, value in changes.items():
+            setattr(self, name, value)
+        try:
+            self._compile()
+        except ValueError:
+            for name, value in previous.items():
+                setattr(self, name, value)
+            self._compile()
+            raise
+
+    def latency_for(self, endpoint: str) -> Latency:
+        return self._latency.get(endpoint, self._latency["default"])
+
+    def error_rate_for(self, endpoint: str) -> float:
+        return float(self.error_rate.get(endpoint, self.error_rate["default"]))
+
+    def drip_latency(self) -> Latency:
+        return self._drip
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class TokenBucket:
+    def __init__(self):
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+    def take(self, rate: float) -> bool:
+        now = time.monotonic()
+        self.tokens = min(rate, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def create_app(config: Optional[FaultConfig] = None, seed: Optional[int] = None) -> FastAPI:
+    config = config or FaultConfig()
+    rng = random.Random(seed)
+    bucket = TokenBucket()
+    bucket.tokens = config.rate_limit
+    stats: Counter = Counter()
+    app = FastAPI(title="Fake Vectara", docs_url=None, redoc_url=None)
+
+    async def inject_faults(request: Request, endpoint: str) -> Optional[JSONResponse]:
+        """Error response to send instead of a real one, or None; requests that get past auth and rate limiting wait out the endpoint latency"""
+        stats[f"{endpoint}.requests"] += 1
+        if config.require_api_key and not request.headers.get("x-api-key"):
+            stats[f"{endpoint}.401"] += 1
+            return JSONResponse({"messages": ["Missing x-api-key"]}, status_code=401)
+        if config.rate_limit and not bucket.take(config.rate_limit):
+            stats[f"{endpoint}.429"] += 1
+            return JSONResponse({"messages": ["Rate limit exceeded"]}, status_code=429, headers={"Retry-After": "1"})
+
+        await asyncio.sleep(config.latency_for(endpoint).sample(rng))
+        if config.hang_rate and rng.random() < config.hang_rate:
+            stats[f"{endpoint}.hang"] += 1
+            await asyncio.sleep(config.hang_seconds)
+        error_rate = config.error_rate_for(endpoint)
+        if error_rate and rng.random() < error_rate:
+            error_status = rng.choice(config.error_statuses)
+            stats[f"{endpoint}.{error_status}"] += 1
+            return JSONResponse({"messages": [f"Injected failure ({error_status})"]}, status_code=error_status)
+        return None
+
+    def search_results(query: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                "text": f"Excerpt {rank} relevant to '{query[:60]}' from a banking circular.",
+                "score": round(0.9 - rank * 0.1, 2),
+                "part_metadata": {"chunk": rank},
+                "document_metadata": {"filename": f"circular_{rank}.pdf", "category": "general"},
+                "document_id": f"fake_doc_{rank}"
+            }
+            for rank in range(3)
+        ]
+
+    def answer_for(query: str) -> str:
+        return (
+            f"Based on the available circulars, here is a synthetic answer to '{query[:80]}'. "
+            "Licensed banks must follow the applicable reserve, liquidity and reporting requirements."
+        )
+
+    def chat_body(chat_id: str, query: str) -> Dict[str, Any]:
+        # Both the v2 fields and the id/turns shape chat_with_ai reads
+        turn_id = f"trn_{uuid.uuid4().hex[:12]}"
+        answer = answer_for(query)
+        results = search_results(query)
+        return {
+            "id": chat_id,
+            "chat_id": chat_id,
+            "turn_id": turn_id,
+            "answer": answer,
+            "search_results": results,
+            "turns": [{"id": turn_id, "query": query, "answer": answer, "enabled": True, "search_results": results}],
+            "enabled": True
+        }
+
+    def chat_stream(chat_id: str, query: str, endpoint: str) -> StreamingResponse:
+        abort = config.stream_abort_rate and rng.random() < config.stream_abort_rate
+        words = (answer_for(query) + " ") * max(1, config.stream_words // 20 + 1)
+        words = words.split()[:max(1, config.stream_words)]
+
+        async def events():
+            yield _sse({"type": "search_results", "search_results": search_results(query)})
+            yield _sse({"type": "chat_info", "chat_id": chat_id, "turn_id": f"trn_{uuid.uuid4().hex[:12]}"})
+            for index, word in enumerate(words):
+                if abort and index == len(words) // 2:
+                    stats[f"{endpoint}.aborted"] += 1
+                    raise ConnectionAbortedError("Injected stream abort")
+                await asyncio.sleep(config.drip_latency().sample(rng))
+                yield _sse({"type": "generation_chunk", "generation_chunk": word if index == 0 else f" {word}"})
+            yield _sse({"type": "end"})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/index")
+    async def index(request: Request):
+        failure = await inject_faults(request, "index")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        stats["index.sections"] += len(body.get("document", {}).get("section", []))
+        return {"status": {"code": "OK", "statusDetail": "Fake index"}, "quotaConsumed": {"numChars": 0}}
+
+    @app.post("/v1/delete-doc")
+    async def delete_doc(request: Request):
+        failure = await inject_faults(request, "delete")
+        if failure is not None:
+            return failure
+        await request.json()
+        return {"status": {"code": "OK", "statusDetail": "Fake delete"}}
+
+    @app.post("/v1/query")
+    async def query(request: Request):
+        failure = await inject_faults(request, "query")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        query_text = (body.get("query") or [{}])[0].get("query", "")
+        return {
+            "responseSet": [{
+                "summary": [{"text": answer_for(query_text), "lang": "en", "status": []}],
+                "response": [
+                    {
+                        "text": result["text"],
+                        "score": result["score"],
+                        "metadata": [{"name": "filename", "value": result["document_metadata"]["filename"]}]
+                    }
+                    for result in search_results(query_text)
+                ],
+                "status": [{"code": "OK"}]
+            }]
+        }
+
+    @app.post("/v2/chats")
+    async def create_chat(request: Request):
+        failure = await inject_faults(request, "chat")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        chat_id = f"cht_{uuid.uuid4().hex[:12]}"
+        if body.get("stream_response"):
+            return chat_stream(chat_id, body.get("query", ""), "chat")
+        return chat_body(chat_id, body.get("query", ""))
+
+    @app.post("/v2/chats/{chat_id}/turns")
+    async def add_turn(chat_id: str, request: Request):
+        failure = await inject_faults(request, "turn")
+        if failure is not None:
+            return failure
+        body = await request.json()
+        if body.get("stream_response"):
+            return chat_stream(chat_id, body.get("query", ""), "turn")
+        return chat_body(chat_id, body.get("query", ""))
+
+    @app.get("/_fake/config")
+    async def get_config():
+        return config.to_dict()
+
+    @app.patch("/_fake/config")
+    async def patch_config(request: Request):
+        try:
+            config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse({"detail": str(e)}, status_code=400)
+        return config.to_dict()
+
+    @app.get("/_fake/stats")
+    async def get_stats():
+        return dict(sorted(stats.items()))
+
+    @app.post("/_fake/reset")
+    async def reset_stats():
+        stats.clear()
+        return {"status": "ok"}
+
+    return app
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+def parse_per_endpoint(values: List[str], convert) -> Dict[str, Any]:
+    """Repeatable VALUE (default) or ENDPOINT=VALUE options, e.g. --latency fixed:50 --latency chat=lognormal:800,0.6"""
+    settings = {}
+    for value in values:
+        name, separator, setting = value.partition("=")
+        if not separator:
+            name, setting = "default", value
+        if name != "default" and name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        settings[name] = convert(setting)
+    return settings
+
+
+def _latency_spec(spec: str) -> str:
+    Latency(spec)
+    return spec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Vectara API with latency and failure injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--latency", action="append", default=[],
+                        help="Latency spec, optionally per endpoint (index, query, chat, turn): chat=lognormal:800,0.6")
+    parser.add_argument("--error-rate", action="append", default=[],
+                        help="Share of requests answered with an error status, optionally per endpoint: chat=0.5")
+    parser.add_argument("--error-status", default="500,502,503", help="Statuses used for injected errors")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests that stall for --hang-seconds")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before answering 429")
+    parser.add_argument("--drip-ms", default="fixed:20", help="Latency spec between streamed chunks")
+    parser.add_argument("--stream-words", type=int, default=40, help="Chunks per streamed answer")
+    parser.add_argument("--stream-abort-rate", type=float, default=0.0, help="Share of streams cut off halfway")
+    parser.add_argument("--no-auth", action="store_true", help="Accept requests without an x-api-key header")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible fault sequences")
+    args = parser.parse_args()
+
+    config = FaultConfig(
+        latency=parse_per_endpoint(args.latency, _latency_spec),
+        error_rate=parse_per_endpoint(args.error_rate, float),
+        error_statuses=[int(value) for value in args.error_status.split(",") if value.strip()],
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        rate_limit=args.rate_limit,
+        drip=args.drip_ms,
+        stream_words=args.stream_words,
+        stream_abort_rate=args.stream_abort_rate,
+        require_api_key=not args.no_auth
+    )
+
+    import uvicorn
+    uvicorn.run(create_app(config, seed=args.seed), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for intent routing
+Compares the compiled intent router with the keyword scans chat_with_ai used to run inline.
+
+Usage (from the backend directory):
+    python benchmarks/intent_router_bench.py
+    python benchmarks/intent_router_bench.py --history-turns 200 --long-words 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import DEFAULT_RULES, IntentRouter
+
+# Keyword lists and scans as they were inlined in chat_with_ai
+LEGACY_CONVERSATIONAL = [
+    "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
+    "how are you", "what's up", "greetings", "salaam", "marhaba", "ahlan",
+    "كيف حالك", "مرحبا", "أهلا", "السلام عليكم", "صباح الخير", "مساء الخير"
+]
+LEGACY_HISTORY = ["remember", "what did i", "previous", "earlier", "before", "what was the question", "what was my question", "last question"]
+LEGACY_BANKING = ["loan", "bank", "regulation", "policy", "interest", "credit", "finance", "money", "currency", "payment"]
+
+VOCABULARY = (
+    "the central bank of oman issued new guidance on capital adequacy and liquidity coverage for "
+    "licensed institutions including islamic windows reporting deadlines disclosure templates and "
+    "البنك المركزي العماني أصدر تعليمات جديدة بشأن كفاية رأس المال والسيولة للمؤسسات المرخصة"
+).split()
+
+
+def legacy_route(message, history):
+    lowered = message.lower()
+    greeting = any(pattern in lowered for pattern in LEGACY_CONVERSATIONAL) and len(message.split()) <= 5
+    recall = any(word in lowered for word in LEGACY_HISTORY)
+    topics = [keyword for keyword in LEGACY_BANKING if keyword in lowered]
+    recent_topics = []
+    for turn in history[-6:]:
+        if turn.get("role") == "user":
+            content = turn.get("content", "").lower()
+            for keyword in LEGACY_BANKING:
+                if keyword in content and keyword not in recent_topics:
+                    recent_topics.append(keyword)
+    follow_up = any(topic in lowered for topic in recent_topics)
+    return greeting, recall, topics, follow_up
+
+
+def router_route(router, message, history):
+    routing = router.route(message)
+    recent_topics = router.keywords_in(
+        (turn.get("content", "") for turn in history[-6:] if turn.get("role") == "user"),
+        "banking_topic"
+    )
+    topics = routing.keywords.get("banking_topic", [])
+    follow_up = any(topic in topics for topic in recent_topics)
+    return routing.intent == "greeting", routing.matched("history_recall"), topics, follow_up
+
+
+def make_message(words):
+    return " ".join(random.choice(VOCABULARY) for _ in range(words)) + " what is the loan policy?"
+
+
+def make_history(turns, words):
+    return [
+        {"role": "user" if turn % 2 == 0 else "assistant", "content": make_message(words)}
+        for turn in range(turns)
+    ]
+
+
+def per_call_us(fn, repeat):
+    fn()  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent routing against the legacy keyword scans")
+    parser.add_argument("--long-words", type=int, default=2000, help="Words in the long-message case")
+    parser.add_argument("--history-turns", type=int, default=50)
+    parser.add_argument("--history-words", type=int, default=80, help="Words per history turn")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    random.seed(7)
+
+    started = time.perf_counter()
+    router = IntentRouter(DEFAULT_RULES)
+    print(f"Compiled {router.keyword_count} keywords in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+    history = make_history(args.history_turns, args.history_words)
+    cases = {
+        "greeting": ("hello there", []),
+        "short question": ("What is the current policy on personal loans?", []),
+        f"long message ({args.long_words} words)": (make_message(args.long_words), []),
+        f"short + history ({args.history_turns} turns)": ("Tell me more about that loan", history),
+        f"long + history": (make_message(args.long_words), history),
+    }
+
+    print(f"\n{'case':<32}{'legacy us':>12}{'router us':>12}")
+    for name, (message, turns) in cases.items():
+        repeat = max(args.repeat // max(len(message) // 500, 1), 20)
+        legacy = per_call_us(lambda: legacy_route(message, turns), repeat)
+        routed = per_call_us(lambda: router_route(router, message, turns), repeat)
+        print(f"{name:<32}{legacy:>12.1f}{routed:>12.1f}")
+
+    # Adding keywords grows the legacy cost linearly; the automaton still reads the text once
+    many_rules = [dict(rule) for rule in DEFAULT_RULES]
+    extra = [f"term{n}" for n in range(500)]
+    many_rules[-1] = dict(many_rules[-1], keywords=many_rules[-1]["keywords"] + extra)
+    big_router = IntentRouter(many_rules)
+    legacy_keywords = LEGACY_BANKING + extra
+    message = make_message(args.long_words)
+    lowered = message.lower()
+    legacy = per_call_us(lambda: [keyword for keyword in legacy_keywords if keyword in lowered], 50)
+    routed = per_call_us(lambda: big_router.route(message), 50)
+    print(f"{'long message, +500 keywords':<32}{legacy:>12.1f}{routed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
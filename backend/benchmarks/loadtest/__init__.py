@@ -0,0 +1,10 @@
+"""
+Load-test harness for the CBO Banking App PoC backend
+Seeds synthetic chat history and drives /auth/login, /chat, /chat-sessions and /documents/upload
+with concurrent virtual users, in-process (ASGI) or over HTTP, reporting JSON latency percentiles.
+
+Usage (from the backend directory):
+    python -m benchmarks.loadtest seed --database-url sqlite:///./loadtest.db --users 10000 --messages 5000000
+    python -m benchmarks.loadtest run --database-url sqlite:///./loadtest.db --duration 60 --output report.json
+    python -m benchmarks.loadtest run --target http://localhost:8000 --virtual-users 50 --baseline report.json
+"""
@@ -0,0 +1,183 @@
+"""
+Command line for the load-test harness (see benchmarks/loadtest/__init__.py for usage)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import httpx
+
+DEFAULT_DATABASE_URL = "sqlite:///./loadtest.db"
+
+
+def _write_report(report, output):
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def seed_command(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    from .seed import seed
+
+    summary = seed(args.database_url, args.users, args.sessions_per_user, args.messages, replace=args.replace)
+    _write_report({"seed": summary, "database_url": _safe_url(args.database_url)}, args.output)
+
+
+def _safe_url(url):
+    from sqlalchemy.engine import make_url
+    return make_url(url).render_as_string(hide_password=True)
+
+
+@asynccontextmanager
+async def in_process_client(args):
+    """httpx client bound to the ASGI app, with its lifespan running and Vectara mocked or faked"""
+    import main
+
+    if args.vectara_latency_ms:
+        _stub_vectara_latency(main.vectara_client, args.vectara_latency_ms / 1000)
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            yield client
+
+
+def _stub_vectara_latency(client, seconds):
+    """Delay the mock-mode Vectara calls to approximate upstream latency"""
+    for name in ("create_chat", "add_chat_turn", "generate_summary_legacy", "ingest_document"):
+        original = getattr(client, name)
+
+        async def delayed(*args, _original=original, **kwargs):
+            await asyncio.sleep(seconds)
+            return await _original(*args, **kwargs)
+        setattr(client, name, delayed)
+
+
+async def _run(args, mix):
+    from .runner import LoadRunner, compare
+
+    secret_key = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
+    if args.target:
+        limits = httpx.Limits(max_connections=args.virtual_users, max_keepalive_connections=args.virtual_users)
+        client_context = httpx.AsyncClient(base_url=args.target.rstrip("/"), timeout=60, limits=limits)
+    else:
+        client_context = in_process_client(args)
+
+    async with client_context as client:
+        runner = LoadRunner(
+            client,
+            mix,
+            virtual_users=args.virtual_users,
+            user_pool=args.user_pool,
+            secret_key=secret_key,
+            duration=args.duration,
+            requests=args.requests,
+            warmup=args.warmup,
+            think_time=args.think_time,
+            seed=args.seed
+        )
+        report = await runner.run()
+
+    report = {
+        "target": args.target or "in-process",
+        "vectara": _vectara_label(args),
+        "config": {
+            "duration": args.duration,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "think_time": args.think_time,
+            "user_pool": args.user_pool,
+            "seed": args.seed
+        },
+        **report
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline"] = args.baseline
+        report["regressions"] = compare(report, baseline, args.tolerance)
+    return report
+
+
+def _configure_in_process(args):
+    """Environment for the in-process app; must be set before the backend modules are imported"""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.vectara_url:
+        # Real HTTP client against a fake server (benchmarks/fake_vectara.py)
+        os.environ.update(
+            VECTARA_BASE_URL=args.vectara_url, VECTARA_CUSTOMER_ID="1", VECTARA_CORPUS_ID="1", VECTARA_API_KEY="loadtest"
+        )
+        return
+    # Empty credentials put VectaraClient in mock mode (load_dotenv does not override them)
+    for name in ("VECTARA_CUSTOMER_ID", "VECTARA_CORPUS_ID", "VECTARA_API_KEY"):
+        os.environ[name] = ""
+
+
+def _vectara_label(args):
+    if args.target:
+        return "external"
+    if args.vectara_url:
+        return args.vectara_url
+    return f"mock (+{args.vectara_latency_ms:g} ms)"
+
+
+def run_command(args):
+    if not args.target:
+        _configure_in_process(args)
+    from .scenarios import DEFAULT_MIX, parse_mix
+
+    mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    if not args.duration and not args.requests:
+        args.duration = 30
+    report = asyncio.run(_run(args, mix))
+    _write_report(report, args.output)
+    if report.get("regressions"):
+        print(f"{len(report['regressions'])} regression(s) against {args.baseline}", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="Load-test the CBO backend")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Fill a database with synthetic users, sessions and messages")
+    seed_parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="Sync SQLAlchemy URL (never a real database)")
+    seed_parser.add_argument("--users", type=int, default=10_000)
+    seed_parser.add_argument("--sessions-per-user", type=int, default=5)
+    seed_parser.add_argument("--messages", type=int, default=5_000_000)
+    seed_parser.add_argument("--replace", action="store_true", help="Delete the rows of a previous seed run first")
+    seed_parser.add_argument("--output", help="Also write the JSON summary to this file")
+    seed_parser.set_defaults(handler=seed_command)
+
+    run_parser = commands.add_parser("run", help="Drive the API with concurrent virtual users and report latency")
+    run_parser.add_argument("--target", help="Base URL of a running backend (default: the app in-process)")
+    run_parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="Database for the in-process app")
+    run_parser.add_argument("--virtual-users", type=int, default=20, help="Concurrent users")
+    run_parser.add_argument("--user-pool", type=int, default=1000, help="Seeded accounts the virtual users cycle through")
+    run_parser.add_argument("--duration", type=float, help="Seconds to record (default 30 unless --requests is set)")
+    run_parser.add_argument("--requests", type=int, help="Stop after this many recorded requests")
+    run_parser.add_argument("--warmup", type=float, default=2, help="Seconds of unrecorded traffic first")
+    run_parser.add_argument("--think-time", type=float, default=0, help="Mean pause between a user's requests (s)")
+    run_parser.add_argument("--mix", help="Scenario weights, e.g. chat=40,sessions=25,messages=20,upload=10,login=5")
+    run_parser.add_argument("--vectara-latency-ms", type=float, default=0, help="Added delay for mock Vectara calls (in-process)")
+    run_parser.add_argument("--vectara-url", help="Fake Vectara server for the in-process app instead of mock mode")
+    run_parser.add_argument("--seed", type=int, default=42, help="Random seed for scenario choice")
+    run_parser.add_argument("--baseline", help="Earlier report to compare against; exits 1 on regressions")
+    run_parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    run_parser.add_argument("--output", help="Also write the JSON report to this file")
+    run_parser.set_defaults(handler=run_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Closed-loop load runner
+Virtual users issue scenario requests back to back for a fixed duration or request count; latencies are
+aggregated per scenario into throughput and p50/p95/p99 figures
+"""
+
+import asyncio
+import math
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .scenarios import SCENARIOS, VirtualUser
+
+
+def percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class ScenarioStats:
+    """Latencies (ms) and outcomes of one scenario"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def add(self, latency_ms: float, status: str, ok: bool) -> None:
+        self.latencies.append(latency_ms)
+        self.statuses[status] += 1
+        if not ok:
+            self.errors += 1
+
+    def merge(self, other: "ScenarioStats") -> None:
+        self.latencies.extend(other.latencies)
+        self.statuses.update(other.statuses)
+        self.errors += other.errors
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        values = sorted(self.latencies)
+        return {
+            "requests": len(values),
+            "errors": self.errors,
+            "error_rate": round(self.errors / len(values), 4) if values else 0.0,
+            "throughput_rps": round(len(values) / elapsed, 2) if elapsed else None,
+            "latency_ms": {
+                "mean": round(sum(values) / len(values), 2) if values else None,
+                "p50": _round(percentile(values, 50)),
+                "p95": _round(percentile(values, 95)),
+                "p99": _round(percentile(values, 99)),
+                "max": _round(values[-1] if values else None)
+            },
+            "status_codes": dict(sorted(self.statuses.items()))
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+class LoadRunner:
+    """Runs `virtual_users` concurrent users against a client until the duration or request budget is spent"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        mix: Dict[str, int],
+        virtual_users: int,
+        user_pool: int,
+        secret_key: str,
+        duration: Optional[float] = None,
+        requests: Optional[int] = None,
+        warmup: float = 0,
+        think_time: float = 0,
+        seed: int = 42
+    ):
+        if not duration and not requests:
+            raise ValueError("Set a duration or a request count")
+        self.client = client
+        self.mix = {name: weight for name, weight in mix.items() if weight > 0}
+        self.virtual_users = virtual_users
+        self.user_pool = max(1, user_pool)
+        self.secret_key = secret_key
+        self.duration = duration
+        self.requests = requests
+        self.warmup = warmup
+        self.think_time = think_time
+        self.seed = seed
+        self.stats: Dict[str, ScenarioStats] = {name: ScenarioStats() for name in self.mix}
+        self._issued = 0
+
+    async def run(self) -> Dict[str, Any]:
+        started_at = datetime.utcnow()
+        recording_from = time.perf_counter() + self.warmup
+        deadline = recording_from + self.duration if self.duration else None
+
+        users = [
+            VirtualUser(number % self.user_pool + 1, self.secret_key, self.seed + number)
+            for number in range(self.virtual_users)
+        ]
+        await asyncio.gather(*(self._user_loop(user, recording_from, deadline) for user in users))
+        elapsed = time.perf_counter() - recording_from
+
+        total = ScenarioStats()
+        for stats in self.stats.values():
+            total.merge(stats)
+        report = {
+            "started_at": started_at.isoformat(),
+            "elapsed_seconds": round(elapsed, 3),
+            "virtual_users": self.virtual_users,
+            "mix": self.mix,
+            "total": total.summary(elapsed),
+            "scenarios": {name: stats.summary(elapsed) for name, stats in self.stats.items()}
+        }
+        return report
+
+    def _budget_left(self, deadline: Optional[float]) -> bool:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if self.requests is not None and self._issued >= self.requests:
+            return False
+        return True
+
+    async def _user_loop(self, user: VirtualUser, recording_from: float, deadline: Optional[float]) -> None:
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        while self._budget_left(deadline):
+            name = user.random.choices(names, weights)[0]
+            recording = time.perf_counter() >= recording_from
+            if recording:
+                self._issued += 1
+            started = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](self.client, user)
+                status, ok = str(response.status_code), response.status_code < 400
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            latency_ms = (time.perf_counter() - started) * 1000
+            if recording:
+                self.stats[name].add(latency_ms, status, ok)
+            if self.think_time:
+                await asyncio.sleep(user.random.expovariate(1 / self.think_time))
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Scenarios whose p95/p99 latency grew, or whose throughput or error rate got worse,
+    by more than `tolerance` (0.2 = 20%) against a baseline report
+    """
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        current = report["scenarios"].get(name)
+        if current is None or not current["requests"] or not base["requests"]:
+            continue
+        for key in ("p95", "p99"):
+            before, after = base["latency_ms"][key], current["latency_ms"][key]
+            if before and after > before * (1 + tolerance):
+                regressions.append({"scenario": name, "metric": f"latency_ms.{key}", "baseline": before, "current": after})
+        before, after = base["throughput_rps"], current["throughput_rps"]
+        if before and after < before * (1 - tolerance):
+            regressions.append({"scenario": name, "metric": "throughput_rps", "baseline": before, "current": after})
+        before, after = base["error_rate"], current["error_rate"]
+        if after > before + tolerance / 10:
+            regressions.append({"scenario": name, "metric": "error_rate", "baseline": before, "current": after})
+    return regressions
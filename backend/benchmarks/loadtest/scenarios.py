@@ -0,0 +1,99 @@
+"""
+Request scenarios for load tests
+Each scenario makes one API call as a virtual user and returns the response
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+import jwt
+
+from .seed import QUESTIONS, load_username
+
+# Accounts /auth/login accepts (the PoC authenticates against a fixed user list)
+LOGIN_ACCOUNTS = [("user1", "user123"), ("admin", "admin123")]
+
+DEFAULT_MIX = {"chat": 40, "sessions": 25, "messages": 20, "upload": 10, "login": 5}
+
+
+class VirtualUser:
+    """One simulated user: a seeded account, its bearer token and the sessions it has seen"""
+
+    def __init__(self, number: int, secret_key: str, seed: int):
+        self.number = number
+        self.username = load_username(number)
+        self.random = random.Random(seed)
+        # No uid claim: the backend resolves the identity by username, as it does for older tokens
+        token = jwt.encode(
+            {"sub": self.username, "role": "user", "iat": datetime.utcnow(), "exp": datetime.utcnow() + timedelta(hours=24)},
+            secret_key,
+            algorithm="HS256"
+        )
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.session_ids: List[str] = []
+        self.uploads = 0
+
+
+async def login(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    username, password = user.random.choice(LOGIN_ACCOUNTS)
+    return await client.post("/auth/login", json={"username": username, "password": password})
+
+
+async def chat(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    return await client.post("/chat", headers=user.headers, json={
+        "message": user.random.choice(QUESTIONS),
+        "language": "en"
+    })
+
+
+async def sessions(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    response = await client.get("/chat-sessions", headers=user.headers, params={"limit": 50})
+    if response.status_code == 200:
+        user.session_ids = [session["id"] for session in response.json().get("sessions", [])]
+    return response
+
+
+async def messages(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    if not user.session_ids:
+        return await sessions(client, user)
+    session_id = user.random.choice(user.session_ids)
+    return await client.get(f"/chat-sessions/{session_id}/messages", headers=user.headers, params={"limit": 50})
+
+
+async def upload(client: httpx.AsyncClient, user: VirtualUser) -> httpx.Response:
+    user.uploads += 1
+    # Unique content so every upload is ingested rather than answered as a duplicate
+    content = (
+        f"# Load test circular {user.username}-{user.uploads}-{user.random.random()}\n\n"
+        + "Licensed banks shall maintain adequate liquidity buffers and report them monthly. " * 40
+    )
+    return await client.post("/documents/upload", headers=user.headers, json={
+        "filename": f"loadtest_{user.number}_{user.uploads}.md",
+        "content": content,
+        "classification": "public"
+    })
+
+
+SCENARIOS: Dict[str, Callable[[httpx.AsyncClient, VirtualUser], Awaitable[httpx.Response]]] = {
+    "login": login,
+    "chat": chat,
+    "sessions": sessions,
+    "messages": messages,
+    "upload": upload,
+}
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Scenario weights from "chat=40,sessions=25,..." """
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if not name:
+            continue
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+        mix[name] = int(weight or 1)
+    return mix
@@ -0,0 +1,133 @@
+"""
+Synthetic chat history for load tests
+Users load_user_1..N, their chat sessions and messages, inserted in batches so millions of rows fit in constant memory
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import create_engine, delete, func, insert, select
+
+from database import ChatMessage, ChatSession, User, run_migrations
+
+LOAD_USER_PREFIX = "load_user_"
+LOAD_CHAT_PREFIX = "load_chat_"
+BATCH_ROWS = 10000
+
+QUESTIONS = [
+    "What are the reserve requirements for commercial banks?",
+    "Summarize the latest circular on capital adequacy",
+    "How is the liquidity coverage ratio calculated?",
+    "What are the reporting deadlines for Islamic windows?",
+    "ما هي متطلبات الاحتياطي للبنوك التجارية؟",
+    "Explain the consumer loan limits for salaried borrowers",
+]
+
+
+def load_username(number: int) -> str:
+    return f"{LOAD_USER_PREFIX}{number}"
+
+
+def _batches(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, model, rows: Iterator[Dict[str, Any]], label: str, total: int) -> None:
+    done = 0
+    for batch in _batches(rows, BATCH_ROWS):
+        conn.execute(insert(model), batch)
+        conn.commit()
+        done += len(batch)
+        if done % (BATCH_ROWS * 50) == 0 or done == total:
+            print(f"  {label}: {done:,}/{total:,}", file=sys.stderr)
+
+
+def reset(engine) -> None:
+    """Delete everything a previous seed run created"""
+    with engine.begin() as conn:
+        conn.execute(delete(ChatMessage).where(ChatMessage.conversation_id.like(f"{LOAD_CHAT_PREFIX}%")))
+        conn.execute(delete(ChatSession).where(ChatSession.conversation_id.like(f"{LOAD_CHAT_PREFIX}%")))
+        conn.execute(delete(User).where(User.username.like(f"{LOAD_USER_PREFIX}%")))
+
+
+def seed(database_url: str, users: int, sessions_per_user: int, messages: int, replace: bool = False) -> Dict[str, Any]:
+    """
+    Fill users/chat_sessions/chat_messages with synthetic history. Messages are spread
+    round-robin over the sessions, so each session holds about messages / sessions rows.
+    Returns a summary for the JSON report.
+    """
+    run_migrations(database_url)
+    engine = create_engine(database_url)
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            existing = conn.execute(
+                select(func.count()).select_from(User).where(User.username.like(f"{LOAD_USER_PREFIX}%"))
+            ).scalar()
+        if existing and not replace:
+            raise SystemExit(f"{existing} load users already exist; pass --replace to reseed")
+        if existing:
+            reset(engine)
+
+        start = datetime.utcnow() - timedelta(seconds=messages + 1)
+        session_count = users * sessions_per_user
+
+        with engine.connect() as conn:
+            # Ids come from the database so PostgreSQL sequences stay in step for later inserts
+            _insert(conn, User, (
+                {
+                    "username": load_username(number), "password_hash": "x",
+                    "name": f"Load User {number}", "email": f"load{number}@cbo.gov.om", "role": "user",
+                    "created_at": start, "is_active": True
+                }
+                for number in range(1, users + 1)
+            ), "users", users)
+            user_ids = dict(conn.execute(
+                select(User.username, User.id).where(User.username.like(f"{LOAD_USER_PREFIX}%"))
+            ).all())
+            user_ids = [user_ids[load_username(number)] for number in range(1, users + 1)]
+
+            def session_rows():
+                for index in range(session_count):
+                    # Time of the session's last round-robin message
+                    last = index + ((messages - 1 - index) // session_count) * session_count if index < messages else 0
+                    yield {
+                        "conversation_id": f"{LOAD_CHAT_PREFIX}{index}",
+                        "user_id": user_ids[index % users],
+                        "created_at": start,
+                        "last_activity": start + timedelta(seconds=last)
+                    }
+            _insert(conn, ChatSession, session_rows(), "sessions", session_count)
+
+            _insert(conn, ChatMessage, (
+                {
+                    "conversation_id": f"{LOAD_CHAT_PREFIX}{number % session_count}",
+                    "user_message": QUESTIONS[number % len(QUESTIONS)],
+                    "ai_response": "Synthetic answer about banking regulation. " * 8,
+                    "language": "ar" if number % len(QUESTIONS) == 4 else "en",
+                    "sources": None,
+                    "created_at": start + timedelta(seconds=number)
+                }
+                for number in range(messages)
+            ), "messages", messages)
+    finally:
+        engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    rows = users + session_count + messages
+    return {
+        "users": users,
+        "sessions": session_count,
+        "messages": messages,
+        "elapsed_seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None
+    }
@@ -0,0 +1,259 @@
+"""
+Bulk document ingestion for CBO Banking App PoC
+Ingests many documents concurrently (bounded) with per-document retries, yielding results as they finish
+"""
+
+import asyncio
+import os
+import random
+import time
+import zipfile
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable
+
+import httpx
+
+from database import claim_document, document_content_hash, update_document_status
+from ingestion_queue import remove_replaced_document
+from structured_logging import get_logger
+from vectara_client import vectara_client
+
+logger = get_logger(__name__)
+
+BULK_INGEST_CONCURRENCY = int(os.getenv("BULK_INGEST_CONCURRENCY", "8"))
+BULK_INGEST_RETRIES = int(os.getenv("BULK_INGEST_RETRIES", "2"))
+# Base delay for exponential backoff between attempts (with jitter)
+BULK_INGEST_RETRY_BACKOFF = float(os.getenv("BULK_INGEST_RETRY_BACKOFF", "0.5"))
+BULK_MAX_DOCUMENTS = int(os.getenv("BULK_MAX_DOCUMENTS", "1000"))
+BULK_MAX_ARCHIVE_BYTES = int(os.getenv("BULK_MAX_ARCHIVE_BYTES", str(200 * 1024 * 1024)))
+# Archive members larger than this (uncompressed) are reported as failed instead of being read
+BULK_MAX_DOCUMENT_BYTES = int(os.getenv("BULK_MAX_DOCUMENT_BYTES", str(20 * 1024 * 1024)))
+
+_DONE = object()
+CANCELLED_ERROR = "Bulk upload cancelled: client disconnected"
+
+
+class BulkItem:
+    """One document of a bulk request; content is loaded only when a worker picks it up"""
+
+    __slots__ = ("index", "filename", "classification", "load", "force")
+
+    def __init__(
+        self,
+        index: int,
+        filename: str,
+        classification: str,
+        load: Callable[[], Awaitable[str]],
+        force: bool = False
+    ):
+        self.index = index
+        self.filename = filename
+        self.classification = classification
+        self.load = load
+        self.force = force
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transport errors, throttling and server errors are worth another attempt; other 4xx are not"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def items_from_documents(documents: Iterable[Any]) -> Iterable[BulkItem]:
+    """Bulk items for DocumentUpload models sent in a JSON body"""
+    for index, document in enumerate(documents):
+        async def load(content=document.content):
+            return content
+        yield BulkItem(index, document.filename, document.classification, load, document.force)
+
+
+def items_from_archive(archive: zipfile.ZipFile, classification: str, force: bool = False) -> Iterable[BulkItem]:
+    """Bulk items for the files of a zip archive; members are decompressed off the event loop"""
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    for index, info in enumerate(members):
+        async def load(info=info):
+            if info.file_size > BULK_MAX_DOCUMENT_BYTES:
+                raise ValueError(f"File is larger than {BULK_MAX_DOCUMENT_BYTES} bytes")
+            data = await asyncio.to_thread(archive.read, info)
+            try:
+                return data.decode("utf-8")
+            except UnicodeDecodeError:
+                raise ValueError("File is not UTF-8 text")
+        yield BulkItem(index, info.filename, classification, load, force)
+
+
+class BulkIngestion:
+    """Runs the items of one bulk request with at most `concurrency` ingestions in flight"""
+
+    def __init__(
+        self,
+        user: Dict[str, Any],
+        concurrency: int = BULK_INGEST_CONCURRENCY,
+        retries: int = BULK_INGEST_RETRIES,
+        backoff: float = BULK_INGEST_RETRY_BACKOFF
+    ):
+        self.user = user
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.batch_id = f"bulk_{datetime.utcnow().timestamp()}_{user['username']}"
+        self.total = 0
+        self.processed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.retried = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    async def run(self, items: Iterable[BulkItem]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result per item in completion order, then a summary"""
+        results: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._produce(items, results))
+        try:
+            while True:
+                result = await results.get()
+                if result is _DONE:
+                    break
+                yield result
+            await producer
+        finally:
+            # Client went away: stop scheduling and cancel ingestions still in flight
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+        yield {"summary": self.summary()}
+
+    async def _produce(self, items: Iterable[BulkItem], results: asyncio.Queue) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+
+        async def run_one(item: BulkItem) -> None:
+            try:
+                await results.put(await self._ingest(item))
+            finally:
+                semaphore.release()
+
+        try:
+            for item in items:
+                # Acquire before creating the task so only `concurrency` documents are ever loaded
+                await semaphore.acquire()
+                self.total += 1
+                task = asyncio.create_task(run_one(item))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        await results.put(_DONE)
+
+    async def _ingest(self, item: BulkItem) -> Dict[str, Any]:
+        started = time.perf_counter()
+        document_id = f"{self.batch_id}_{item.index}"
+        result: Dict[str, Any] = {"index": item.index, "filename": item.filename, "document_id": document_id}
+
+        try:
+            content = await item.load()
+        except Exception as e:
+            self.failed += 1
+            return dict(result, status="failed", attempts=0, error=str(e),
+                        elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+        size = len(content.encode("utf-8"))
+        metadata = {
+            "filename": item.filename,
+            "classification": item.classification,
+            "uploaded_by": self.user["username"],
+            "uploaded_at": datetime.utcnow().isoformat(),
+            "source": "cbo_upload",
+            "category": "general",
+            "bulk_id": self.batch_id
+        }
+        indexed = False
+        try:
+            claim = await claim_document(
+                document_id, item.filename, item.classification, self.user["id"],
+                document_content_hash(content), status="processing", force=item.force
+            )
+        except asyncio.CancelledError:
+            # The row may have been committed before the cancellation arrived
+            await asyncio.shield(self._set_status(document_id, "failed", error=CANCELLED_ERROR))
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error saving bulk document {document_id}: {str(e)}")
+            return dict(result, status="failed", attempts=0, error="Error saving document",
+                        elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+        if claim["duplicate"]:
+            self.duplicates += 1
+            return dict(result, document_id=claim["document_id"], status="duplicate", existing_status=claim["status"],
+                        attempts=0, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    response = await vectara_client.ingest_document(
+                        document_id=document_id,
+                        title=item.filename,
+                        content=content,
+                        metadata=metadata
+                    )
+                    break
+                except Exception as e:
+                    if attempt <= self.retries and is_retryable(e):
+                        self.retried += 1
+                        delay = self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+                        logger.warning(f"Retrying bulk document {document_id} in {delay:.2f}s (attempt {attempt}): {str(e)}")
+                        await asyncio.sleep(delay)
+                        continue
+                    self.failed += 1
+                    logger.error(f"Bulk document {document_id} failed after {attempt} attempt(s): {str(e)}")
+                    await self._set_status(document_id, "failed", error=str(e)[:1000])
+                    return dict(result, status="failed", attempts=attempt, error=str(e),
+                                elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+            indexed = True
+            self.processed += 1
+            self.bytes += size
+            sections = response.get("sections") if isinstance(response, dict) else None
+            parts = response.get("parts") if isinstance(response, dict) else None
+            await asyncio.shield(self._set_status(
+                document_id, "processed", vectara_doc_id=document_id, vectara_parts=parts, section_count=sections
+            ))
+            if claim["replaces"]:
+                await asyncio.shield(remove_replaced_document(claim["replaces"]))
+        except asyncio.CancelledError:
+            # Client disconnected: a row left "processing" would block re-uploads of this content as a duplicate
+            if not indexed:
+                await asyncio.shield(self._set_status(document_id, "failed", error=CANCELLED_ERROR))
+            raise
+        return dict(result, status="processed", attempts=attempt, sections=sections, bytes=size,
+                    elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+    @staticmethod
+    async def _set_status(document_id: str, status: str, **fields) -> None:
+        try:
+            await update_document_status(document_id, status, **fields)
+        except Exception as e:
+            logger.error(f"Error updating status of document {document_id} to {status}: {str(e)}")
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "bulk_id": self.batch_id,
+            "documents": self.total,
+            "processed": self.processed,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "retries": self.retried,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(elapsed, 3),
+            "documents_per_second": round(self.processed / elapsed, 2) if elapsed else None,
+            "megabytes_per_second": round(self.bytes / elapsed / 1024 / 1024, 3) if elapsed else None
+        }
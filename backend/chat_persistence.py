@@ -0,0 +1,165 @@
+"""
+Write-behind persistence for CBO Banking App PoC
+Chat messages are queued on the request path and written in batches by a background worker
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from database import save_chat_message, save_chat_messages_batch
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+CHAT_PERSIST_BATCH_ROWS = int(os.getenv("CHAT_PERSIST_BATCH_ROWS", "200"))
+CHAT_PERSIST_FLUSH_MS = int(os.getenv("CHAT_PERSIST_FLUSH_MS", "50"))
+CHAT_PERSIST_QUEUE_SIZE = int(os.getenv("CHAT_PERSIST_QUEUE_SIZE", "10000"))
+# How long a request waits for queue space before writing its message directly
+CHAT_PERSIST_ENQUEUE_TIMEOUT = float(os.getenv("CHAT_PERSIST_ENQUEUE_TIMEOUT", "1.0"))
+
+_STOP = object()
+
+
+class ChatPersistenceQueue:
+    """Bounded queue of chat messages flushed every flush_interval_ms or max_batch_rows rows"""
+
+    def __init__(
+        self,
+        max_batch_rows: int = CHAT_PERSIST_BATCH_ROWS,
+        flush_interval_ms: int = CHAT_PERSIST_FLUSH_MS,
+        max_queue_size: int = CHAT_PERSIST_QUEUE_SIZE,
+        enqueue_timeout: float = CHAT_PERSIST_ENQUEUE_TIMEOUT
+    ):
+        self.max_batch_rows = max_batch_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.direct_writes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"Chat persistence worker started (batch={self.max_batch_rows} rows, interval={self.flush_interval * 1000:.0f}ms)")
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the worker"""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+        logger.info("Chat persistence worker stopped")
+
+    async def enqueue(self, conversation_id, user_message, ai_response, language='en', sources=None) -> None:
+        """Queue a message for writing; waits for space when the queue is full (backpressure)"""
+        message = {
+            'conversation_id': conversation_id,
+            'user_message': user_message,
+            'ai_response': ai_response,
+            'language': language,
+            'sources': sources,
+            'created_at': datetime.utcnow()
+        }
+
+        if not self.running:
+            await self._write_direct(message)
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.put(message), timeout=self.enqueue_timeout)
+            self.enqueued += 1
+        except asyncio.TimeoutError:
+            logger.warning("Chat persistence queue is full; writing message directly")
+            await self._write_direct(message)
+
+    async def _write_direct(self, message: Dict[str, Any]) -> None:
+        self.direct_writes += 1
+        await save_chat_message(
+            message['conversation_id'],
+            message['user_message'],
+            message['ai_response'],
+            message['language'],
+            message['sources']
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        # Drain anything enqueued behind the stop marker
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.max_batch_rows):
+            await self._flush(remaining[start:start + self.max_batch_rows])
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await save_chat_messages_batch(batch)
+            self.batches += 1
+            self.written += len(batch)
+            return
+        except Exception as e:
+            logger.error(f"Error saving batch of {len(batch)} chat messages, retrying individually: {str(e)}")
+
+        # Isolate the failing rows so one bad message doesn't drop the whole batch
+        for message in batch:
+            try:
+                await save_chat_messages_batch([message])
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Dropping chat message for conversation {message['conversation_id']}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "direct_writes": self.direct_writes
+        }
+
+
+# Global write-behind queue instance
+chat_persistence = ChatPersistenceQueue()
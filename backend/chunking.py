@@ -0,0 +1,205 @@
+"""
+Streaming document chunker for CBO Banking App PoC
+Splits text into heading/paragraph-aligned chunks with overlap while holding at most one chunk in memory
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "2000"))
+CHUNK_OVERLAP_CHARS = int(os.getenv("CHUNK_OVERLAP_CHARS", "200"))
+
+HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+# Preferred cut points inside an over-long paragraph, best first
+SENTENCE_END = re.compile(r"[.!?؟۔]\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+class StreamingChunker:
+    """
+    Feed text in pieces of any size; complete chunks are returned as soon as they fill up.
+
+    Markdown headings start a new chunk and become its heading. Paragraphs (blank-line separated)
+    are packed into chunks of up to max_chars; longer paragraphs are cut at sentence or word
+    boundaries. Each chunk repeats the last overlap_chars of the previous chunk in the same section.
+    Chunks carry start/end character offsets into the original text.
+    """
+
+    def __init__(self, max_chars: int = CHUNK_MAX_CHARS, overlap_chars: int = CHUNK_OVERLAP_CHARS):
+        if max_chars <= 0:
+            raise ValueError("max_chars must be positive")
+        self.max_chars = max_chars
+        self.overlap_chars = max(0, min(overlap_chars, max_chars // 2))
+        self.heading: Optional[str] = None
+        self.chunk_count = 0
+        # Incomplete line and the offset of its first character
+        self._pending = ""
+        self._pending_offset = 0
+        # True when the start of the current line was already consumed as paragraph text
+        self._line_open = False
+        # Current paragraph
+        self._paragraph: List[str] = []
+        self._paragraph_start = 0
+        self._paragraph_length = 0
+        # (offset, text) blocks of the chunk being built
+        self._blocks: List[Tuple[int, str]] = []
+        self._size = 0
+        self._has_new_text = False
+        self._ready: List[Dict[str, Any]] = []
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume the next piece of the document and return any chunks completed by it"""
+        self._pending += text
+        while True:
+            newline = self._pending.find("\n")
+            if newline < 0:
+                break
+            line = self._pending[:newline]
+            self._line(line, self._pending_offset)
+            self._pending = self._pending[newline + 1:]
+            self._pending_offset += newline + 1
+
+        # A single line longer than a chunk is handled as paragraph text so memory stays bounded
+        if len(self._pending) > self.max_chars:
+            self._add_paragraph_text(self._pending, self._pending_offset, continues_line=self._line_open)
+            self._pending_offset += len(self._pending)
+            self._pending = ""
+            self._line_open = True
+        return self._take_ready()
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Flush the remaining text as final chunks"""
+        if self._pending:
+            self._line(self._pending, self._pending_offset)
+            self._pending_offset += len(self._pending)
+            self._pending = ""
+        self._end_paragraph()
+        self._emit(keep_overlap=False)
+        return self._take_ready()
+
+    def _take_ready(self) -> List[Dict[str, Any]]:
+        ready, self._ready = self._ready, []
+        return ready
+
+    def _line(self, line: str, offset: int) -> None:
+        if self._line_open:
+            self._line_open = False
+            if line:
+                self._add_paragraph_text(line, offset, continues_line=True)
+            return
+
+        heading = HEADING.match(line)
+        if heading:
+            self._end_paragraph()
+            self._emit(keep_overlap=False)
+            self.heading = heading.group(2).strip("*_ ") or None
+        elif not line.strip():
+            self._end_paragraph()
+        else:
+            self._add_paragraph_text(line, offset, continues_line=False)
+
+    def _add_paragraph_text(self, text: str, offset: int, continues_line: bool) -> None:
+        if not self._paragraph:
+            stripped = text.lstrip()
+            offset += len(text) - len(stripped)
+            text = stripped
+            if not text:
+                return
+            self._paragraph_start = offset
+        elif not continues_line:
+            text = "\n" + text
+        self._paragraph.append(text)
+        self._paragraph_length += len(text)
+
+        # Cut an over-long paragraph while it streams in
+        while self._paragraph_length > self.max_chars:
+            paragraph = "".join(self._paragraph)
+            cut = self._cut_point(paragraph)
+            head = paragraph[:cut].rstrip()
+            rest = paragraph[cut:]
+            rest_stripped = rest.lstrip()
+            self._add_block(self._paragraph_start, head)
+            self._paragraph_start += cut + len(rest) - len(rest_stripped)
+            self._paragraph = [rest_stripped] if rest_stripped else []
+            self._paragraph_length = len(rest_stripped)
+
+    def _cut_point(self, text: str) -> int:
+        limit = self.max_chars
+        floor = limit // 2
+        best = 0
+        for pattern in (SENTENCE_END, WHITESPACE):
+            for match in pattern.finditer(text, floor, limit):
+                best = match.end()
+            if best:
+                return best
+        return limit
+
+    def _end_paragraph(self) -> None:
+        if self._paragraph:
+            self._add_block(self._paragraph_start, "".join(self._paragraph).rstrip())
+        self._paragraph = []
+        self._paragraph_length = 0
+
+    def _add_block(self, offset: int, text: str) -> None:
+        if not text:
+            return
+        separator = 2 if self._blocks else 0
+        if self._blocks and self._size + separator + len(text) > self.max_chars:
+            self._emit(keep_overlap=True)
+            # Drop the overlap when it would push the new block over the limit
+            if self._size + separator + len(text) > self.max_chars:
+                self._blocks = []
+                self._size = 0
+            separator = 2 if self._blocks else 0
+        self._blocks.append((offset, text))
+        self._size += separator + len(text)
+        self._has_new_text = True
+
+    def _emit(self, keep_overlap: bool) -> None:
+        if not self._blocks or not self._has_new_text:
+            self._blocks = []
+            self._size = 0
+            return
+
+        start = self._blocks[0][0]
+        last_offset, last_text = self._blocks[-1]
+        self._ready.append({
+            "index": self.chunk_count,
+            "text": "\n\n".join(text for _, text in self._blocks),
+            "heading": self.heading,
+            "start": start,
+            "end": last_offset + len(last_text)
+        })
+        self.chunk_count += 1
+
+        self._blocks = []
+        self._size = 0
+        self._has_new_text = False
+        if keep_overlap and self.overlap_chars:
+            tail = last_text[-self.overlap_chars:]
+            # Start the overlap on a word boundary
+            space = WHITESPACE.search(tail)
+            if space and len(tail) == self.overlap_chars and space.end() < len(tail):
+                tail = tail[space.end():]
+            self._blocks.append((last_offset + len(last_text) - len(tail), tail))
+            self._size = len(tail)
+
+
+def chunk_text(
+    pieces: Iterable[str],
+    max_chars: int = CHUNK_MAX_CHARS,
+    overlap_chars: int = CHUNK_OVERLAP_CHARS
+) -> Iterator[Dict[str, Any]]:
+    """Chunk a document given as an iterable of text pieces (a str is read in slices)"""
+    if isinstance(pieces, str):
+        pieces = iter_slices(pieces)
+    chunker = StreamingChunker(max_chars, overlap_chars)
+    for piece in pieces:
+        yield from chunker.feed(piece)
+    yield from chunker.close()
+
+
+def iter_slices(text: str, size: int = 65536) -> Iterator[str]:
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
@@ -4,37 +4,98 @@ Database setup for user management and session tracking with PostgreSQL support
 """
 
 import os
-import logging
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text
+import asyncio
+import base64
+import json
+from sqlalchemy import create_engine, inspect, select, update, func, and_, or_, Column, ForeignKey, Index, Integer, String, DateTime, Boolean, Text, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import deferred, sessionmaker
 from datetime import datetime
 from dotenv import load_dotenv
 import hashlib
+from ttl_cache import TTLCache
+from token_cache import verified_tokens
+from metrics import instrument_engine
+from structured_logging import configure_logging, get_logger
 
 load_dotenv()
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 # Database configuration with PostgreSQL support
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./cbo_poc.db")
 
+def _async_database_url(url):
+    """Map a sync DATABASE_URL onto its async driver (asyncpg for PostgreSQL, aiosqlite for SQLite)"""
+    scheme, separator, rest = url.partition("://")
+    if scheme.startswith("postgres"):
+        return f"postgresql+asyncpg{separator}{rest}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite{separator}{rest}"
+    return url
+
+# Request handlers use the async engine; the sync engine is kept for schema management and scripts
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(DATABASE_URL))
+
+# JSON columns use orjson when it is installed
+try:
+    import orjson
+    
+    def json_dumps(value):
+        return orjson.dumps(value).decode("utf-8")
+    
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    
+    json_loads = json.loads
+
 # Create engine with proper configuration for both SQLite and PostgreSQL
 if DATABASE_URL.startswith("postgresql"):
     engine = create_engine(
         DATABASE_URL,
         pool_pre_ping=True,
         pool_recycle=300,
+        json_serializer=json_dumps,
+        json_deserializer=json_loads,
         echo=False  # Set to True for SQL debugging
     )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        json_serializer=json_dumps,
+        json_deserializer=json_loads,
+        echo=False
+    )
 else:
     # SQLite configuration (fallback)
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},
+        json_serializer=json_dumps,
+        json_deserializer=json_loads,
+        echo=False
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        json_serializer=json_dumps,
+        json_deserializer=json_loads,
         echo=False
     )
 
+# Per-statement timings for /metrics
+instrument_engine(async_engine)
+
+# JSONB on PostgreSQL, JSON text elsewhere; None is stored as SQL NULL
+SourcesJSON = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
 Base = declarative_base()
 
 class User(Base):
@@ -51,48 +112,101 @@ class User(Base):
 
 class ChatSession(Base):
     __tablename__ = 'chat_sessions'
+    __table_args__ = (
+        Index('ix_chat_sessions_user_last_activity', 'user_id', 'last_activity', 'id'),
+    )
     id = Column(Integer, primary_key=True)
     conversation_id = Column(String, unique=True, nullable=False)
-    user_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', name='fk_chat_sessions_user_id', ondelete='CASCADE'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_activity = Column(DateTime, default=datetime.utcnow)
 
 class ChatMessage(Base):
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        Index('ix_chat_messages_conversation_created', 'conversation_id', 'created_at', 'id'),
+        Index('ix_chat_messages_created_at', 'created_at'),
+    )
     id = Column(Integer, primary_key=True)
-    conversation_id = Column(String, nullable=False)
+    conversation_id = Column(
+        String,
+        ForeignKey('chat_sessions.conversation_id', name='fk_chat_messages_conversation_id', ondelete='CASCADE'),
+        nullable=False
+    )
     user_message = Column(Text, nullable=False)
     ai_response = Column(Text, nullable=False)
     language = Column(String, default='en')
-    sources = Column(Text)
+    sources = Column('sources_json', SourcesJSON)
+    # Pre-JSON str() column, only read by migration 0003; drop once every deployment writes sources_json
+    legacy_sources = deferred(Column('sources', Text))
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class Document(Base):
     __tablename__ = 'documents'
+    __table_args__ = (
+        Index('ix_documents_uploaded_by_created', 'uploaded_by', 'created_at'),
+        Index('ix_documents_status_updated', 'status', 'updated_at'),
+        Index('uq_documents_uploader_content_hash', 'uploaded_by', 'classification', 'content_hash', unique=True),
+    )
     id = Column(Integer, primary_key=True)
     document_id = Column(String, unique=True, nullable=False)
     filename = Column(String, nullable=False)
     classification = Column(String, nullable=False, default='public')
-    uploaded_by = Column(Integer, nullable=False)
+    uploaded_by = Column(Integer, ForeignKey('users.id', name='fk_documents_uploaded_by', ondelete='CASCADE'), nullable=False)
     vectara_doc_id = Column(String)
-    status = Column(String, default='processing')
+    # Every Vectara document id written for this upload (one per part when it was split)
+    vectara_parts = Column(JSON(none_as_null=True))
+    # Ingestion job state: queued -> processing -> processed / failed; replaced once a forced re-upload is indexed
+    status = Column(String, default='queued')
+    error = Column(Text)
+    section_count = Column(Integer)
+    # SHA-256 of the uploaded content; held by the latest copy of that content
+    content_hash = Column(String(64))
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
-# Create tables
-Base.metadata.create_all(engine)
-
-# Session factory
+# Session factories
 Session = sessionmaker(bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+# Schema is managed by Alembic (see alembic.ini and migrations/)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_REVISION = "0001"
+
+def alembic_config(url=DATABASE_URL):
+    """Alembic config pointing at this backend's migrations and the given database"""
+    from alembic.config import Config
+    
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    return config
 
-def init_database():
+def run_migrations(url=DATABASE_URL, revision="head"):
+    """
+    Upgrade the schema with Alembic. Databases created before migrations existed
+    (by Base.metadata.create_all) are stamped at the baseline revision first.
+    """
+    from alembic import command
+    
+    config = alembic_config(url)
+    migration_engine = engine if url == DATABASE_URL else create_engine(url)
+    tables = set(inspect(migration_engine).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        logger.info(f"Existing schema without migration history; stamping revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+async def init_database():
     """Initialize the database with required tables"""
     try:
-        # Tables are already created by SQLAlchemy
-        Base.metadata.create_all(engine)
-        logger.info("Database tables created successfully")
+        # Alembic runs on the sync engine; keep it off the event loop
+        await asyncio.to_thread(run_migrations)
+        logger.info("Database migrations applied successfully")
         
         # Insert default users if they don't exist
-        insert_default_users()
+        await insert_default_users()
         
         return True
         
@@ -100,7 +214,11 @@ def init_database():
         logger.error(f"Error initializing database: {str(e)}")
         return False
 
-def insert_default_users():
+async def close_database():
+    """Dispose of pooled async connections"""
+    await async_engine.dispose()
+
+async def insert_default_users():
     """Insert default users for PoC testing"""
     default_users = [
         {
@@ -126,42 +244,39 @@ def insert_default_users():
         }
     ]
     
-    session = Session()
-    
-    for user in default_users:
-        try:
-            # Check if user already exists
-            existing_user = session.query(User).filter_by(username=user['username']).first()
-            if existing_user is None:
-                # Hash password
-                password_hash = hashlib.sha256(user['password'].encode()).hexdigest()
-                
-                new_user = User(
-                    username=user['username'],
-                    password_hash=password_hash,
-                    name=user['name'],
-                    email=user['email'],
-                    role=user['role']
-                )
-                
-                session.add(new_user)
-                session.commit()
-                
-                logger.info(f"Created default user: {user['username']}")
-        
-        except Exception as e:
-            logger.error(f"Error creating user {user['username']}: {str(e)}")
-    
-    session.close()
+    async with AsyncSessionLocal() as session:
+        for user in default_users:
+            try:
+                # Check if user already exists
+                result = await session.execute(select(User).filter_by(username=user['username']))
+                existing_user = result.scalars().first()
+                if existing_user is None:
+                    # Hash password
+                    password_hash = hashlib.sha256(user['password'].encode()).hexdigest()
+                    
+                    new_user = User(
+                        username=user['username'],
+                        password_hash=password_hash,
+                        name=user['name'],
+                        email=user['email'],
+                        role=user['role']
+                    )
+                    
+                    session.add(new_user)
+                    await session.commit()
+                    
+                    logger.info(f"Created default user: {user['username']}")
+            
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Error creating user {user['username']}: {str(e)}")
 
-def get_user_by_username(username):
+async def get_user_by_username(username):
     """Get user by username"""
     try:
-        session = Session()
-        
-        user = session.query(User).filter_by(username=username, is_active=True).first()
-        
-        session.close()
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(User).filter_by(username=username, is_active=True))
+            user = result.scalars().first()
         
         if user:
             return {
@@ -179,98 +294,361 @@ def get_user_by_username(username):
         logger.error(f"Error getting user {username}: {str(e)}")
         return None
 
-def update_last_login(username):
+# Identity (id, role, is_active) of users keyed by username, so authenticated requests skip the users table
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+user_identity_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+
+async def get_user_identity(username):
+    """
+    Cached id/username/name/email/role/is_active of a user; unknown users are not cached.
+    Inactive users are cached too, so callers must check is_active.
+    """
+    identity = user_identity_cache.get(username)
+    if identity is not None:
+        return identity
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(User.id, User.username, User.name, User.email, User.role, User.is_active)
+                .filter_by(username=username)
+            )
+            row = result.first()
+    except Exception as e:
+        logger.error(f"Error getting identity of {username}: {str(e)}")
+        return None
+    if row is None:
+        return None
+    
+    identity = dict(row._mapping)
+    user_identity_cache.set(username, identity)
+    return identity
+
+def invalidate_user_identity(username=None):
+    """Drop a cached identity (or all of them); call after any change to a user row"""
+    if username is None:
+        user_identity_cache.clear()
+    else:
+        user_identity_cache.pop(username)
+
+async def set_user_active(username, is_active):
+    """Activate or deactivate a user; deactivation also revokes the user's tokens in this process"""
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(User).filter_by(username=username).values(is_active=is_active))
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Error updating active flag for {username}: {str(e)}")
+    finally:
+        invalidate_user_identity(username)
+        if not is_active:
+            verified_tokens.revoke_user(username)
+
+async def update_last_login(username):
     """Update user's last login timestamp"""
     try:
-        session = Session()
-        
-        user = session.query(User).filter_by(username=username).first()
-        
-        if user:
-            user.last_login = datetime.utcnow()
-            session.commit()
-        
-        session.close()
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(User).filter_by(username=username).values(last_login=datetime.utcnow())
+            )
+            await session.commit()
         
     except Exception as e:
         logger.error(f"Error updating last login for {username}: {str(e)}")
 
-def create_chat_session(conversation_id, user_id):
+async def create_chat_session(conversation_id, user_id):
     """Create a new chat session"""
     try:
-        session = Session()
-        
-        existing_session = session.query(ChatSession).filter_by(conversation_id=conversation_id).first()
-        
-        if existing_session is None:
-            new_session = ChatSession(
-                conversation_id=conversation_id,
-                user_id=user_id
-            )
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(ChatSession.id).filter_by(conversation_id=conversation_id))
             
-            session.add(new_session)
-            session.commit()
-        
-        session.close()
+            if result.first() is None:
+                new_session = ChatSession(
+                    conversation_id=conversation_id,
+                    user_id=user_id
+                )
+                
+                session.add(new_session)
+                await session.commit()
         
     except Exception as e:
         logger.error(f"Error creating chat session: {str(e)}")
 
-def save_chat_message(conversation_id, user_message, ai_response, language='en', sources=None):
+async def save_chat_message(conversation_id, user_message, ai_response, language='en', sources=None):
     """Save chat message to database"""
     try:
-        session = Session()
+        async with AsyncSessionLocal() as session:
+            new_message = ChatMessage(
+                conversation_id=conversation_id,
+                user_message=user_message,
+                ai_response=ai_response,
+                language=language,
+                sources=sources or None
+            )
+            
+            session.add(new_message)
+            
+            # Update session last activity
+            await session.execute(
+                update(ChatSession).filter_by(conversation_id=conversation_id).values(last_activity=datetime.utcnow())
+            )
+            await session.commit()
         
-        new_message = ChatMessage(
-            conversation_id=conversation_id,
-            user_message=user_message,
-            ai_response=ai_response,
-            language=language,
-            sources=str(sources) if sources else None
+    except Exception as e:
+        logger.error(f"Error saving chat message: {str(e)}")
+
+def encode_cursor(timestamp, row_id):
+    """Opaque keyset pagination cursor for a (timestamp, id) position"""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def chat_sessions_page_statement(user_id, limit=50, cursor=None):
+    """Single statement for a page of a user's sessions with first user message and message count"""
+    first_message = (
+        select(ChatMessage.user_message)
+        .where(ChatMessage.conversation_id == ChatSession.conversation_id)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+        .limit(1)
+        .correlate(ChatSession)
+        .scalar_subquery()
+    )
+    message_count = (
+        select(func.count(ChatMessage.id))
+        .where(ChatMessage.conversation_id == ChatSession.conversation_id)
+        .correlate(ChatSession)
+        .scalar_subquery()
+    )
+    statement = (
+        select(ChatSession, first_message.label("first_message"), message_count.label("message_count"))
+        .where(ChatSession.user_id == user_id)
+        .order_by(ChatSession.last_activity.desc(), ChatSession.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        last_activity, session_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            ChatSession.last_activity < last_activity,
+            and_(ChatSession.last_activity == last_activity, ChatSession.id < session_id)
+        ))
+    return statement
+
+def chat_messages_page_statement(conversation_id, limit=50, cursor=None):
+    """Statement for a page of a conversation's messages in chronological order"""
+    statement = (
+        select(ChatMessage)
+        .where(ChatMessage.conversation_id == conversation_id)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, message_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            ChatMessage.created_at > created_at,
+            and_(ChatMessage.created_at == created_at, ChatMessage.id > message_id)
+        ))
+    return statement
+
+async def list_chat_sessions_page(user_id, limit=50, cursor=None):
+    """
+    One page of a user's chat sessions, newest activity first, in a single query.
+    Returns (rows, next_cursor); each row carries the session, its first user message and message count.
+    """
+    statement = chat_sessions_page_statement(user_id, limit, cursor)
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(statement)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1].ChatSession
+        next_cursor = encode_cursor(last.last_activity, last.id)
+    return rows, next_cursor
+
+async def list_chat_messages_page(conversation_id, user_id, limit=50, cursor=None):
+    """
+    One page of a conversation's messages in chronological order.
+    Returns (messages, next_cursor), or None when the session doesn't belong to the user.
+    """
+    async with AsyncSessionLocal() as session:
+        owned = await session.execute(
+            select(ChatSession.id).filter_by(conversation_id=conversation_id, user_id=user_id)
         )
+        if owned.first() is None:
+            return None
         
-        session.add(new_message)
-        session.commit()
-        
-        # Update session last activity
-        session.query(ChatSession).filter_by(conversation_id=conversation_id).update({'last_activity': datetime.utcnow()})
-        session.commit()
+        statement = chat_messages_page_statement(conversation_id, limit, cursor)
+        messages = (await session.execute(statement)).scalars().all()
+    
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+    return messages, next_cursor
+
+async def save_chat_messages_batch(messages):
+    """
+    Insert a batch of chat messages and bump each conversation's last activity in one transaction.
+    messages: dicts with conversation_id, user_message, ai_response, language, sources, created_at
+    """
+    last_activity = {}
+    async with AsyncSessionLocal() as session:
+        for message in messages:
+            session.add(ChatMessage(
+                conversation_id=message['conversation_id'],
+                user_message=message['user_message'],
+                ai_response=message['ai_response'],
+                language=message.get('language', 'en'),
+                sources=message.get('sources') or None,
+                created_at=message['created_at']
+            ))
+            conversation_id = message['conversation_id']
+            last_activity[conversation_id] = max(message['created_at'], last_activity.get(conversation_id, message['created_at']))
         
-        session.close()
+        for conversation_id, activity in last_activity.items():
+            await session.execute(
+                update(ChatSession)
+                .filter_by(conversation_id=conversation_id)
+                .where(or_(ChatSession.last_activity.is_(None), ChatSession.last_activity < activity))
+                .values(last_activity=activity)
+            )
+        await session.commit()
+
+async def save_document(document_id, filename, classification, uploaded_by, vectara_doc_id=None, status='processed'):
+    """Save document metadata to database; returns False when the row could not be written"""
+    try:
+        async with AsyncSessionLocal() as session:
+            new_document = Document(
+                document_id=document_id,
+                filename=filename,
+                classification=classification,
+                uploaded_by=uploaded_by,
+                vectara_doc_id=vectara_doc_id,
+                status=status
+            )
+            
+            session.add(new_document)
+            await session.commit()
+        return True
         
     except Exception as e:
-        logger.error(f"Error saving chat message: {str(e)}")
+        logger.error(f"Error saving document: {str(e)}")
+        return False
 
-def save_document(document_id, filename, classification, uploaded_by, vectara_doc_id=None):
-    """Save document metadata to database"""
-    try:
-        session = Session()
+def document_content_hash(content):
+    """Hex SHA-256 of document content, used to detect re-uploads"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+async def _document_by_hash(session, uploaded_by, classification, content_hash):
+    # Only the caller's own copy counts: another user's document id must never be handed out
+    result = await session.execute(
+        select(Document.id, Document.document_id, Document.status).filter_by(
+            uploaded_by=uploaded_by, classification=classification, content_hash=content_hash
+        )
+    )
+    return result.first()
+
+async def claim_document(document_id, filename, classification, uploaded_by, content_hash, status='queued', force=False):
+    """
+    Create a document row unless the same user already uploaded the same content with the same
+    classification and it is indexed or being ingested.
+    Returns {'document_id', 'status', 'duplicate', 'replaces'}; for a duplicate these describe the existing document.
+    With force, or when the earlier copy failed, a new row takes over the hash and the content is ingested again;
+    'replaces' then names the earlier copy, whose Vectara documents the caller removes once the new copy is indexed.
+    """
+    async with AsyncSessionLocal() as session:
+        existing = await _document_by_hash(session, uploaded_by, classification, content_hash)
+        if existing is not None and not force and existing.status != 'failed':
+            return {'document_id': existing.document_id, 'status': existing.status, 'duplicate': True, 'replaces': None}
         
-        new_document = Document(
+        if existing is not None:
+            await session.execute(update(Document).filter_by(id=existing.id).values(content_hash=None))
+        session.add(Document(
             document_id=document_id,
             filename=filename,
             classification=classification,
             uploaded_by=uploaded_by,
-            vectara_doc_id=vectara_doc_id,
-            status='processed'
+            status=status,
+            content_hash=content_hash
+        ))
+        try:
+            await session.commit()
+        except IntegrityError:
+            # A concurrent upload of the same content by this user claimed the hash first
+            await session.rollback()
+            existing = await _document_by_hash(session, uploaded_by, classification, content_hash)
+            if existing is None:
+                raise
+            return {'document_id': existing.document_id, 'status': existing.status, 'duplicate': True, 'replaces': None}
+    
+    replaces = existing.document_id if existing is not None else None
+    return {'document_id': document_id, 'status': status, 'duplicate': False, 'replaces': replaces}
+
+async def update_document_status(document_id, status, **fields):
+    """Move a document's ingestion job to a new status (fields: vectara_doc_id, vectara_parts, error, section_count)"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(Document)
+            .filter_by(document_id=document_id)
+            .values(status=status, updated_at=datetime.utcnow(), **fields)
         )
-        
-        session.add(new_document)
-        session.commit()
-        
-        session.close()
-        
-    except Exception as e:
-        logger.error(f"Error saving document: {str(e)}")
+        await session.commit()
+
+async def get_document_status(document_id):
+    """Ingestion status of a document, or None if it does not exist"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(
+                Document.document_id, Document.filename, Document.classification, Document.uploaded_by,
+                Document.status, Document.error, Document.section_count, Document.vectara_doc_id,
+                Document.created_at, Document.updated_at
+            ).filter_by(document_id=document_id)
+        )
+        row = result.first()
+    return dict(row._mapping) if row is not None else None
+
+async def get_document_parts(document_id):
+    """Vectara document ids written for an upload; rows from before parts were recorded fall back to vectara_doc_id"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Document.vectara_doc_id, Document.vectara_parts).filter_by(document_id=document_id)
+        )
+        row = result.first()
+    if row is None:
+        return []
+    if row.vectara_parts:
+        return list(row.vectara_parts)
+    return [row.vectara_doc_id] if row.vectara_doc_id else []
+
+async def fail_stale_documents(older_than):
+    """Mark jobs stuck in queued/processing since before older_than as failed; returns how many"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(Document)
+            .where(Document.status.in_(('queued', 'processing')))
+            .where(or_(Document.updated_at.is_(None), Document.updated_at < older_than))
+            .values(status='failed', error='Ingestion interrupted before completion', updated_at=datetime.utcnow())
+        )
+        await session.commit()
+    return result.rowcount
 
-def get_user_documents(user_id):
+async def get_user_documents(user_id):
     """Get documents uploaded by user"""
     try:
-        session = Session()
-        
-        documents = session.query(Document).filter_by(uploaded_by=user_id).order_by(Document.created_at.desc()).all()
-        
-        session.close()
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Document).filter_by(uploaded_by=user_id).order_by(Document.created_at.desc())
+            )
+            documents = result.scalars().all()
         
         return [{
             'document_id': doc.document_id,
@@ -286,8 +664,8 @@ def get_user_documents(user_id):
 
 if __name__ == "__main__":
     # Initialize database when run directly
-    logging.basicConfig(level=logging.INFO)
-    if init_database():
+    configure_logging()
+    if asyncio.run(init_database()):
         print("✅ Database initialized successfully!")
         print("Default users created:")
         print("- admin / admin123 (Administrator)")
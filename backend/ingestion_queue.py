@@ -0,0 +1,218 @@
+"""
+Background document ingestion for CBO Banking App PoC
+Uploads are queued as jobs and ingested into Vectara by a bounded pool of workers
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from database import fail_stale_documents, get_document_parts, update_document_status
+from structured_logging import get_logger
+from vectara_client import vectara_client
+
+logger = get_logger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "100"))
+# How long shutdown waits for running jobs before cancelling them
+INGEST_SHUTDOWN_TIMEOUT = float(os.getenv("INGEST_SHUTDOWN_TIMEOUT", "30"))
+# Jobs still queued/processing this long after their last update are failed (crashed or redeployed instance)
+INGEST_STALE_AFTER_SECONDS = float(os.getenv("INGEST_STALE_AFTER_SECONDS", "3600"))
+# How often running workers repeat that sweep, so jobs interrupted shortly before a restart are failed too
+INGEST_STALE_SWEEP_SECONDS = float(os.getenv("INGEST_STALE_SWEEP_SECONDS", "300"))
+
+_STOP = object()
+
+
+async def remove_replaced_document(document_id: str) -> None:
+    """Delete the Vectara documents of an upload superseded by a re-ingested copy and mark its row replaced"""
+    try:
+        parts = await get_document_parts(document_id)
+        leftover = await vectara_client.delete_documents(parts)
+        if leftover:
+            logger.error(f"Parts {leftover} of replaced document {document_id} are still indexed")
+        await update_document_status(document_id, "replaced", vectara_doc_id=None, vectara_parts=leftover or None)
+    except Exception as e:
+        logger.error(f"Error removing replaced document {document_id}: {str(e)}")
+
+
+class IngestionQueue:
+    """Bounded queue of ingestion jobs; each job's status is persisted on its documents row"""
+
+    def __init__(
+        self,
+        workers: int = INGEST_WORKERS,
+        max_queue_size: int = INGEST_QUEUE_SIZE,
+        shutdown_timeout: float = INGEST_SHUTDOWN_TIMEOUT,
+        stale_after: float = INGEST_STALE_AFTER_SECONDS,
+        sweep_interval: float = INGEST_STALE_SWEEP_SECONDS
+    ):
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.shutdown_timeout = shutdown_timeout
+        self.stale_after = stale_after
+        self.sweep_interval = sweep_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self._active = 0
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not worker.done() for worker in self._workers)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        await self._fail_stale()
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        self._sweeper = asyncio.create_task(self._sweep())
+        logger.info(f"Ingestion workers started (workers={self.workers}, queue={self.max_queue_size})")
+
+    async def _fail_stale(self) -> None:
+        try:
+            stale = await fail_stale_documents(datetime.utcnow() - timedelta(seconds=self.stale_after))
+            if stale:
+                logger.warning(f"Marked {stale} interrupted ingestion jobs as failed")
+        except Exception as e:
+            logger.error(f"Error failing stale ingestion jobs: {str(e)}")
+
+    async def _sweep(self) -> None:
+        """
+        Repeat the stale-job sweep while the workers run: a job interrupted less than stale_after before
+        this instance started (or on another instance) would otherwise stay processing and block re-uploads
+        """
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self._fail_stale()
+
+    async def stop(self) -> None:
+        """Let running jobs finish (up to shutdown_timeout), then fail whatever did not complete"""
+        if not self.running:
+            return
+
+        self._sweeper.cancel()
+        await asyncio.gather(self._sweeper, return_exceptions=True)
+        self._sweeper = None
+
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _ in self._workers:
+            self._queue.put_nowait(_STOP)
+
+        _, unfinished = await asyncio.wait(self._workers, timeout=self.shutdown_timeout)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for job in pending:
+            self._release(job)
+            await self._set_status(job["document_id"], "failed", error="Ingestion cancelled by server shutdown")
+        logger.info(f"Ingestion workers stopped ({len(pending)} queued jobs cancelled, {len(unfinished)} workers interrupted)")
+
+    def submit(
+        self,
+        document_id: str,
+        title: str,
+        content: Any,
+        metadata: Dict[str, Any],
+        replaces: Optional[str] = None
+    ) -> None:
+        """
+        Queue a job whose documents row already exists with status queued; raises asyncio.QueueFull.
+        Content may be a string or an (async) iterable of text; the queue closes it when the job ends.
+        replaces names an earlier copy of the same content whose Vectara documents are removed once this job succeeds.
+        """
+        if not self.running:
+            raise RuntimeError("Ingestion workers are not running")
+        self._queue.put_nowait({
+            "document_id": document_id,
+            "title": title,
+            "content": content,
+            "metadata": metadata,
+            "replaces": replaces
+        })
+        self.submitted += 1
+
+    async def _run(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job is _STOP:
+                return
+            self._active += 1
+            try:
+                await self._ingest(job)
+            finally:
+                self._active -= 1
+                self._release(job)
+
+    async def _ingest(self, job: Dict[str, Any]) -> None:
+        document_id = job["document_id"]
+        await self._set_status(document_id, "processing")
+        try:
+            result = await vectara_client.ingest_document(
+                document_id=document_id,
+                title=job["title"],
+                content=job["content"],
+                metadata=job["metadata"]
+            )
+        except asyncio.CancelledError:
+            await self._set_status(document_id, "failed", error="Ingestion cancelled by server shutdown")
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Ingestion job {document_id} failed: {str(e)}")
+            await self._set_status(document_id, "failed", error=str(e)[:1000])
+            return
+
+        self.processed += 1
+        await self._set_status(
+            document_id,
+            "processed",
+            vectara_doc_id=document_id,
+            vectara_parts=result.get("parts"),
+            section_count=result.get("sections"),
+            error=None
+        )
+        logger.info(f"Ingestion job {document_id} processed")
+        if job.get("replaces"):
+            await remove_replaced_document(job["replaces"])
+
+    @staticmethod
+    def _release(job: Dict[str, Any]) -> None:
+        """Close file-backed content (spooled uploads) once its job is over"""
+        close = getattr(job["content"], "close", None)
+        if close is not None:
+            close()
+
+    @staticmethod
+    async def _set_status(document_id: str, status: str, **fields) -> None:
+        try:
+            await update_document_status(document_id, status, **fields)
+        except Exception as e:
+            logger.error(f"Error updating status of document {document_id} to {status}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "active": self._active,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "failed": self.failed
+        }
+
+
+# Global ingestion queue instance
+ingestion_queue = IngestionQueue()
@@ -0,0 +1,200 @@
+"""
+Intent routing for CBO Banking App PoC
+Keyword rules compiled once into a word-level trie over normalized Arabic/English text
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from structured_logging import get_logger
+from text_normalization import strip_arabic_prefix, words
+
+logger = get_logger(__name__)
+
+# Optional JSON file with the same structure as DEFAULT_RULES
+INTENT_RULES_PATH = os.getenv("INTENT_RULES_PATH", "")
+
+END = object()
+
+# Checked in order: the first rule with a match (and within max_words) is the message's intent.
+# Keywords are matched on whole words after normalization and Arabic article stripping;
+# a trailing * matches any word starting with the keyword.
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "intent": "greeting",
+        "max_words": 5,
+        "keywords": [
+            "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
+            "how are you", "what's up", "greetings", "salaam", "marhaba", "ahlan",
+            "كيف حالك", "مرحبا", "أهلا", "السلام عليكم", "صباح الخير", "مساء الخير"
+        ]
+    },
+    {
+        "intent": "history_recall",
+        "keywords": [
+            "remember*", "what did i", "previous*", "earlier", "before",
+            "what was the question", "what was my question", "last question",
+            "تذكر", "سؤالي السابق", "السؤال السابق", "ماذا سألت"
+        ]
+    },
+    {
+        "intent": "banking_topic",
+        "keywords": [
+            "loan*", "bank*", "regulation*", "regulatory", "policy", "policies", "interest*", "credit*",
+            "finance*", "financial", "money", "currency", "currencies", "payment*",
+            "قرض", "قروض", "بنك", "بنوك", "مصرف*", "فائدة", "ائتمان", "تمويل", "عملة", "دفع"
+        ]
+    }
+]
+
+
+class KeywordTrie:
+    """
+    Word-level trie of keyword phrases. Text is matched word by word, so every match
+    falls on word boundaries; single-word keywords may also match as a word prefix.
+    """
+
+    def __init__(self, memo_size: int = 50000):
+        # word -> child node; END holds the targets of phrases ending at that node
+        self._root: Dict[str, Dict] = {}
+        self._prefixes: Dict[str, List[Any]] = {}
+        self._prefix_lengths: List[int] = []
+        # Raw whitespace-separated chunk -> [(word stem, prefix targets, phrase root node), ...]. Chat text
+        # repeats the same chunks constantly, so case/Arabic folding, punctuation and stemming run once per chunk.
+        self._memo: Dict[str, List[Tuple[str, List[Any], Optional[Dict]]]] = {}
+        self._memo_size = memo_size
+
+    def add(self, words: List[str], target: Any, prefix: bool = False) -> None:
+        if prefix and len(words) == 1:
+            self._prefixes.setdefault(words[0], []).append(target)
+            self._prefix_lengths = sorted({len(key) for key in self._prefixes})
+        else:
+            node = self._root
+            for word in words:
+                node = node.setdefault(word, {})
+            node.setdefault(END, []).append(target)
+        self._memo.clear()
+
+    def _chunk_entries(self, chunk: str) -> List[Tuple[str, List[Any], Optional[Dict]]]:
+        entries = []
+        for word in words(chunk):
+            stem = strip_arabic_prefix(word)
+            targets: List[Any] = []
+            for length in self._prefix_lengths:
+                if length > len(stem):
+                    break
+                targets.extend(self._prefixes.get(stem[:length], ()))
+            entries.append((stem, targets, self._root.get(stem)))
+
+        if len(self._memo) >= self._memo_size:
+            self._memo.clear()
+        self._memo[chunk] = entries
+        return entries
+
+    def find(self, text: str) -> Iterator[Any]:
+        """Yield the target of every keyword occurrence in text"""
+        memo = self._memo
+        stems = []
+        # (position, root node) of words that may start a phrase
+        starts = []
+        for chunk in text.split():
+            entries = memo.get(chunk)
+            if entries is None:
+                entries = self._chunk_entries(chunk)
+            for stem, targets, node in entries:
+                if targets:
+                    yield from targets
+                if node is not None:
+                    starts.append((len(stems), node))
+                stems.append(stem)
+
+        for position, node in starts:
+            while node is not None:
+                if END in node:
+                    yield from node[END]
+                position += 1
+                if position == len(stems):
+                    break
+                node = node.get(stems[position])
+
+
+class IntentMatch:
+    """Routing result: the winning intent plus every matched keyword per intent"""
+
+    __slots__ = ("intent", "keywords")
+
+    def __init__(self, intent: Optional[str], keywords: Dict[str, List[str]]):
+        self.intent = intent
+        self.keywords = keywords
+
+    def matched(self, intent: str) -> bool:
+        return intent in self.keywords
+
+    def __repr__(self) -> str:
+        return f"IntentMatch(intent={self.intent!r}, keywords={self.keywords!r})"
+
+
+class IntentRouter:
+    """Route messages to intents with a single trie built from a rule table"""
+
+    def __init__(self, rules: List[Dict[str, Any]] = DEFAULT_RULES):
+        self.rules = rules
+        self._max_words = {rule["intent"]: rule.get("max_words") for rule in rules}
+        self._matcher = KeywordTrie()
+        self.keyword_count = 0
+        for rule in rules:
+            for keyword in rule["keywords"]:
+                tokens = [strip_arabic_prefix(token) for token in words(keyword.rstrip("*"))]
+                if not tokens:
+                    logger.warning(f"Ignoring empty keyword {keyword!r} for intent {rule['intent']}")
+                    continue
+                # Matches report the keyword as written in the rule table
+                self._matcher.add(tokens, (rule["intent"], keyword.rstrip("*")), prefix=keyword.endswith("*"))
+                self.keyword_count += 1
+
+    @classmethod
+    def from_file(cls, path: str) -> "IntentRouter":
+        with open(path, "r", encoding="utf-8") as rules_file:
+            return cls(json.load(rules_file))
+
+    def route(self, message: str) -> IntentMatch:
+        """Match every rule keyword against the message in one pass"""
+        keywords: Dict[str, List[str]] = {}
+        for intent, keyword in self._matcher.find(message):
+            matched = keywords.setdefault(intent, [])
+            if keyword not in matched:
+                matched.append(keyword)
+
+        intent = None
+        for rule in self.rules:
+            name = rule["intent"]
+            if name not in keywords:
+                continue
+            max_words = self._max_words[name]
+            if max_words is None or len(message.split()) <= max_words:
+                intent = name
+                break
+        return IntentMatch(intent, keywords)
+
+    def keywords_in(self, texts: Iterable[str], intent: str) -> List[str]:
+        """Distinct keywords of one intent found across several texts, in order of first appearance"""
+        found: List[str] = []
+        for text in texts:
+            for keyword in self.route(text).keywords.get(intent, ()):
+                if keyword not in found:
+                    found.append(keyword)
+        return found
+
+
+def _load_router() -> IntentRouter:
+    if INTENT_RULES_PATH:
+        try:
+            return IntentRouter.from_file(INTENT_RULES_PATH)
+        except Exception as e:
+            logger.error(f"Error loading intent rules from {INTENT_RULES_PATH}, using defaults: {str(e)}")
+    return IntentRouter()
+
+
+# Global router, compiled once at import
+intent_router = _load_router()
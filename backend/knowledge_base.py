@@ -0,0 +1,237 @@
+"""
+Local FAQ answers for CBO Banking App PoC
+The conversational knowledge base is parsed into Q/A sections and searched with an in-memory BM25 index
+"""
+
+import math
+import os
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from structured_logging import get_logger
+from text_normalization import strip_english_suffix, tokenize
+
+logger = get_logger(__name__)
+
+KNOWLEDGE_BASE_PATH = os.getenv(
+    "KNOWLEDGE_BASE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "docs", "conversational-knowledge-base.md")
+)
+# Share of the best section's own question score a question must reach to be answered locally
+# (the section's question scores exactly 1; a question with extra matching words may exceed it)
+KB_MATCH_MIN_SCORE = float(os.getenv("KB_MATCH_MIN_SCORE", "0.6"))
+# Share of the question's distinct content words (stopwords dropped) the section must contain
+KB_MATCH_MIN_TERM_SHARE = float(os.getenv("KB_MATCH_MIN_TERM_SHARE", "0.6"))
+# Content words in more than this share of sections are common; every rarer word of the question (including
+# words no section uses) must occur in the matched section, so "close" or "Islamic" never match "open"/"commercial"
+KB_MATCH_COMMON_TERM_SHARE = float(os.getenv("KB_MATCH_COMMON_TERM_SHARE", "0.2"))
+
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+QUESTION_LINE = re.compile(r"^\s*(?:\*\*)?(?:Q|Question|س)\s*[:：]\s*(?:\*\*)?\s*(.+?)\s*(?:\*\*)?\s*$", re.IGNORECASE)
+ANSWER_PREFIX = re.compile(r"^\s*(?:\*\*)?(?:A|Answer|ج)\s*[:：]\s*(?:\*\*)?\s*", re.IGNORECASE)
+
+
+def parse_sections(markdown: str) -> List[Dict[str, str]]:
+    """
+    Split the knowledge base into question/answer pairs.
+    A heading followed by text is one pair; "Q: ... / A: ..." lines inside a section are pairs of their own.
+    """
+    sections: List[Dict[str, str]] = []
+    heading: Optional[str] = None
+    question: Optional[str] = None
+    body: List[str] = []
+
+    def flush():
+        answer = "\n".join(body).strip()
+        answer = ANSWER_PREFIX.sub("", answer, count=1).strip()
+        if question and answer:
+            sections.append({"question": question, "answer": answer, "section": heading or question})
+
+    for line in markdown.splitlines():
+        heading_match = HEADING.match(line)
+        question_match = QUESTION_LINE.match(line)
+        if heading_match:
+            flush()
+            heading = question = heading_match.group(2).strip("*_ ")
+            body = []
+        elif question_match:
+            flush()
+            question = question_match.group(1)
+            body = []
+        else:
+            body.append(line)
+    flush()
+    return sections
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index of token postings"""
+
+    def __init__(
+        self,
+        documents: List[List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        references: Optional[List[List[str]]] = None
+    ):
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(documents)
+        self.doc_lengths = [len(tokens) for tokens in documents]
+        self.avg_length = sum(self.doc_lengths) / self.doc_count if self.doc_count else 0.0
+        # term -> [(document index, term frequency), ...]
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_terms: List[Set[str]] = [set(tokens) for tokens in documents]
+        for doc_id, tokens in enumerate(documents):
+            counts: Dict[str, int] = defaultdict(int)
+            for token in tokens:
+                counts[token] += 1
+            for term, frequency in counts.items():
+                self.postings[term].append((doc_id, frequency))
+        self.postings = dict(self.postings)
+        # Score of each document's reference text (default: the document itself) against that document
+        self.self_scores = [
+            self.score(references[doc_id] if references is not None else tokens, doc_id)
+            for doc_id, tokens in enumerate(documents)
+        ]
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings.get(term, ()))
+
+    def idf(self, term: str) -> float:
+        document_frequency = self.document_frequency(term)
+        return math.log(1 + (self.doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _term_score(self, idf: float, frequency: int, doc_id: int) -> float:
+        length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length
+        return idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+    def score(self, query_tokens: List[str], doc_id: int) -> float:
+        """BM25 score of one document"""
+        score = 0.0
+        for term in set(query_tokens):
+            for posting_doc_id, frequency in self.postings.get(term, ()):
+                if posting_doc_id == doc_id:
+                    score += self._term_score(self.idf(term), frequency, doc_id)
+                    break
+        return score
+
+    def search(self, query_tokens: List[str], limit: int = 3) -> List[Tuple[float, float, int]]:
+        """
+        Return (score, coverage, document index) for the best documents. Coverage divides the score
+        by the document's self score, so matching all of its reference text gives 1 however
+        term frequencies saturate, and a partial match gives less.
+        """
+        if not self.doc_count or not query_tokens:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(query_tokens):
+            idf = self.idf(term)
+            for doc_id, frequency in self.postings.get(term, ()):
+                scores[doc_id] += self._term_score(idf, frequency, doc_id)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            (score, score / self.self_scores[doc_id] if self.self_scores[doc_id] else 0.0, doc_id)
+            for doc_id, score in ranked
+        ]
+
+    def term_share(self, terms: Set[str], doc_id: int) -> float:
+        """Share of the given distinct terms that occur in a document"""
+        if not terms:
+            return 0.0
+        return len(terms & self.doc_terms[doc_id]) / len(terms)
+
+    def missing_rare_terms(self, terms: Set[str], doc_id: int, common_share: float) -> Set[str]:
+        """Terms in at most common_share of the documents (or in none) that the document lacks"""
+        rare = {term for term in terms if self.document_frequency(term) <= common_share * self.doc_count}
+        return rare - self.doc_terms[doc_id]
+
+
+class KnowledgeBase:
+    """FAQ sections with a BM25 index over their questions (weighted double) and answers"""
+
+    def __init__(
+        self,
+        path: str = KNOWLEDGE_BASE_PATH,
+        min_score: float = KB_MATCH_MIN_SCORE,
+        min_term_share: float = KB_MATCH_MIN_TERM_SHARE,
+        common_term_share: float = KB_MATCH_COMMON_TERM_SHARE
+    ):
+        self.path = path
+        self.min_score = min_score
+        self.min_term_share = min_term_share
+        self.common_term_share = common_term_share
+        self.sections: List[Dict[str, str]] = []
+        self.index = BM25Index([])
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _tokens(text: str, drop_stopwords: bool = False) -> List[str]:
+        return [strip_english_suffix(token) for token in tokenize(text, drop_stopwords=drop_stopwords, stem=True)]
+
+    def load(self) -> int:
+        """(Re)build the index from the knowledge base file; returns the number of sections"""
+        if not os.path.exists(self.path):
+            logger.warning(f"Conversational knowledge base not found at {self.path}; local FAQ answers disabled")
+            self.sections = []
+            self.index = BM25Index([])
+            return 0
+
+        with open(self.path, "r", encoding="utf-8") as kb_file:
+            self.sections = parse_sections(kb_file.read())
+        questions = [self._tokens(section["question"]) for section in self.sections]
+        self.index = BM25Index(
+            [question * 2 + self._tokens(section["answer"]) for question, section in zip(questions, self.sections)],
+            references=questions
+        )
+        logger.info(f"Indexed {len(self.sections)} knowledge base sections from {self.path}")
+        return len(self.sections)
+
+    def answer(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Best matching section that clears min_score (BM25 score relative to the section's own question),
+        contains min_term_share of the question's content words and all of its rare ones, else None
+        """
+        tokens = self._tokens(question)
+        content_terms = set(self._tokens(question, drop_stopwords=True)) or set(tokens)
+        for score, coverage, doc_id in self.index.search(tokens, limit=3):
+            if coverage < self.min_score:
+                continue
+            term_share = self.index.term_share(content_terms, doc_id)
+            if term_share < self.min_term_share:
+                continue
+            if self.index.missing_rare_terms(content_terms, doc_id, self.common_term_share):
+                continue
+
+            self.hits += 1
+            section = self.sections[doc_id]
+            return {
+                "answer": section["answer"],
+                "question": section["question"],
+                "section": section["section"],
+                "score": round(score, 4),
+                "coverage": round(coverage, 4),
+                "term_share": round(term_share, 4)
+            }
+
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sections": len(self.sections),
+            "terms": len(self.index.postings),
+            "min_score": self.min_score,
+            "min_term_share": self.min_term_share,
+            "common_term_share": self.common_term_share,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Global knowledge base, indexed at startup
+knowledge_base = KnowledgeBase()
@@ -3,41 +3,57 @@ CBO Banking App PoC - FastAPI Backend
 Main application entry point with Vectara integration
 """
 
-from fastapi import FastAPI, Depends, HTTPException, Request, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import asyncio
 import os
+import time
 from datetime import datetime, timedelta
 import jwt
 import hashlib
-import logging
+import json
+import tempfile
+import zipfile
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from vectara_client import vectara_client
-from database import init_database, get_user_by_username, Session, ChatSession, ChatMessage, create_chat_session, save_chat_message
-from sqlalchemy import desc
+from structured_logging import configure_logging, get_logger, logging_stats, Payload
 
-# Load environment variables
+# Load environment variables and configure logging before the app modules log at import
 load_dotenv()
+configure_logging()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="CBO Banking App PoC",
-    description="AI-powered Document Analyzer and Conversational Chatbot for Central Bank of Oman",
-    version="1.0.0"
+from vectara_client import vectara_client
+from database import (
+    init_database, close_database, get_user_identity, user_identity_cache, AsyncSessionLocal, ChatSession, ChatMessage,
+    create_chat_session, list_chat_sessions_page, list_chat_messages_page, claim_document, document_content_hash,
+    update_document_status, get_document_status
+)
+from chat_persistence import chat_persistence
+from ingestion_queue import ingestion_queue
+from upload_spool import receive_body, receive_upload, UploadError
+from text_extraction import detect_format, text_extractor, ExtractedDocument
+from bulk_ingestion import (
+    BulkIngestion, items_from_archive, items_from_documents, BULK_MAX_ARCHIVE_BYTES, BULK_MAX_DOCUMENTS
 )
+from token_cache import verified_tokens
+from intent_router import intent_router, IntentMatch
+from knowledge_base import knowledge_base, KNOWLEDGE_BASE_PATH
+from metrics import MetricsMiddleware, cache_metrics, render_metrics
+from request_timing import RequestTimingMiddleware, add_span, span
+from sqlalchemy import delete
+
+logger = get_logger(__name__)
 
-# Ensure database is initialized at startup (creates tables and default users)
-@app.on_event("startup")
-async def _init_db_on_startup():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: initialize the database and own the shared Vectara HTTP client"""
+    # Ensure database is initialized at startup (creates tables and default users)
     try:
-        ok = init_database()
+        ok = await init_database()
         if ok:
             logger.info("Database initialized successfully on startup")
         else:
@@ -45,6 +61,28 @@ async def _init_db_on_startup():
     except Exception as e:
         logger.error(f"Database initialization error on startup: {str(e)}")
 
+    knowledge_base.load()
+    await vectara_client.start()
+    await chat_persistence.start()
+    await ingestion_queue.start()
+    try:
+        yield
+    finally:
+        # Flush queued chat messages and settle ingestion jobs before the database pool goes away
+        await ingestion_queue.stop()
+        text_extractor.shutdown()
+        await chat_persistence.stop()
+        await vectara_client.aclose()
+        await close_database()
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="CBO Banking App PoC",
+    description="AI-powered Document Analyzer and Conversational Chatbot for Central Bank of Oman",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
 # CORS middleware for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -52,8 +90,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
+# Request latency and in-flight gauges per route for /metrics
+app.add_middleware(MetricsMiddleware)
+# Request id and Server-Timing spans (auth, identity, Vectara calls, DB, parsing, persistence)
+app.add_middleware(RequestTimingMiddleware)
+
+cache_metrics.register("vectara_exact", vectara_client.response_cache.stats)
+cache_metrics.register("vectara_near_duplicate", vectara_client.near_duplicate_cache.stats)
+cache_metrics.register("user_identity", user_identity_cache.stats)
+cache_metrics.register("verified_tokens", verified_tokens.stats)
+
 # Security
 security = HTTPBearer()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
@@ -79,6 +128,7 @@ class ChatResponse(BaseModel):
     message: str
     conversation_id: str
     sources: List[Dict[str, Any]] = []
+    metadata: Dict[str, Any] = {}
 
 class ChatSessionCreate(BaseModel):
     title: str
@@ -87,6 +137,10 @@ class DocumentUpload(BaseModel):
     filename: str
     content: str
     classification: str = "public"  # public, confidential, secret, top_secret
+    force: bool = False  # re-ingest even when identical content is already indexed
+
+class BulkDocumentUpload(BaseModel):
+    documents: List[DocumentUpload]
 
 # Mock user database (replace with real database in production)
 MOCK_USERS = {
@@ -109,7 +163,7 @@ VECTARA_CONFIG = {
     "customer_id": os.getenv("VECTARA_CUSTOMER_ID"),
     "corpus_id": os.getenv("VECTARA_CORPUS_ID"),
     "api_key": os.getenv("VECTARA_API_KEY"),
-    "base_url": "https://api.vectara.io"
+    "base_url": vectara_client.base_url
 }
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -119,28 +173,62 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(hours=24)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token"""
-    try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=["HS256"])
-        username: str = payload.get("sub")
-        if username is None:
+def verify_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """Verify JWT token and return its claims; tokens already verified are served from the token cache"""
+    with span("auth"):
+        token = credentials.credentials
+        payload = verified_tokens.get(token)
+        if payload is not None:
+            return payload
+    
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+            username: str = payload.get("sub")
+            if username is None or verified_tokens.is_revoked(token, payload):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid authentication credentials",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            verified_tokens.add(token, payload)
+            return payload
+        except jwt.PyJWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return username
-    except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+
+def verify_token(claims: Dict[str, Any] = Depends(verify_token_claims)) -> str:
+    """Verify JWT token and return the username"""
+    return claims["sub"]
+
+async def resolve_identity(claims: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    User identity for verified token claims, or None when the user no longer exists or is inactive.
+    The check runs against the short-lived identity cache (invalidated by set_user_active), so a
+    deactivated user loses access within USER_CACHE_TTL_SECONDS even in other processes.
+    """
+    with span("identity"):
+        identity = await get_user_identity(claims["sub"])
+    if identity is None or not identity["is_active"]:
+        return None
+    uid = claims.get("uid")
+    if uid is not None and uid != identity["id"]:
+        # Token issued to an earlier account with the same username
+        return None
+    return identity
+
+async def get_current_identity(claims: Dict[str, Any] = Depends(verify_token_claims)) -> Dict[str, Any]:
+    """Dependency for endpoints that need the user's database id"""
+    identity = await resolve_identity(claims)
+    if identity is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return identity
 
 @app.get("/")
 async def root():
@@ -175,10 +263,15 @@ async def login(login_request: LoginRequest):
             detail="Invalid username or password"
         )
     
-    # Create access token
+    # Create access token; the database id ties it to this account (see resolve_identity)
+    claims = {"sub": username, "role": user["role"]}
+    identity = await get_user_identity(username)
+    if identity and identity["is_active"]:
+        claims["uid"] = identity["id"]
+    
     access_token_expires = timedelta(hours=24)
     access_token = create_access_token(
-        data={"sub": username}, expires_delta=access_token_expires
+        data=claims, expires_delta=access_token_expires
     )
     
     logger.info(f"User {username} logged in successfully")
@@ -194,6 +287,16 @@ async def login(login_request: LoginRequest):
         }
     )
 
+@app.post("/auth/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    claims: Dict[str, Any] = Depends(verify_token_claims)
+):
+    """Revoke the current access token"""
+    verified_tokens.revoke_token(credentials.credentials, claims)
+    logger.info(f"User {claims['sub']} logged out")
+    return {"message": "Logged out"}
+
 @app.get("/auth/me")
 async def get_current_user(current_user: str = Depends(verify_token)):
     """Get current user information"""
@@ -208,10 +311,79 @@ async def get_current_user(current_user: str = Depends(verify_token)):
         "role": user["role"]
     }
 
+CONVERSATIONAL_RESPONSES = {
+    "en": "Hello! I'm the CBO AI Assistant. I'm here to help you with banking regulations, policies, and general banking information. How can I assist you today?",
+    "ar": "مرحباً! أنا مساعد البنك المركزي العماني الذكي. أنا هنا لمساعدتك في اللوائح المصرفية والسياسات والمعلومات المصرفية العامة. كيف يمكنني مساعدتك اليوم؟"
+}
+
+def build_metadata_filter(filters: Optional[List[str]]) -> str:
+    """Build a Vectara metadata filter from the selected document categories"""
+    if not filters:
+        return ""
+    filter_conditions = [f"doc.category = '{filter_type}'" for filter_type in filters]
+    return " OR ".join(filter_conditions)
+
+def conversational_reply(chat_request: ChatRequest, routing: IntentMatch) -> Optional[str]:
+    """Canned reply for short greetings that don't need a corpus search, else None"""
+    if routing.intent == "greeting":
+        return CONVERSATIONAL_RESPONSES.get(chat_request.language, CONVERSATIONAL_RESPONSES["en"])
+    return None
+
+def knowledge_base_metadata(match: Dict[str, Any]) -> Dict[str, Any]:
+    """Response metadata recording which knowledge base section answered the question"""
+    return {
+        "answered_by": "knowledge_base",
+        "knowledge_base_match": {key: match[key] for key in ("question", "section", "score", "coverage")}
+    }
+
+def format_search_result_sources(search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert Vectara v2 search results into the sources format used by the frontend"""
+    sources = []
+    for result in search_results[:3]:  # Limit to top 3 sources
+        metadata = {}
+        metadata.update(result.get("document_metadata") or {})
+        metadata.update(result.get("part_metadata") or {})
+        sources.append({
+            "text": result.get("text", "")[:200] + "...",  # Truncate for display
+            "score": result.get("score", 0),
+            "metadata": metadata
+        })
+    return sources
+
+async def persist_chat_exchange(
+    claims: Dict[str, Any],
+    chat_request: ChatRequest,
+    conversation_id: Optional[str],
+    response_text: str,
+    sources: List[Dict[str, Any]]
+):
+    """Save a chat exchange for the user; failures are logged and never break the chat flow"""
+    try:
+        with span("persist"):
+            user = await resolve_identity(claims)
+            if user and conversation_id:
+                # Create chat session if it doesn't exist (a follow-up may have started a new upstream chat)
+                if conversation_id != chat_request.conversation_id:
+                    await create_chat_session(conversation_id, user['id'])
+            
+                # Queue the message exchange for the write-behind worker
+                await chat_persistence.enqueue(
+                    conversation_id,
+                    chat_request.message,
+                    response_text,
+                    chat_request.language or "en",
+                    sources
+                )
+                logger.info(f"Chat queued for saving for user {user['username']}")
+    except Exception as e:
+        logger.error(f"Error saving chat to database: {str(e)}")
+        # Continue without database - don't break the chat flow
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_ai(
     chat_request: ChatRequest,
-    current_user: str = Depends(verify_token)
+    current_user: str = Depends(verify_token),
+    claims: Dict[str, Any] = Depends(verify_token_claims)
 ):
     """
     Chat with AI using Vectara RAG
@@ -222,35 +394,34 @@ async def chat_with_ai(
         conversation_id = chat_request.conversation_id if chat_request.conversation_id else None
         
         # Build metadata filter based on selected filters
-        metadata_filter = ""
-        if chat_request.filters:
-            filter_conditions = []
-            for filter_type in chat_request.filters:
-                filter_conditions.append(f"doc.category = '{filter_type}'")
-            metadata_filter = " OR ".join(filter_conditions) if filter_conditions else ""
-        
-        # Check if this is a conversational/greeting query that doesn't need corpus search
-        conversational_patterns = [
-            "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
-            "how are you", "what's up", "greetings", "salaam", "marhaba", "ahlan",
-            "كيف حالك", "مرحبا", "أهلا", "السلام عليكم", "صباح الخير", "مساء الخير"
-        ]
+        metadata_filter = build_metadata_filter(chat_request.filters)
         
-        is_conversational = any(pattern in chat_request.message.lower() for pattern in conversational_patterns)
+        # Greeting / history-recall / banking-topic keywords, matched once per message
+        with span("routing"):
+            routing = intent_router.route(chat_request.message)
         
-        # For conversational queries, provide direct response without corpus search
-        if is_conversational and len(chat_request.message.split()) <= 5:
-            conversational_responses = {
-                "en": "Hello! I'm the CBO AI Assistant. I'm here to help you with banking regulations, policies, and general banking information. How can I assist you today?",
-                "ar": "مرحباً! أنا مساعد البنك المركزي العماني الذكي. أنا هنا لمساعدتك في اللوائح المصرفية والسياسات والمعلومات المصرفية العامة. كيف يمكنني مساعدتك اليوم؟"
-            }
-            
+        # For conversational/greeting queries, provide direct response without corpus search
+        greeting = conversational_reply(chat_request, routing)
+        if greeting:
             return JSONResponse(content={
-                "message": conversational_responses.get(chat_request.language, conversational_responses["en"]),
+                "message": greeting,
                 "conversation_id": conversation_id or "",
                 "sources": []
             })
         
+        # FAQ-style questions are answered from the local knowledge base index without a Vectara round trip
+        with span("knowledge_base"):
+            kb_match = knowledge_base.answer(chat_request.message)
+        if kb_match:
+            logger.info(f"Answered from knowledge base section '{kb_match['section']}' (coverage {kb_match['coverage']})")
+            await persist_chat_exchange(claims, chat_request, conversation_id, kb_match["answer"], [])
+            return ChatResponse(
+                message=kb_match["answer"],
+                conversation_id=conversation_id or "",
+                sources=[],
+                metadata=knowledge_base_metadata(kb_match)
+            )
+        
         # For Vectara chat mode, use simple query without manual context
         # Vectara will handle conversation context automatically
         context_query = chat_request.message
@@ -274,10 +445,11 @@ async def chat_with_ai(
             )
         
         # Extract response text and sources from Vectara response
+        parse_started = time.perf_counter()
         response_text = "I'm here to help with your banking queries."
         sources = []
         
-        logger.info(f"Vectara response: {vectara_response}")
+        logger.debug("Vectara chat response", payload=Payload(vectara_response))
         
         # Handle new Chat API response format
         if vectara_response and "id" in vectara_response:
@@ -298,7 +470,7 @@ async def chat_with_ai(
         elif vectara_response and "responseSet" in vectara_response:
             # Legacy API response format (fallback)
             response_set = vectara_response["responseSet"][0]
-            logger.info(f"Response set: {response_set}")
+            logger.debug("Vectara response set", payload=Payload(response_set))
             
             if "summary" in response_set and response_set["summary"]:
                 summary_item = response_set["summary"][0]
@@ -316,7 +488,7 @@ async def chat_with_ai(
                         logger.warning("Empty corpus - no documents available for search")
                     else:
                         # Check if this is a conversation history question
-                        if any(word in chat_request.message.lower() for word in ["remember", "what did i", "previous", "earlier", "before", "what was the question", "what was my question", "last question"]):
+                        if routing.matched("history_recall"):
                             # Build context from conversation history
                             if chat_request.conversation_history and len(chat_request.conversation_history) >= 2:
                                 # Find the most recent user question (excluding current one)
@@ -348,22 +520,19 @@ async def chat_with_ai(
                             contextual_response = None
                             
                             # Look for banking-related keywords in current question
-                            banking_keywords = ["loan", "bank", "regulation", "policy", "interest", "credit", "finance", "money", "currency", "payment"]
-                            if any(keyword in chat_request.message.lower() for keyword in banking_keywords):
+                            message_topics = routing.keywords.get("banking_topic", [])
+                            if message_topics:
                                 contextual_response = f"I understand you're asking about banking topics, but I don't have specific information about '{chat_request.message}' in my current knowledge base."
                             
                             # Check if user mentioned something from conversation history
                             if chat_request.conversation_history:
-                                recent_topics = []
-                                for turn in chat_request.conversation_history[-6:]:  # Last 3 exchanges
-                                    if turn.get('role') == 'user':
-                                        content = turn.get('content', '').lower()
-                                        # Extract potential topics (simple keyword extraction)
-                                        for keyword in banking_keywords:
-                                            if keyword in content and keyword not in recent_topics:
-                                                recent_topics.append(keyword)
+                                recent_topics = intent_router.keywords_in(
+                                    (turn.get('content', '') for turn in chat_request.conversation_history[-6:]  # Last 3 exchanges
+                                     if turn.get('role') == 'user'),
+                                    "banking_topic"
+                                )
                                 
-                                if recent_topics and any(topic in chat_request.message.lower() for topic in recent_topics):
+                                if recent_topics and any(topic in message_topics for topic in recent_topics):
                                     contextual_response = f"I see you're following up on topics we discussed earlier. While I don't have specific information about '{chat_request.message}', we were talking about {', '.join(recent_topics[:3])}. Could you be more specific about what aspect you'd like to know?"
                             
                             if contextual_response:
@@ -391,26 +560,10 @@ async def chat_with_ai(
                     sources.append(source_info)
         else:
             logger.info(f"Vectara conversation ID: {conversation_id}")
+        add_span("parse", time.perf_counter() - parse_started)
+        
         # Save to database if user is authenticated
-        try:
-            user = get_user_by_username(current_user)
-            if user and conversation_id:
-                # Create chat session if it doesn't exist
-                if not chat_request.conversation_id:
-                    create_chat_session(conversation_id, user['id'])
-                
-                # Save the message exchange
-                save_chat_message(
-                    conversation_id,
-                    chat_request.message,
-                    response_text,
-                    chat_request.language or "en",
-                    sources
-                )
-                logger.info(f"Chat saved to database for user {current_user}")
-        except Exception as e:
-            logger.error(f"Error saving chat to database: {str(e)}")
-            # Continue without database - don't break the chat flow
+        await persist_chat_exchange(claims, chat_request, conversation_id, response_text, sources)
         
         logger.info(f"Chat request from {current_user}: {chat_request.message}")
         
@@ -427,6 +580,75 @@ async def chat_with_ai(
             detail="Error processing chat request"
         )
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_with_ai_stream(
+    chat_request: ChatRequest,
+    current_user: str = Depends(verify_token),
+    claims: Dict[str, Any] = Depends(verify_token_claims)
+):
+    """
+    Chat with AI using Vectara RAG, streaming the answer as Server-Sent Events.
+    Emits 'token' events as text is generated, then a 'sources' event and a final 'done' event.
+    The exchange is saved once the stream completes.
+    """
+    metadata_filter = build_metadata_filter(chat_request.filters)
+    greeting = conversational_reply(chat_request, intent_router.route(chat_request.message))
+    kb_match = None if greeting else knowledge_base.answer(chat_request.message)
+    
+    async def event_stream():
+        conversation_id = chat_request.conversation_id or None
+        
+        if greeting:
+            yield sse_event("token", {"text": greeting})
+            yield sse_event("sources", {"sources": []})
+            yield sse_event("done", {"conversation_id": conversation_id or ""})
+            return
+        
+        if kb_match:
+            yield sse_event("token", {"text": kb_match["answer"]})
+            yield sse_event("sources", {"sources": []})
+            yield sse_event("done", {"conversation_id": conversation_id or "", "metadata": knowledge_base_metadata(kb_match)})
+            await persist_chat_exchange(claims, chat_request, conversation_id, kb_match["answer"], [])
+            return
+        
+        chunks: List[str] = []
+        sources: List[Dict[str, Any]] = []
+        try:
+            async for event in vectara_client.stream_chat(
+                query_text=chat_request.message,
+                language=chat_request.language or "en",
+                metadata_filter=metadata_filter,
+                chat_id=conversation_id
+            ):
+                if event["type"] == "chunk":
+                    chunks.append(event["text"])
+                    yield sse_event("token", {"text": event["text"]})
+                elif event["type"] == "search_results":
+                    sources = format_search_result_sources(event["search_results"])
+                elif event["type"] == "chat_info" and event.get("chat_id"):
+                    conversation_id = event["chat_id"]
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}")
+            yield sse_event("error", {"detail": "Error processing chat request"})
+            return
+        
+        response_text = "".join(chunks) or "I'm here to help with your banking queries."
+        yield sse_event("sources", {"sources": sources})
+        yield sse_event("done", {"conversation_id": conversation_id or ""})
+        
+        await persist_chat_exchange(claims, chat_request, conversation_id, response_text, sources)
+        logger.info(f"Streamed chat request from {current_user}: {chat_request.message}")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/chat-summary")
 async def generate_chat_summary(
     request: dict,
@@ -539,53 +761,226 @@ async def generate_simple_summary(conversation_history: str, language: str):
             "language": language
         }
 
-@app.post("/documents/upload")
-async def upload_document(
-    document: DocumentUpload,
-    current_user: str = Depends(verify_token)
+def release_content(content: Any) -> None:
+    """Close file-backed upload content that will not reach the ingestion queue"""
+    close = getattr(content, "close", None)
+    if close is not None:
+        close()
+
+async def queue_document(
+    user: Dict[str, Any],
+    filename: str,
+    classification: str,
+    content: Any,
+    content_hash: str,
+    force: bool = False
 ):
     """
-    Upload and process document for AI analysis using Vectara
+    Record an upload and hand it to the ingestion workers (202), or point at the existing
+    document when identical content is already indexed (200). Content is a string or a
+    spooled upload; once queued, the ingestion queue closes it when the job ends.
     """
+    current_user = user["username"]
+    # Generate unique document ID
+    document_id = f"doc_{datetime.utcnow().timestamp()}_{current_user}"
+    
+    # Prepare metadata
+    metadata = {
+        "filename": filename,
+        "classification": classification,
+        "uploaded_by": current_user,
+        "uploaded_at": datetime.utcnow().isoformat(),
+        "source": "cbo_upload",
+        "category": "general"  # Default category
+    }
+    
     try:
-        # Generate unique document ID
-        document_id = f"doc_{datetime.utcnow().timestamp()}_{current_user}"
-        
-        # Prepare metadata
-        metadata = {
-            "filename": document.filename,
-            "classification": document.classification,
-            "uploaded_by": current_user,
-            "uploaded_at": datetime.utcnow().isoformat(),
-            "source": "cbo_upload",
-            "category": "general"  # Default category
-        }
-        
-        # Ingest document into Vectara
-        vectara_response = await vectara_client.ingest_document(
-            document_id=document_id,
-            title=document.filename,
-            content=document.content,
-            metadata=metadata
+        claim = await claim_document(
+            document_id, filename, classification, user["id"], content_hash, status="queued", force=force
         )
-        
-        logger.info(f"Document upload from {current_user}: {document.filename}")
-        
-        return {
-            "message": "Document uploaded and processed successfully",
-            "document_id": document_id,
-            "filename": document.filename,
-            "classification": document.classification,
-            "status": "processed",
-            "vectara_response": vectara_response
-        }
-        
     except Exception as e:
-        logger.error(f"Document upload error: {str(e)}")
+        release_content(content)
+        logger.error(f"Error saving document {filename}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error uploading document"
         )
+    
+    if claim["duplicate"]:
+        release_content(content)
+        logger.info(f"Document upload from {current_user} skipped, same content as {claim['document_id']}: {filename}")
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "message": "You already uploaded identical content with this classification; pass force=true to ingest it again",
+                "document_id": claim["document_id"],
+                "job_id": claim["document_id"],
+                "filename": filename,
+                "classification": classification,
+                "status": claim["status"],
+                "duplicate": True,
+                "status_url": f"/documents/{claim['document_id']}/status"
+            }
+        )
+    
+    try:
+        ingestion_queue.submit(document_id, filename, content, metadata, replaces=claim["replaces"])
+    except (asyncio.QueueFull, RuntimeError) as e:
+        release_content(content)
+        logger.warning(f"Rejecting document upload from {current_user}: {str(e) or 'ingestion queue full'}")
+        await update_document_status(document_id, "failed", error="Ingestion queue full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Document ingestion is busy, please retry shortly",
+            headers={"Retry-After": "30"}
+        )
+    
+    logger.info(f"Document upload from {current_user} queued: {filename}")
+    
+    return {
+        "message": "Document accepted for processing",
+        "document_id": document_id,
+        "job_id": document_id,
+        "filename": filename,
+        "classification": classification,
+        "status": "queued",
+        "duplicate": False,
+        "status_url": f"/documents/{document_id}/status"
+    }
+
+@app.post("/documents/upload", status_code=status.HTTP_202_ACCEPTED)
+async def upload_document(
+    document: DocumentUpload,
+    user: Dict[str, Any] = Depends(get_current_identity)
+):
+    """
+    Accept a document for AI analysis; ingestion into Vectara runs in the background.
+    Poll GET /documents/{document_id}/status for the outcome.
+    """
+    return await queue_document(
+        user, document.filename, document.classification, document.content,
+        document_content_hash(document.content), document.force
+    )
+
+@app.post("/documents/upload-file", status_code=status.HTTP_202_ACCEPTED)
+async def upload_document_file(request: Request, user: Dict[str, Any] = Depends(get_current_identity)):
+    """
+    Multipart upload (fields: file, classification, force). The body is parsed as it streams in
+    and the file is spooled to a temp file, so memory per upload stays constant; ingestion
+    reads the text back from that file in chunks. PDF and DOCX files are converted to text
+    page by page in the extraction process pool.
+    """
+    try:
+        upload, fields = await receive_upload(request)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    
+    # PDF/DOCX text is extracted by the ingestion job in the process pool; other files must be UTF-8 text
+    content = upload
+    kind = detect_format(upload.filename, upload.content_type, upload.head)
+    if kind is not None:
+        content = ExtractedDocument(upload, kind)
+    elif not upload.is_utf8:
+        upload.close()
+        raise HTTPException(status_code=415, detail="Only PDF, DOCX and UTF-8 text files are supported")
+    
+    logger.info(f"Received {upload.filename} ({upload.size} bytes, {kind or 'text'}, {'disk' if upload.on_disk else 'memory'} spool)")
+    return await queue_document(
+        user, upload.filename, fields.get("classification") or "public", content, upload.content_hash,
+        fields.get("force", "").lower() in ("1", "true", "yes", "on")
+    )
+
+@app.post("/documents/bulk")
+async def bulk_upload_documents(
+    request: Request,
+    classification: str = Query("public"),
+    concurrency: Optional[int] = Query(None, ge=1, le=64),
+    force: bool = Query(False),
+    user: Dict[str, Any] = Depends(get_current_identity)
+):
+    """
+    Ingest many documents concurrently and stream one NDJSON result line per document as it
+    finishes, followed by a summary line with aggregate throughput.
+    The body is either JSON ({"documents": [{filename, content, classification}, ...]}) or a
+    zip archive of UTF-8 text files (Content-Type: application/zip; classification and force from the query).
+    Documents the caller already uploaded with the same classification are reported as duplicates unless forced.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    archive = spool = None
+    
+    if content_type in ("application/zip", "application/x-zip-compressed"):
+        # zipfile needs a seekable file; spill to disk past 8 MB instead of buffering the archive in memory
+        spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        received = 0
+        async for block in request.stream():
+            received += len(block)
+            if received > BULK_MAX_ARCHIVE_BYTES:
+                spool.close()
+                raise HTTPException(status_code=413, detail=f"Archive exceeds {BULK_MAX_ARCHIVE_BYTES} bytes")
+            spool.write(block)
+        spool.seek(0)
+        try:
+            archive = zipfile.ZipFile(spool)
+        except zipfile.BadZipFile:
+            spool.close()
+            raise HTTPException(status_code=400, detail="Invalid zip archive")
+        if len(archive.infolist()) > BULK_MAX_DOCUMENTS:
+            archive.close()
+            spool.close()
+            raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_DOCUMENTS} documents per request")
+        items = items_from_archive(archive, classification, force)
+    else:
+        try:
+            body = await receive_body(request)
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        try:
+            bulk = BulkDocumentUpload.model_validate_json(body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid bulk upload body: {str(e)}")
+        if len(bulk.documents) > BULK_MAX_DOCUMENTS:
+            raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_DOCUMENTS} documents per request")
+        items = items_from_documents(bulk.documents)
+    
+    ingestion = BulkIngestion(user) if concurrency is None else BulkIngestion(user, concurrency=concurrency)
+    logger.info(f"Bulk upload {ingestion.batch_id} from {user['username']} started")
+    
+    async def result_stream():
+        try:
+            async for result in ingestion.run(items):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            if archive is not None:
+                archive.close()
+                spool.close()
+            logger.info(f"Bulk upload {ingestion.batch_id} finished: {ingestion.summary()}")
+    
+    return StreamingResponse(
+        result_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/documents/{document_id}/status")
+async def document_status(document_id: str, user: Dict[str, Any] = Depends(get_current_identity)):
+    """Ingestion status of an uploaded document"""
+    document = await get_document_status(document_id)
+    # Other users' documents are reported as missing; admins can see every job
+    if document is None or (document["uploaded_by"] != user["id"] and user.get("role") != "admin"):
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return {
+        "document_id": document["document_id"],
+        "job_id": document["document_id"],
+        "filename": document["filename"],
+        "classification": document["classification"],
+        "status": document["status"],
+        "error": document["error"],
+        "sections": document["section_count"],
+        "vectara_doc_id": document["vectara_doc_id"],
+        "created_at": document["created_at"].isoformat() if document["created_at"] else None,
+        "updated_at": document["updated_at"].isoformat() if document["updated_at"] else None
+    }
 
 @app.get("/documents")
 async def list_documents(current_user: str = Depends(verify_token)):
@@ -611,8 +1006,7 @@ async def list_documents(current_user: str = Depends(verify_token)):
 async def upload_conversational_knowledge_base():
     """Upload the conversational FAQ document to Vectara corpus"""
     try:
-        import os
-        knowledge_base_path = os.path.join(os.path.dirname(__file__), "..", "docs", "conversational-knowledge-base.md")
+        knowledge_base_path = KNOWLEDGE_BASE_PATH
         
         if os.path.exists(knowledge_base_path):
             with open(knowledge_base_path, 'r', encoding='utf-8') as f:
@@ -649,95 +1043,111 @@ async def upload_conversational_knowledge_base():
 @app.get("/admin/upload-knowledge-base")
 async def upload_knowledge_base_endpoint():
     """Manual endpoint to upload conversational knowledge base - no auth required for admin setup"""
+    knowledge_base.load()
     await upload_conversational_knowledge_base()
     return {"message": "Conversational knowledge base upload initiated"}
 
 # Chat Session Management Endpoints
+def chat_message_to_frontend(msg: ChatMessage) -> List[Dict[str, Any]]:
+    """Convert a stored message exchange into the user + AI messages used by the frontend"""
+    return [
+        {
+            "id": f"{msg.id}_user",
+            "text": msg.user_message,
+            "sender": "user",
+            "timestamp": msg.created_at.isoformat(),
+            "originalQuery": msg.user_message
+        },
+        {
+            "id": f"{msg.id}_ai",
+            "text": msg.ai_response,
+            "sender": "ai",
+            "timestamp": msg.created_at.isoformat(),
+            "sources": msg.sources or [],
+            "originalQuery": msg.user_message
+        }
+    ]
+
 @app.get("/chat-sessions")
-async def get_chat_sessions(current_user: str = Depends(verify_token)):
-    """Get all chat sessions for the authenticated user"""
+async def get_chat_sessions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    user: Dict[str, Any] = Depends(get_current_identity)
+):
+    """
+    List the authenticated user's chat sessions, most recently active first.
+    Paginated with an opaque keyset cursor; messages are loaded per session via /chat-sessions/{id}/messages.
+    """
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        session = Session()
         try:
-            chat_sessions = session.query(ChatSession).filter_by(
-                user_id=user['id']
-            ).order_by(desc(ChatSession.last_activity)).all()
-            
-            result = []
-            for chat_session in chat_sessions:
-                # Get messages for this session
-                messages = session.query(ChatMessage).filter_by(
-                    conversation_id=chat_session.conversation_id
-                ).order_by(ChatMessage.created_at).all()
-                
-                # Generate title from first message or use default
-                title = "New Chat"
-                if messages:
-                    first_msg = messages[0].user_message
-                    title = first_msg[:50] + "..." if len(first_msg) > 50 else first_msg
-                
-                # Convert to frontend format
-                session_data = {
-                    "id": chat_session.conversation_id,
-                    "title": title,
-                    "messages": [],
-                    "createdAt": chat_session.created_at.isoformat(),
-                    "updatedAt": chat_session.last_activity.isoformat()
-                }
-                
-                # Add messages in chat format
-                for msg in messages:
-                    # Add user message
-                    session_data["messages"].append({
-                        "id": f"{msg.id}_user",
-                        "text": msg.user_message,
-                        "sender": "user",
-                        "timestamp": msg.created_at.isoformat(),
-                        "originalQuery": msg.user_message
-                    })
-                    
-                    # Add AI response
-                    session_data["messages"].append({
-                        "id": f"{msg.id}_ai",
-                        "text": msg.ai_response,
-                        "sender": "ai",
-                        "timestamp": msg.created_at.isoformat(),
-                        "sources": eval(msg.sources) if msg.sources else [],
-                        "originalQuery": msg.user_message
-                    })
-                
-                result.append(session_data)
-            
-            return {"sessions": result}
+            rows, next_cursor = await list_chat_sessions_page(user['id'], limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        result = []
+        for row in rows:
+            chat_session = row.ChatSession
             
-        finally:
-            session.close()
+            # Generate title from first message or use default
+            title = "New Chat"
+            if row.first_message:
+                first_msg = row.first_message
+                title = first_msg[:50] + "..." if len(first_msg) > 50 else first_msg
             
+            # Convert to frontend format
+            result.append({
+                "id": chat_session.conversation_id,
+                "title": title,
+                "messages": [],
+                "messageCount": row.message_count,
+                "createdAt": chat_session.created_at.isoformat(),
+                "updatedAt": chat_session.last_activity.isoformat()
+            })
+        
+        return {"sessions": result, "next_cursor": next_cursor}
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting chat sessions: {str(e)}")
         # Return empty sessions if database fails - don't break the app
-        return {"sessions": []}
+        return {"sessions": [], "next_cursor": None}
+
+@app.get("/chat-sessions/{session_id}/messages")
+async def get_chat_session_messages(
+    session_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    user: Dict[str, Any] = Depends(get_current_identity)
+):
+    """List messages of one chat session in chronological order, paginated with a keyset cursor"""
+    try:
+        page = await list_chat_messages_page(session_id, user['id'], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if page is None:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    
+    messages, next_cursor = page
+    result = []
+    for msg in messages:
+        result.extend(chat_message_to_frontend(msg))
+    
+    return {"messages": result, "next_cursor": next_cursor}
 
 @app.post("/chat-sessions")
 async def create_chat_session_endpoint(
     session_data: ChatSessionCreate,
-    current_user: str = Depends(verify_token)
+    user: Dict[str, Any] = Depends(get_current_identity)
 ):
     """Create a new chat session"""
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        
         # Generate conversation ID
         conversation_id = f"chat_{user['id']}_{int(datetime.now().timestamp())}"
         
         # Create chat session in database
-        create_chat_session(conversation_id, user['id'])
+        await create_chat_session(conversation_id, user['id'])
         
         return {
             "id": conversation_id,
@@ -762,35 +1172,29 @@ async def create_chat_session_endpoint(
 @app.delete("/chat-sessions/{session_id}")
 async def delete_chat_session(
     session_id: str,
-    current_user: str = Depends(verify_token)
+    user: Dict[str, Any] = Depends(get_current_identity)
 ):
     """Delete a chat session"""
     try:
-        user = get_user_by_username(current_user)
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        session = Session()
-        try:
+        async with AsyncSessionLocal() as session:
             # Delete messages first
-            session.query(ChatMessage).filter_by(conversation_id=session_id).delete()
+            await session.execute(delete(ChatMessage).filter_by(conversation_id=session_id))
             
             # Delete session
-            deleted = session.query(ChatSession).filter_by(
-                conversation_id=session_id,
-                user_id=user['id']
-            ).delete()
+            deleted = (await session.execute(
+                delete(ChatSession).filter_by(
+                    conversation_id=session_id,
+                    user_id=user['id']
+                )
+            )).rowcount
             
-            session.commit()
+            await session.commit()
             
             if deleted == 0:
                 raise HTTPException(status_code=404, detail="Chat session not found")
             
             return {"message": "Chat session deleted successfully"}
             
-        finally:
-            session.close()
-            
     except Exception as e:
         logger.error(f"Error deleting chat session: {str(e)}")
         return {"message": "Chat session deletion failed, but continuing"}
@@ -805,9 +1209,24 @@ async def health_check():
             "api": "up",
             "vectara": "pending_integration",
             "database": "mock_mode"
-        }
+        },
+        "vectara_pool": vectara_client.pool_stats(),
+        "vectara_cache": vectara_client.cache_stats(),
+        "chat_persistence": chat_persistence.stats(),
+        "ingestion": ingestion_queue.stats(),
+        "text_extraction": text_extractor.stats(),
+        "logging": logging_stats(),
+        "user_cache": user_identity_cache.stats(),
+        "token_cache": verified_tokens.stats(),
+        "knowledge_base": knowledge_base.stats()
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,183 @@
+"""
+Prometheus metrics for CBO Banking App PoC
+Request latency and in-flight gauges per route, Vectara upstream timings per method, DB query timings and cache ratios
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+
+from request_timing import add_span
+
+# Chat and ingestion calls routinely take seconds; keep resolution above the default 10s top bucket
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to complete an HTTP request, including streamed response bodies",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method", "route"]
+)
+VECTARA_REQUEST_DURATION = Histogram(
+    "vectara_request_duration_seconds",
+    "Time spent in Vectara API calls; status is the HTTP status, 'timeout' or 'error'",
+    ["method", "status"],
+    buckets=LATENCY_BUCKETS
+)
+VECTARA_REQUESTS_IN_PROGRESS = Gauge(
+    "vectara_requests_in_progress",
+    "Vectara API calls currently waiting on the upstream",
+    ["method"]
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time to execute one SQL statement, by statement type",
+    ["operation"],
+    buckets=DB_BUCKETS
+)
+
+# Routes that matched nothing share one label so random paths cannot blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+_DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Path template of the route that will handle the request (e.g. /documents/{document_id}/status)"""
+    from starlette.routing import Match
+
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, "path", None)
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and in-flight requests per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope)
+        status = {"code": "500"}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = str(message["status"])
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(method, route, status["code"]).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def track_vectara(method: str) -> Iterator[Dict[str, str]]:
+    """
+    Time one Vectara call. Set call["status"] to the response status inside the block;
+    it stays 'error' (or becomes 'timeout') when the call raises before a response arrives.
+    """
+    call = {"status": "error"}
+    in_progress = VECTARA_REQUESTS_IN_PROGRESS.labels(method)
+    in_progress.inc()
+    started = time.perf_counter()
+    try:
+        yield call
+    except httpx.TimeoutException:
+        call["status"] = "timeout"
+        raise
+    finally:
+        in_progress.dec()
+        VECTARA_REQUEST_DURATION.labels(method, call["status"]).observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement executed on a (sync or async) SQLAlchemy engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _observe_query(conn, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            _observe_query(exception_context.connection, exception_context.statement or "")
+
+
+def _observe_query(conn, statement: str) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    seconds = time.perf_counter() - started.pop()
+    DB_QUERY_DURATION.labels(operation if operation in _DB_OPERATIONS else "OTHER").observe(seconds)
+    # Summed into one "db" entry of the request's Server-Timing
+    add_span("db", seconds)
+
+
+class CacheMetricsCollector:
+    """Exports the counters the in-process caches already keep; read at scrape time, nothing on the hot path"""
+
+    def __init__(self):
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        self._caches[name] = stats
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache lookups answered from the cache", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that missed", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Hits over lookups since start", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries currently cached", labels=["cache"])
+        for name, stats in self._caches.items():
+            values = stats()
+            hits.add_metric([name], values.get("hits", 0))
+            misses.add_metric([name], values.get("misses", 0))
+            ratio.add_metric([name], values.get("hit_ratio", 0.0))
+            size.add_metric([name], values.get("size", 0))
+        yield hits
+        yield misses
+        yield ratio
+        yield size
+
+
+def render_metrics() -> tuple:
+    """Body and content type for the /metrics endpoint"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# Global collector; caches are registered by the application
+cache_metrics = CacheMetricsCollector()
+REGISTRY.register(cache_metrics)
@@ -0,0 +1,68 @@
+"""Indexes for chat/document listings and foreign keys with cascading deletes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+On PostgreSQL the indexes are built CONCURRENTLY and the foreign keys are added
+NOT VALID, so neither blocks writes on large tables nor fails on pre-existing
+orphan rows. Validate them once orphans are cleaned up:
+
+    ALTER TABLE chat_messages VALIDATE CONSTRAINT fk_chat_messages_conversation_id;
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # Messages of a conversation in order; also serves the first-message title and count lookups
+    ("ix_chat_messages_conversation_created", "chat_messages", ["conversation_id", "created_at", "id"]),
+    # Time-range scans over all messages (retention, reporting)
+    ("ix_chat_messages_created_at", "chat_messages", ["created_at"]),
+    # A user's sessions by most recent activity (keyset pagination)
+    ("ix_chat_sessions_user_last_activity", "chat_sessions", ["user_id", "last_activity", "id"]),
+    # A user's documents, newest first
+    ("ix_documents_uploaded_by_created", "documents", ["uploaded_by", "created_at"]),
+]
+
+FOREIGN_KEYS = [
+    ("fk_chat_messages_conversation_id", "chat_messages", "chat_sessions", ["conversation_id"], ["conversation_id"]),
+    ("fk_chat_sessions_user_id", "chat_sessions", "users", ["user_id"], ["id"]),
+    ("fk_documents_uploaded_by", "documents", "users", ["uploaded_by"], ["id"]),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, source, referent, local_cols, remote_cols in FOREIGN_KEYS:
+            op.create_foreign_key(
+                name, source, referent, local_cols, remote_cols,
+                ondelete="CASCADE", postgresql_not_valid=True
+            )
+        return
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    for name, source, referent, local_cols, remote_cols in FOREIGN_KEYS:
+        with op.batch_alter_table(source) as batch_op:
+            batch_op.create_foreign_key(name, referent, local_cols, remote_cols, ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    for name, source, _, _, _ in reversed(FOREIGN_KEYS):
+        with op.batch_alter_table(source) as batch_op:
+            batch_op.drop_constraint(name, type_="foreignkey")
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
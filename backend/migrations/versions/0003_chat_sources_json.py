@@ -0,0 +1,105 @@
+"""Store chat message sources as JSON (JSONB on PostgreSQL)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+Adds chat_messages.sources_json and converts the str()-encoded sources column
+into it in primary-key batches. Adding a nullable column is a catalog-only change
+on PostgreSQL, and the updates run outside the migration transaction there, so row locks stay short
+and the table is never rewritten. The old sources column is left in place for
+instances still running the previous release.
+
+"""
+import ast
+import json
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_ROWS = 1000
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+chat_messages = sa.table(
+    "chat_messages",
+    sa.column("id", sa.Integer),
+    sa.column("sources", sa.Text),
+    sa.column("sources_json", sa.JSON(none_as_null=True)),
+)
+
+
+def parse_legacy_sources(value):
+    """Parse a str(list) value without executing it; None when it is not a Python/JSON literal"""
+    for parse in (ast.literal_eval, json.loads):
+        try:
+            return parse(value)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            continue
+    return None
+
+
+def backfill(bind) -> None:
+    last_id = 0
+    converted = skipped = 0
+    while True:
+        rows = bind.execute(
+            sa.select(chat_messages.c.id, chat_messages.c.sources)
+            .where(chat_messages.c.id > last_id)
+            .where(chat_messages.c.sources.is_not(None))
+            .where(chat_messages.c.sources_json.is_(None))
+            .order_by(chat_messages.c.id)
+            .limit(BACKFILL_BATCH_ROWS)
+        ).all()
+        if not rows:
+            break
+
+        updates = []
+        for row in rows:
+            sources = parse_legacy_sources(row.sources)
+            if sources is None:
+                skipped += 1
+                continue
+            updates.append({"row_id": row.id, "payload": sources})
+
+        if updates:
+            bind.execute(
+                chat_messages.update()
+                .where(chat_messages.c.id == sa.bindparam("row_id"))
+                .values(sources_json=sa.bindparam("payload", type_=sa.JSON(none_as_null=True))),
+                updates
+            )
+            converted += len(updates)
+        last_id = rows[-1].id
+
+    logger.info(f"Converted sources of {converted} chat messages to JSON ({skipped} unparseable rows left empty)")
+
+
+def upgrade() -> None:
+    op.add_column(
+        "chat_messages",
+        sa.Column("sources_json", sa.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"))
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Updates commit as they go instead of holding one transaction over the whole table
+        with op.get_context().autocommit_block():
+            backfill(bind)
+    else:
+        backfill(bind)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("chat_messages") as batch_op:
+        batch_op.drop_column("sources_json")
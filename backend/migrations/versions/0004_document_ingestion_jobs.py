@@ -0,0 +1,46 @@
+"""Track asynchronous ingestion jobs on documents
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+Documents rows double as ingestion jobs (queued -> processing -> processed/failed).
+Adds the failure reason, section count and last status change time, plus an index
+used to find jobs left unfinished by a crashed instance. All columns are nullable,
+so this is a catalog-only change on PostgreSQL.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("error", sa.Text()))
+    op.add_column("documents", sa.Column("section_count", sa.Integer()))
+    op.add_column("documents", sa.Column("updated_at", sa.DateTime()))
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_documents_status_updated", "documents", ["status", "updated_at"],
+                postgresql_concurrently=True, if_not_exists=True
+            )
+    else:
+        op.create_index("ix_documents_status_updated", "documents", ["status", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_status_updated", table_name="documents")
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("section_count")
+        batch_op.drop_column("error")
@@ -0,0 +1,41 @@
+"""Content hash on documents for upload deduplication
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+The unique index makes concurrent uploads of identical content race on the insert
+instead of both being ingested. Existing rows keep a NULL hash, which the unique
+index allows any number of. On PostgreSQL the index is built CONCURRENTLY.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("content_hash", sa.String(64)))
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "uq_documents_content_hash", "documents", ["content_hash"], unique=True,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+    else:
+        op.create_index("uq_documents_content_hash", "documents", ["content_hash"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_documents_content_hash", table_name="documents")
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.drop_column("content_hash")
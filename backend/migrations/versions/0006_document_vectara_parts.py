@@ -0,0 +1,31 @@
+"""Record the Vectara document ids written for each upload
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00.000000
+
+Documents larger than one index batch are stored in Vectara as several part documents
+(<document_id>__partN). The ids are kept on the row so the upload can be deleted or
+replaced later. Adding a nullable column is a catalog-only change on PostgreSQL.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("vectara_parts", sa.JSON(none_as_null=True)))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.drop_column("vectara_parts")
@@ -0,0 +1,52 @@
+"""Scope upload deduplication to the uploader and classification
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+A corpus-wide unique content hash handed one user's document id to another user who
+uploaded the same file (revealing that it exists, and dropping their classification).
+The unique index now covers (uploaded_by, classification, content_hash), so only a
+user's own copy with the same classification counts as a duplicate. On PostgreSQL the
+new index is built CONCURRENTLY before the old one is dropped.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ["uploaded_by", "classification", "content_hash"]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "uq_documents_uploader_content_hash", "documents", COLUMNS, unique=True,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+            op.drop_index(
+                "uq_documents_content_hash", table_name="documents",
+                postgresql_concurrently=True, if_exists=True
+            )
+    else:
+        op.create_index("uq_documents_uploader_content_hash", "documents", COLUMNS, unique=True)
+        op.drop_index("uq_documents_content_hash", table_name="documents")
+
+
+def downgrade() -> None:
+    # Keep only the newest row per hash so the corpus-wide unique index can be rebuilt
+    op.execute(sa.text(
+        "UPDATE documents SET content_hash = NULL WHERE content_hash IS NOT NULL AND id NOT IN "
+        "(SELECT MAX(id) FROM documents WHERE content_hash IS NOT NULL GROUP BY content_hash)"
+    ))
+    op.create_index("uq_documents_content_hash", "documents", ["content_hash"], unique=True)
+    op.drop_index("uq_documents_uploader_content_hash", table_name="documents")
@@ -0,0 +1,161 @@
+"""
+Near-duplicate question cache for CBO Banking App PoC
+SimHash fingerprints over normalized Arabic/English text with a banded LSH index
+"""
+
+import hashlib
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from text_normalization import MEANING_WORDS, tokenize
+from ttl_cache import TTLCache
+
+FINGERPRINT_BITS = 64
+
+
+def _feature_hash(feature: str) -> int:
+    # Stable across processes, unlike the built-in hash()
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def fingerprint_tokens(text: str) -> List[str]:
+    """
+    Content tokens used for fingerprinting: stopwords dropped, Arabic prefixes stripped.
+    Negations, question words and modals are kept; they change what is being asked.
+    """
+    return tokenize(text, drop_stopwords=True, stem=True, keep=MEANING_WORDS)
+
+
+def meaning_signature(tokens: List[str]) -> Tuple[str, ...]:
+    """
+    Negations, question words and modals of a question (sorted). A one-word difference moves a
+    SimHash by only a few bits, so near-duplicates must also agree on these exactly.
+    """
+    return tuple(sorted(token for token in tokens if token in MEANING_WORDS))
+
+
+def simhash(tokens: List[str]) -> Optional[int]:
+    """64-bit SimHash over unigrams and bigrams; None when there is nothing to fingerprint"""
+    if not tokens:
+        return None
+
+    features = list(tokens) + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        feature_hash = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if feature_hash >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateCache:
+    """
+    Cache of answers addressed by SimHash fingerprint.
+
+    Entries are scoped by the caller's scope plus the question's meaning signature, so
+    "can ..." never matches "can ... not ..." and "when ..." never matches "why ...".
+    The fingerprint is split into max_distance + 1 bands. Two fingerprints within
+    max_distance bits of each other must agree exactly on at least one band, so a
+    lookup only compares against entries sharing a band value.
+    """
+
+    def __init__(self, max_distance: int = 3, max_entries: int = 1000, ttl_seconds: float = 600):
+        self.max_distance = max_distance
+        self._entries = TTLCache(max_entries, ttl_seconds, on_remove=self._unindex)
+        self._bands = self._band_layout(max_distance) if max_distance >= 0 else []
+        # (scope, band number, band value) -> fingerprints in that bucket
+        self._buckets: Dict[Tuple[Hashable, int, int], Set[int]] = defaultdict(set)
+        self.near_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_distance >= 0 and self._entries.enabled
+
+    @staticmethod
+    def _band_layout(max_distance: int) -> List[Tuple[int, int]]:
+        band_count = min(max_distance + 1, FINGERPRINT_BITS)
+        width, remainder = divmod(FINGERPRINT_BITS, band_count)
+        layout = []
+        offset = 0
+        for band in range(band_count):
+            band_width = width + (1 if band < remainder else 0)
+            layout.append((offset, (1 << band_width) - 1))
+            offset += band_width
+        return layout
+
+    def _band_keys(self, scope: Hashable, fingerprint: int) -> Iterable[Tuple[Hashable, int, int]]:
+        for band, (offset, mask) in enumerate(self._bands):
+            yield (scope, band, fingerprint >> offset & mask)
+
+    def _unindex(self, key: Tuple[Hashable, int], value: Any) -> None:
+        scope, fingerprint = key
+        for bucket_key in self._band_keys(scope, fingerprint):
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def get(self, scope: Hashable, text: str) -> Optional[Any]:
+        """Return the cached answer for the closest fingerprint within max_distance"""
+        if not self.enabled:
+            return None
+        tokens = fingerprint_tokens(text)
+        fingerprint = simhash(tokens)
+        if fingerprint is None:
+            return None
+        scope = (scope, meaning_signature(tokens))
+
+        candidates: Set[int] = set()
+        for bucket_key in self._band_keys(scope, fingerprint):
+            candidates.update(self._buckets.get(bucket_key, ()))
+
+        best: Optional[Tuple[int, int]] = None
+        for candidate in candidates:
+            distance = hamming_distance(fingerprint, candidate)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, candidate)
+
+        if best is None:
+            self._entries.misses += 1
+            return None
+
+        value = self._entries.get((scope, best[1]))
+        if value is not None and best[0] > 0:
+            self.near_hits += 1
+        return value
+
+    def set(self, scope: Hashable, text: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        tokens = fingerprint_tokens(text)
+        fingerprint = simhash(tokens)
+        if fingerprint is None:
+            return
+        scope = (scope, meaning_signature(tokens))
+
+        self._entries.set((scope, fingerprint), value)
+        for bucket_key in self._band_keys(scope, fingerprint):
+            self._buckets[bucket_key].add(fingerprint)
+
+    def invalidate(self, predicate) -> int:
+        """Remove every entry whose scope matches the predicate"""
+        return self._entries.invalidate(lambda key: predicate(key[0][0]))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._entries.stats()
+        stats["max_distance"] = self.max_distance
+        stats["near_hits"] = self.near_hits
+        return stats
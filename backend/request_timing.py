@@ -0,0 +1,148 @@
+"""
+Per-request timing for CBO Banking App PoC
+Spans recorded through a context variable, reported as a Server-Timing header and an optional trace log record
+"""
+
+import os
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import structlog
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Share of requests that log a trace record, plus every request slower than REQUEST_TRACE_SLOW_MS (0 disables)
+REQUEST_TRACE_SAMPLE_RATE = float(os.getenv("REQUEST_TRACE_SAMPLE_RATE", "0"))
+REQUEST_TRACE_SLOW_MS = float(os.getenv("REQUEST_TRACE_SLOW_MS", "0"))
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Client-supplied request ids are reused only if they are short and header-safe
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+class RequestTrace:
+    """Span durations of one request, summed per span name in first-seen order"""
+
+    __slots__ = ("request_id", "started", "spans")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        # name -> [total seconds, count]
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            span[0] += seconds
+            span[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing header value; the total is the time until the response headers went out"""
+        entries = [f"{name};dur={total * 1000:.1f}" for name, (total, _) in self.spans.items()]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+    def record(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": name, "duration_ms": round(total * 1000, 2), "count": int(count)}
+            for name, (total, count) in self.spans.items()
+        ]
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+
+def add_span(name: str, seconds: float) -> None:
+    """Add a measured duration to the current request's trace; no-op outside a request"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block (sync or containing awaits) as a span of the current request"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware giving every request a request id (reused from X-Request-ID when valid) and a trace.
+    Spans that finish before the response starts are reported in Server-Timing; the trace record,
+    logged for sampled or slow requests, also covers streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+        trace = RequestTrace(request_id or uuid.uuid4().hex)
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, trace.request_id.encode("latin-1")))
+                if SERVER_TIMING_ENABLED:
+                    headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        trace_token = _current_trace.set(trace)
+        log_context = structlog.contextvars.bind_contextvars(request_id=trace.request_id)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration_ms = trace.elapsed() * 1000
+            if (REQUEST_TRACE_SLOW_MS and duration_ms >= REQUEST_TRACE_SLOW_MS) or (
+                REQUEST_TRACE_SAMPLE_RATE and random.random() < REQUEST_TRACE_SAMPLE_RATE
+            ):
+                logger.info(
+                    "request trace",
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status["code"],
+                    duration_ms=round(duration_ms, 2),
+                    spans=trace.record()
+                )
+            structlog.contextvars.reset_contextvars(**log_context)
+            _current_trace.reset(trace_token)
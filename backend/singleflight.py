@@ -0,0 +1,47 @@
+"""
+Request coalescing for CBO Banking App PoC
+Concurrent calls with the same key share one in-flight upstream call
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers await the same result or error"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return (result, shared). shared is True when the caller joined a call started by
+        another request. The call is shielded so a cancelled caller doesn't cancel it for the rest.
+        """
+        call = self._calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+            return await asyncio.shield(call), True
+
+        call = asyncio.ensure_future(fn())
+        self._calls[key] = call
+        self.leaders += 1
+
+        def _forget(finished: "asyncio.Future[Any]") -> None:
+            if self._calls.get(key) is finished:
+                del self._calls[key]
+            # Mark the error retrieved even if every caller was cancelled
+            if not finished.cancelled():
+                finished.exception()
+
+        call.add_done_callback(_forget)
+        return await asyncio.shield(call), False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
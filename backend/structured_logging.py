@@ -0,0 +1,253 @@
+"""
+Structured logging for CBO Banking App PoC
+structlog front end with per-logger payload sampling; rendering and I/O happen on a background thread
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional
+
+import structlog
+
+
+
+def _env_settings() -> Dict[str, Any]:
+    """
+    Logging settings from the environment, read when logging is configured (after .env is loaded),
+    never at import time
+    """
+    return {
+        "level": os.getenv("LOG_LEVEL", "INFO").upper(),
+        # console (key=value lines) or json
+        "format": os.getenv("LOG_FORMAT", "console").lower(),
+        # Records waiting for the writer thread; further records are dropped (and counted) when it is full
+        "queue_size": int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        # Share of log events that keep their Payload fields, by default and per logger ("vectara_client=0.1,main=0.01")
+        "payload_sample_rate": float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0")),
+        "payload_sampling": _parse_sampling(os.getenv("LOG_PAYLOAD_SAMPLING", "")),
+        "payload_max_chars": int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "4000"))
+    }
+
+
+class Lazy:
+    """Log field computed only if the event is actually written, on the writer thread"""
+
+    __slots__ = ("function", "args")
+
+    def __init__(self, function: Callable[..., Any], *args: Any):
+        self.function = function
+        self.args = args
+
+    def resolve(self) -> Any:
+        return self.function(*self.args)
+
+
+class Payload(Lazy):
+    """
+    Large structure (request/response body) attached to a log event. Kept only for the sampled
+    share of events of its logger and serialized to truncated JSON on the writer thread.
+    The object must not be mutated after it is logged.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, value: Any):
+        super().__init__(_dump_payload, value)
+
+
+def _dump_payload(value: Any) -> str:
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    max_chars = payload_sampler.max_chars
+    if len(text) > max_chars:
+        return f"{text[:max_chars]}... ({len(text)} chars)"
+    return text
+
+
+def _parse_sampling(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class PayloadSampler:
+    """structlog processor dropping Payload fields from events outside their logger's sample"""
+
+    def __init__(self, default_rate: float = 0.0, rates: Optional[Dict[str, float]] = None, max_chars: int = 4000):
+        self.default_rate = default_rate
+        self.rates = rates or {}
+        self.max_chars = max_chars
+        self.kept = 0
+        self.dropped = 0
+
+    def rate_for(self, name: str) -> float:
+        # Most specific dotted prefix wins
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return self.default_rate
+
+    def __call__(self, logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        payload_keys = [key for key, value in event_dict.items() if isinstance(value, Payload)]
+        if not payload_keys:
+            return event_dict
+        rate = self.rate_for(getattr(logger, "name", ""))
+        if rate >= 1 or (rate > 0 and random.random() < rate):
+            self.kept += 1
+        else:
+            self.dropped += 1
+            for key in payload_keys:
+                del event_dict[key]
+        return event_dict
+
+
+def resolve_lazy(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in event_dict.items():
+        if isinstance(value, Lazy):
+            try:
+                event_dict[key] = value.resolve()
+            except Exception as e:
+                event_dict[key] = f"<unrenderable: {e!r}>"
+    return event_dict
+
+
+def merge_record_context(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Context variables (request id) captured when a plain logging record was queued"""
+    record = event_dict.get("_record")
+    context = getattr(record, "context", None)
+    if context:
+        for key, value in context.items():
+            event_dict.setdefault(key, value)
+    return event_dict
+
+
+def add_record_time(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Timestamp of the original call (not of rendering), from the stdlib record"""
+    record = event_dict.get("_record")
+    created = record.created if record is not None else datetime.now(timezone.utc).timestamp()
+    event_dict["timestamp"] = datetime.fromtimestamp(created, timezone.utc).isoformat()
+    return event_dict
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread (the stdlib one formats in the
+    caller) and drops records instead of blocking or raising when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # structlog events carry their bound context already; plain logging records capture it here
+        if not isinstance(record.msg, dict):
+            context = structlog.contextvars.get_contextvars()
+            if context:
+                record.context = context
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+payload_sampler = PayloadSampler()
+_handler: Optional[DeferredQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: Optional[str] = None, log_format: Optional[str] = None) -> None:
+    """
+    Route structlog and stdlib logging through one background writer; safe to call more than once.
+    Settings not passed are read from the environment now, so call it after load_dotenv().
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    settings = _env_settings()
+    level = (level or settings["level"]).upper()
+    log_format = (log_format or settings["format"]).lower()
+    payload_sampler.default_rate = settings["payload_sample_rate"]
+    payload_sampler.rates = settings["payload_sampling"]
+    payload_sampler.max_chars = settings["payload_max_chars"]
+
+    numeric_level = logging.getLevelName(level)
+    if not isinstance(numeric_level, int):
+        numeric_level = logging.INFO
+
+    renderer = (
+        structlog.processors.JSONRenderer(default=str)
+        if log_format == "json"
+        else structlog.dev.ConsoleRenderer(colors=False)
+    )
+    # Runs on the writer thread for structlog events and plain logging records alike
+    formatter = structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[structlog.stdlib.add_log_level, structlog.stdlib.add_logger_name, merge_record_context],
+        processors=[
+            add_record_time,
+            resolve_lazy,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            renderer
+        ]
+    )
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    _handler = DeferredQueueHandler(queue.Queue(settings["queue_size"]))
+    _listener = QueueListener(_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(numeric_level)
+
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            payload_sampler,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        # Calls below the level return immediately without building an event
+        wrapper_class=structlog.make_filtering_bound_logger(numeric_level),
+        cache_logger_on_first_use=True
+    )
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str):
+    return structlog.get_logger(name)
+
+
+def logging_stats() -> Dict[str, Any]:
+    return {
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+        "payloads_kept": payload_sampler.kept,
+        "payloads_dropped": payload_sampler.dropped
+    }
@@ -0,0 +1,71 @@
+"""
+Shared fixtures for the backend test suite
+Run from backend/: python -m pytest
+"""
+
+import os
+import tempfile
+
+# Backend modules read their configuration at import time: keep the suite off real
+# services and databases before any of them is imported
+_TEST_DIR = tempfile.mkdtemp(prefix="cbo_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+for _name in ("VECTARA_CUSTOMER_ID", "VECTARA_CORPUS_ID", "VECTARA_API_KEY"):
+    os.environ[_name] = ""
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+
+
+class FakeClock:
+    """Manually advanced monotonic clock for TTL tests"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(scope="session")
+def migrated_database():
+    """Schema applied once to the throwaway SQLite database"""
+    from database import run_migrations
+    run_migrations()
+
+
+@pytest.fixture
+async def db(migrated_database):
+    """The database module; pooled async connections are released after each test's event loop"""
+    import database
+    yield database
+    await database.close_database()
+
+
+@pytest.fixture
+async def make_user(db):
+    """Insert a user row and return its id"""
+    import uuid
+
+    async def make(username=None, is_active=True):
+        async with db.AsyncSessionLocal() as session:
+            user = db.User(
+                username=username or f"test_{uuid.uuid4().hex[:12]}",
+                password_hash="x",
+                name="Test",
+                email="test@cbo.gov.om",
+                role="user",
+                is_active=is_active
+            )
+            session.add(user)
+            await session.commit()
+            return user.id
+    return make
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+
+import pytest
+
+import bulk_ingestion
+from bulk_ingestion import BulkIngestion, BulkItem
+
+
+class FakeVectara:
+    """Indexes titles starting with 'fast' at once; everything else waits until the test ends"""
+
+    def __init__(self):
+        self.started = []
+        self.never = asyncio.Event()
+
+    async def ingest_document(self, document_id, title, content, metadata=None):
+        self.started.append(document_id)
+        if not title.startswith("fast"):
+            await self.never.wait()
+        return {"document_id": document_id, "parts": [document_id], "sections": 1}
+
+
+@pytest.fixture
+def vectara(monkeypatch):
+    fake = FakeVectara()
+    monkeypatch.setattr(bulk_ingestion, "vectara_client", fake)
+    return fake
+
+
+@pytest.fixture
+async def user(db, make_user):
+    user_id = await make_user()
+    return {"id": user_id, "username": f"bulk_{user_id}"}
+
+
+def item(index, filename):
+    text = f"{filename} {uuid.uuid4().hex}"
+
+    async def load():
+        return text
+    return BulkItem(index, filename, "public", load)
+
+
+async def statuses(db, ingestion, count):
+    return [
+        (await db.get_document_status(f"{ingestion.batch_id}_{index}") or {}).get("status")
+        for index in range(count)
+    ]
+
+
+async def test_all_documents_are_processed(db, vectara, user):
+    ingestion = BulkIngestion(user, concurrency=2)
+    results = [result async for result in ingestion.run([item(index, f"fast{index}.txt") for index in range(3)])]
+
+    assert results[-1]["summary"]["processed"] == 3
+    assert await statuses(db, ingestion, 3) == ["processed"] * 3
+
+
+async def test_client_disconnect_leaves_no_rows_processing(db, vectara, user):
+    ingestion = BulkIngestion(user, concurrency=3)
+    items = [item(0, "fast.txt"), item(1, "slow1.txt"), item(2, "slow2.txt")]
+    stream = ingestion.run(items)
+
+    first = await stream.__anext__()
+    assert first["status"] == "processed"
+    while len(vectara.started) < 3:
+        await asyncio.sleep(0.01)
+    # What StreamingResponse does when the client goes away
+    await stream.aclose()
+
+    assert await statuses(db, ingestion, 3) == ["processed", "failed", "failed"]
+    interrupted = await db.get_document_status(f"{ingestion.batch_id}_1")
+    assert "disconnected" in interrupted["error"]
+
+    # The content can be uploaded again instead of being reported as a duplicate forever
+    retry = BulkIngestion(user)
+    vectara.never.set()
+    results = [result async for result in retry.run([BulkItem(0, "slow1.txt", "public", items[1].load)])]
+    assert results[0]["status"] == "processed"
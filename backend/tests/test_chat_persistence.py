@@ -0,0 +1,132 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+import chat_persistence
+from chat_persistence import ChatPersistenceQueue
+
+
+class RecordingWriter:
+    """Stands in for save_chat_messages_batch; fails any batch holding a message marked 'bad'"""
+
+    def __init__(self):
+        self.batches = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, batch):
+        await self.release.wait()
+        if any(message["user_message"] == "bad" for message in batch):
+            raise RuntimeError("constraint violated")
+        self.batches.append([message["user_message"] for message in batch])
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = RecordingWriter()
+    direct = []
+
+    async def save_direct(conversation_id, user_message, *args):
+        direct.append(user_message)
+
+    monkeypatch.setattr(chat_persistence, "save_chat_messages_batch", writer)
+    monkeypatch.setattr(chat_persistence, "save_chat_message", save_direct)
+    writer.direct = direct
+    return writer
+
+
+async def test_messages_are_written_in_bounded_batches(writer):
+    queue = ChatPersistenceQueue(max_batch_rows=3, flush_interval_ms=1000)
+    await queue.start()
+    for number in range(7):
+        await queue.enqueue("conv", f"m{number}", "answer")
+    await queue.stop()
+
+    assert [message for batch in writer.batches for message in batch] == [f"m{number}" for number in range(7)]
+    assert all(len(batch) <= 3 for batch in writer.batches)
+    assert queue.stats()["written"] == 7
+
+
+async def test_flush_interval_writes_partial_batch(writer):
+    queue = ChatPersistenceQueue(max_batch_rows=100, flush_interval_ms=10)
+    await queue.start()
+    await queue.enqueue("conv", "m0", "answer")
+    await asyncio.sleep(0.1)
+    assert writer.batches == [["m0"]]
+    await queue.stop()
+
+
+async def test_stop_drains_everything_queued(writer):
+    writer.release.clear()
+    queue = ChatPersistenceQueue(max_batch_rows=2, flush_interval_ms=1000)
+    await queue.start()
+    for number in range(9):
+        await queue.enqueue("conv", f"m{number}", "answer")
+
+    stopping = asyncio.create_task(queue.stop())
+    await asyncio.sleep(0)
+    writer.release.set()
+    await stopping
+
+    assert sorted(message for batch in writer.batches for message in batch) == sorted(f"m{number}" for number in range(9))
+    assert not queue.running
+    assert queue.stats()["queued"] == 0
+
+
+async def test_failing_row_is_isolated_from_its_batch(writer):
+    queue = ChatPersistenceQueue(max_batch_rows=10, flush_interval_ms=1000)
+    await queue.start()
+    for message in ("ok1", "bad", "ok2"):
+        await queue.enqueue("conv", message, "answer")
+    await queue.stop()
+
+    assert writer.batches == [["ok1"], ["ok2"]]
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["written"] == 2
+
+
+async def test_full_queue_falls_back_to_direct_write(writer):
+    writer.release.clear()
+    queue = ChatPersistenceQueue(max_batch_rows=1, flush_interval_ms=1000, max_queue_size=1, enqueue_timeout=0.01)
+    await queue.start()
+    await queue.enqueue("conv", "taken by worker", "answer")
+    await asyncio.sleep(0)
+    await queue.enqueue("conv", "queued", "answer")
+    await queue.enqueue("conv", "overflow", "answer")
+
+    assert writer.direct == ["overflow"]
+    writer.release.set()
+    await queue.stop()
+    assert queue.stats()["direct_writes"] == 1
+
+
+async def test_not_running_writes_directly(writer):
+    queue = ChatPersistenceQueue()
+    await queue.enqueue("conv", "m0", "answer")
+    assert writer.direct == ["m0"]
+    assert writer.batches == []
+
+
+async def test_batch_write_updates_database(db, make_user):
+    user_id = await make_user()
+    conversation_id = f"conv_{uuid.uuid4().hex}"
+    await db.create_chat_session(conversation_id, user_id)
+
+    queue = ChatPersistenceQueue(max_batch_rows=2, flush_interval_ms=1000)
+    await queue.start()
+    for number in range(3):
+        await queue.enqueue(conversation_id, f"q{number}", "answer", sources=[{"title": "Circular"}])
+    await queue.stop()
+
+    async with db.AsyncSessionLocal() as session:
+        messages = (await session.execute(
+            select(db.ChatMessage).filter_by(conversation_id=conversation_id).order_by(db.ChatMessage.id)
+        )).scalars().all()
+        chat_session = (await session.execute(
+            select(db.ChatSession).filter_by(conversation_id=conversation_id)
+        )).scalars().one()
+    assert [message.user_message for message in messages] == ["q0", "q1", "q2"]
+    assert messages[0].sources == [{"title": "Circular"}]
+    assert chat_session.last_activity == messages[-1].created_at
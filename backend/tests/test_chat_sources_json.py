@@ -0,0 +1,78 @@
+import importlib.util
+import json
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from database import BACKEND_DIR, run_migrations
+
+SOURCES = [{"text": "Banks shall hold reserves", "score": 0.82, "metadata": {"title": "Circular 12/2024", "lang": "ar"}}]
+
+
+def _load_migration(filename):
+    path = os.path.join(BACKEND_DIR, "migrations", "versions", filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration_0003 = _load_migration("0003_chat_sources_json.py")
+
+
+@pytest.mark.parametrize("value, expected", [
+    (str(SOURCES), SOURCES),
+    ('[{"text": "json encoded"}]', [{"text": "json encoded"}]),
+    ("[]", []),
+])
+def test_legacy_sources_are_parsed_as_literals(value, expected):
+    assert migration_0003.parse_legacy_sources(value) == expected
+
+
+@pytest.mark.parametrize("value", ["__import__('os').getcwd()", "[open('x')]", "not a literal", ""])
+def test_legacy_sources_never_execute_code(value):
+    assert migration_0003.parse_legacy_sources(value) is None
+
+
+async def test_sources_round_trip_as_native_json(db, make_user):
+    user_id = await make_user()
+    conversation_id = f"sources_{uuid.uuid4().hex}"
+    await db.create_chat_session(conversation_id, user_id)
+    await db.save_chat_message(conversation_id, "q1", "a1", sources=SOURCES)
+    await db.save_chat_message(conversation_id, "q2", "a2", sources=[])
+
+    messages, _ = await db.list_chat_messages_page(conversation_id, user_id)
+    assert messages[0].sources == SOURCES
+    assert messages[1].sources is None
+
+
+def test_migration_backfills_legacy_text_column(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    run_migrations(url, "0002")
+    engine = create_engine(url)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO users (id, username, password_hash, name, email, role, is_active) "
+                "VALUES (1, 'legacy', 'x', 'Legacy', 'l@cbo.gov.om', 'user', 1)"
+            ))
+            conn.execute(text("INSERT INTO chat_sessions (conversation_id, user_id) VALUES ('c1', 1)"))
+            for message_id, sources in ((1, str(SOURCES)), (2, "__import__('os').getcwd()"), (3, None)):
+                conn.execute(
+                    text("INSERT INTO chat_messages (id, conversation_id, user_message, ai_response, sources) "
+                         "VALUES (:id, 'c1', 'q', 'a', :sources)"),
+                    {"id": message_id, "sources": sources}
+                )
+
+        run_migrations(url, "0003")
+
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, sources_json FROM chat_messages ORDER BY id")).all()
+    finally:
+        engine.dispose()
+
+    assert json.loads(rows[0].sources_json) == SOURCES
+    assert rows[1].sources_json is None
+    assert rows[2].sources_json is None
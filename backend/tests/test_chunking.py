@@ -0,0 +1,75 @@
+from chunking import StreamingChunker, chunk_text, iter_slices
+
+DOCUMENT = (
+    "# Reserve requirements\n"
+    "Banks hold reserves with the Central Bank. The ratio is reviewed every quarter.\n"
+    "\n"
+    "Shortfalls are charged a penalty rate on the missing amount.\n"
+    "\n"
+    "## Reporting\n"
+    "Returns are due within ten working days of the end of each month. Late returns are fined.\n"
+    "\n"
+    "لا تقبل التقارير المتأخرة دون موافقة مسبقة من البنك المركزي.\n"
+)
+
+
+def assert_offsets_match(text, chunks):
+    for chunk in chunks:
+        source = text[chunk["start"]:chunk["end"]]
+        # Blocks are joined with a blank line; the offsets span the original text between them
+        blocks = chunk["text"].split("\n\n")
+        assert source.startswith(blocks[0])
+        assert source.endswith(blocks[-1])
+        position = 0
+        for block in blocks:
+            position = source.index(block, position) + len(block)
+
+
+def test_offsets_point_into_original_text():
+    chunks = list(chunk_text(DOCUMENT, max_chars=120, overlap_chars=30))
+    assert len(chunks) > 2
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    assert_offsets_match(DOCUMENT, chunks)
+
+
+def test_offsets_do_not_depend_on_how_text_is_fed():
+    whole = list(chunk_text(DOCUMENT, max_chars=120, overlap_chars=30))
+    for size in (1, 7, 64):
+        assert list(chunk_text(iter_slices(DOCUMENT, size), max_chars=120, overlap_chars=30)) == whole
+
+
+def test_overlap_repeats_tail_of_previous_chunk():
+    text = "\n\n".join(f"Paragraph {number} of the circular." for number in range(20))
+    chunks = list(chunk_text(text, max_chars=100, overlap_chars=20))
+    assert len(chunks) > 3
+    for previous, chunk in zip(chunks, chunks[1:]):
+        overlap = previous["end"] - chunk["start"]
+        assert 0 < overlap <= 20
+        assert chunk["text"][:overlap] == text[chunk["start"]:previous["end"]] == previous["text"][-overlap:]
+    assert all(len(chunk["text"]) <= 100 for chunk in chunks)
+    assert chunks[-1]["end"] == len(text)
+
+
+def test_long_paragraph_is_cut_at_sentence_ends():
+    text = " ".join(f"word{number}." for number in range(200))
+    chunks = list(chunk_text(text, max_chars=100, overlap_chars=20))
+    assert all(len(chunk["text"]) <= 100 for chunk in chunks)
+    assert_offsets_match(text, chunks)
+    assert all(chunk["text"].endswith(".") for chunk in chunks)
+    assert [chunk["start"] for chunk in chunks] == sorted(chunk["start"] for chunk in chunks)
+    assert chunks[-1]["end"] == len(text)
+
+
+def test_headings_start_chunks_and_label_them():
+    chunks = list(chunk_text(DOCUMENT, max_chars=2000, overlap_chars=0))
+    assert [chunk["heading"] for chunk in chunks] == ["Reserve requirements", "Reporting"]
+    assert "Banks hold reserves" in chunks[0]["text"]
+    assert "Returns are due" in chunks[1]["text"]
+    assert chunks[1]["start"] == DOCUMENT.index("Returns are due")
+
+
+def test_close_flushes_trailing_text_without_newline():
+    chunker = StreamingChunker(max_chars=200, overlap_chars=0)
+    assert chunker.feed("Only one short paragraph") == []
+    chunks = chunker.close()
+    assert [(chunk["text"], chunk["start"], chunk["end"]) for chunk in chunks] == [("Only one short paragraph", 0, 24)]
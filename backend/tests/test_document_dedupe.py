@@ -0,0 +1,54 @@
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def content_hash(db):
+    return db.document_content_hash(f"Circular {uuid.uuid4().hex}")
+
+
+def new_id():
+    return f"doc_{uuid.uuid4().hex}"
+
+
+async def test_same_user_same_classification_is_duplicate(db, make_user, content_hash):
+    user_id = await make_user()
+    first = await db.claim_document(new_id(), "a.txt", "public", user_id, content_hash)
+    again = await db.claim_document(new_id(), "a.txt", "public", user_id, content_hash)
+    assert not first["duplicate"]
+    assert again["duplicate"]
+    assert again["document_id"] == first["document_id"]
+
+
+async def test_other_users_copy_is_never_returned(db, make_user, content_hash):
+    owner, other = await make_user(), await make_user()
+    first = await db.claim_document(new_id(), "a.txt", "confidential", owner, content_hash)
+    second = await db.claim_document(new_id(), "a.txt", "confidential", other, content_hash)
+
+    assert not second["duplicate"]
+    assert second["document_id"] != first["document_id"]
+    assert (await db.get_document_status(second["document_id"]))["uploaded_by"] == other
+
+
+async def test_new_classification_is_ingested_again(db, make_user, content_hash):
+    user_id = await make_user()
+    public = await db.claim_document(new_id(), "a.txt", "public", user_id, content_hash)
+    restricted = await db.claim_document(new_id(), "a.txt", "restricted", user_id, content_hash)
+
+    assert not restricted["duplicate"]
+    assert restricted["replaces"] is None
+    assert (await db.get_document_status(restricted["document_id"]))["classification"] == "restricted"
+    assert (await db.get_document_status(public["document_id"]))["classification"] == "public"
+
+
+async def test_force_replaces_only_own_copy(db, make_user, content_hash):
+    owner, other = await make_user(), await make_user()
+    theirs = await db.claim_document(new_id(), "a.txt", "public", other, content_hash)
+    mine = await db.claim_document(new_id(), "a.txt", "public", owner, content_hash)
+    forced = await db.claim_document(new_id(), "a.txt", "public", owner, content_hash, force=True)
+
+    assert forced["replaces"] == mine["document_id"]
+    assert forced["replaces"] != theirs["document_id"]
+    again = await db.claim_document(new_id(), "a.txt", "public", other, content_hash)
+    assert again["document_id"] == theirs["document_id"]
@@ -0,0 +1,56 @@
+import uuid
+
+import pytest
+
+from database import get_user_identity, invalidate_user_identity, set_user_active, user_identity_cache
+
+
+@pytest.fixture
+def resolve_identity():
+    from main import resolve_identity
+    invalidate_user_identity()
+    yield resolve_identity
+    invalidate_user_identity()
+
+
+async def test_active_user_resolves_from_claims(db, make_user, resolve_identity):
+    username = f"id_{uuid.uuid4().hex[:8]}"
+    user_id = await make_user(username)
+
+    identity = await resolve_identity({"sub": username, "uid": user_id, "role": "user"})
+    assert (identity["id"], identity["username"], identity["is_active"]) == (user_id, username, True)
+    # Older tokens without uid resolve the same way
+    assert (await resolve_identity({"sub": username}))["id"] == user_id
+
+
+async def test_inactive_user_is_rejected_even_with_uid_claim(db, make_user, resolve_identity):
+    username = f"id_{uuid.uuid4().hex[:8]}"
+    user_id = await make_user(username, is_active=False)
+    assert await resolve_identity({"sub": username, "uid": user_id}) is None
+
+
+async def test_deactivation_takes_effect_on_next_request(db, make_user, resolve_identity):
+    username = f"id_{uuid.uuid4().hex[:8]}"
+    user_id = await make_user(username)
+    claims = {"sub": username, "uid": user_id}
+    assert await resolve_identity(claims) is not None  # now cached
+
+    await set_user_active(username, False)
+    assert await resolve_identity(claims) is None
+    # The inactive identity is cached, so repeated requests don't hit the database
+    assert user_identity_cache.get(username)["is_active"] is False
+
+    await set_user_active(username, True)
+    assert await resolve_identity(claims) is not None
+
+
+async def test_uid_of_another_account_is_rejected(db, make_user, resolve_identity):
+    username = f"id_{uuid.uuid4().hex[:8]}"
+    user_id = await make_user(username)
+    assert await resolve_identity({"sub": username, "uid": user_id + 1000}) is None
+
+
+async def test_unknown_user_is_not_cached(db, resolve_identity):
+    assert await get_user_identity("nobody_here") is None
+    assert await resolve_identity({"sub": "nobody_here", "uid": 1}) is None
+    assert "nobody_here" not in user_identity_cache
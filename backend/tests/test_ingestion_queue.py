@@ -0,0 +1,167 @@
+import asyncio
+import uuid
+
+import pytest
+
+import ingestion_queue
+from ingestion_queue import IngestionQueue
+
+
+class FakeVectara:
+    """Blocks every ingestion until released; raises for titles starting with 'bad'"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = []
+
+    async def ingest_document(self, document_id, title, content, metadata=None):
+        self.started.append(document_id)
+        await self.release.wait()
+        if title.startswith("bad"):
+            raise RuntimeError("Vectara rejected the document")
+        return {"document_id": document_id, "parts": [document_id], "sections": 3}
+
+    async def delete_documents(self, document_ids):
+        return []
+
+
+class Content:
+    """File-like upload content that records being closed"""
+
+    def __init__(self, text="Circular text"):
+        self.text = text
+        self.closed = False
+
+    def __iter__(self):
+        return iter([self.text])
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def vectara(monkeypatch):
+    fake = FakeVectara()
+    monkeypatch.setattr(ingestion_queue, "vectara_client", fake)
+    return fake
+
+
+@pytest.fixture
+async def new_document(db, make_user):
+    user_id = await make_user()
+
+    async def make(filename="circular.txt"):
+        document_id = f"doc_{uuid.uuid4().hex}"
+        await db.claim_document(document_id, filename, "public", user_id, uuid.uuid4().hex)
+        return document_id
+    return make
+
+
+async def wait_for(predicate, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+async def test_job_status_is_recorded(db, vectara, new_document):
+    vectara.release.set()
+    queue = IngestionQueue(workers=2)
+    await queue.start()
+    ok, bad = await new_document(), await new_document()
+    queue.submit(ok, "circular", "text", {})
+    queue.submit(bad, "bad circular", "text", {})
+    await wait_for(lambda: queue.processed + queue.failed == 2)
+    await queue.stop()
+
+    processed = await db.get_document_status(ok)
+    assert processed["status"] == "processed"
+    assert processed["section_count"] == 3
+    assert processed["vectara_doc_id"] == ok
+    assert await db.get_document_parts(ok) == [ok]
+    failed = await db.get_document_status(bad)
+    assert failed["status"] == "failed"
+    assert "rejected" in failed["error"]
+    assert queue.stats()["processed"] == 1
+    assert queue.stats()["failed"] == 1
+
+
+async def test_full_queue_rejects_submissions(vectara, new_document):
+    queue = IngestionQueue(workers=1, max_queue_size=1)
+    await queue.start()
+    queue.submit(await new_document(), "running", "text", {})
+    await wait_for(lambda: len(vectara.started) == 1)
+    queue.submit(await new_document(), "queued", "text", {})
+    with pytest.raises(asyncio.QueueFull):
+        queue.submit(await new_document(), "overflow", "text", {})
+    vectara.release.set()
+    await queue.stop()
+
+
+async def test_submit_requires_running_workers():
+    with pytest.raises(RuntimeError):
+        IngestionQueue().submit("doc", "circular", "text", {})
+
+
+async def test_shutdown_finishes_running_jobs_and_fails_queued_ones(db, vectara, new_document):
+    queue = IngestionQueue(workers=1, shutdown_timeout=5)
+    await queue.start()
+    running, queued = await new_document(), await new_document()
+    running_content, queued_content = Content(), Content()
+    queue.submit(running, "running", running_content, {})
+    queue.submit(queued, "queued", queued_content, {})
+    await wait_for(lambda: vectara.started == [running])
+
+    stopping = asyncio.create_task(queue.stop())
+    await asyncio.sleep(0.05)
+    assert not stopping.done()
+    vectara.release.set()
+    await stopping
+
+    assert not queue.running
+    assert vectara.started == [running]
+    assert (await db.get_document_status(running))["status"] == "processed"
+    cancelled = await db.get_document_status(queued)
+    assert cancelled["status"] == "failed"
+    assert "shutdown" in cancelled["error"]
+    assert running_content.closed and queued_content.closed
+
+
+async def test_shutdown_timeout_cancels_running_jobs(db, vectara, new_document):
+    queue = IngestionQueue(workers=1, shutdown_timeout=0.05)
+    await queue.start()
+    stuck = await new_document()
+    queue.submit(stuck, "stuck", "text", {})
+    await wait_for(lambda: vectara.started == [stuck])
+
+    await queue.stop()
+
+    assert not queue.running
+    interrupted = await db.get_document_status(stuck)
+    assert interrupted["status"] == "failed"
+    assert "shutdown" in interrupted["error"]
+
+
+async def test_stale_jobs_are_swept_while_running(db, vectara, new_document):
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+
+    queue = IngestionQueue(workers=1, stale_after=3600, sweep_interval=0.05)
+    await queue.start()
+    # Goes stale after the startup sweep ran; only the periodic sweep can fail it
+    interrupted, recent = await new_document(), await new_document()
+    async with db.AsyncSessionLocal() as session:
+        await session.execute(
+            update(db.Document).filter_by(document_id=interrupted)
+            .values(status="processing", updated_at=datetime.utcnow() - timedelta(hours=2))
+        )
+        await session.commit()
+
+    await asyncio.sleep(0.2)
+    await queue.stop()
+
+    swept = await db.get_document_status(interrupted)
+    assert swept["status"] == "failed"
+    assert "interrupted" in swept["error"]
+    assert (await db.get_document_status(recent))["status"] == "queued"
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from intent_router import IntentRouter, KeywordTrie
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter()
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("Hello!", "greeting"),
+    ("good morning", "greeting"),
+    ("السلام عليكم", "greeting"),
+    ("What was my question earlier?", "history_recall"),
+    ("Do you remember what I asked?", "history_recall"),
+    ("ماذا سألت", "history_recall"),
+    ("What are the loan limits?", "banking_topic"),
+    ("Explain the regulations for banks", "banking_topic"),
+    ("ما هي شروط القروض", "banking_topic"),
+    ("What is the weather like today?", None),
+])
+def test_route_picks_first_matching_rule(router, message, intent):
+    assert router.route(message).intent == intent
+
+
+def test_max_words_limits_greetings_to_short_messages(router):
+    match = router.route("hello, what are the interest rates on loans for small businesses?")
+    assert match.intent == "banking_topic"
+    assert match.matched("greeting")
+
+
+def test_keywords_match_whole_words_only(router):
+    # "hi" inside "this"/"within" and "bank" inside "sandbank" must not match
+    match = router.route("this is within the sandbank")
+    assert match.intent is None
+    assert match.keywords == {}
+
+
+def test_prefix_keywords_match_word_starts(router):
+    match = router.route("Banking and lending regulatory frameworks")
+    assert match.keywords["banking_topic"] == ["bank", "regulatory"]
+
+
+def test_arabic_article_and_spelling_variants(router):
+    # Definite article stripped (البنك -> بنك), alef variants folded (اهلا / أهلا)
+    assert router.route("البنك المركزي").matched("banking_topic")
+    assert router.route("اهلا").intent == "greeting"
+
+
+def test_phrase_requires_consecutive_words(router):
+    assert router.route("how are you").matched("greeting")
+    assert not router.route("how many loans are you offering").matched("greeting")
+
+
+def test_overlapping_phrases_are_all_reported():
+    trie = KeywordTrie()
+    trie.add(["reserve"], "one")
+    trie.add(["reserve", "requirement"], "two")
+    trie.add(["requirement"], "three")
+    assert sorted(trie.find("Reserve requirement")) == ["one", "three", "two"]
+
+
+def test_keywords_in_collects_distinct_keywords(router):
+    texts = ["loan rates", "more about loans and credit", "hello"]
+    assert router.keywords_in(texts, "banking_topic") == ["loan", "credit"]
+
+
+def test_memo_does_not_change_results():
+    trie = KeywordTrie(memo_size=2)
+    trie.add(["loan"], "loan", prefix=True)
+    for _ in range(3):
+        assert list(trie.find("Loans, loans; LOANS")) == ["loan", "loan", "loan"]
+        assert list(trie.find("a b c d")) == []
+
+
+def test_rules_from_file(tmp_path):
+    rules = [{"intent": "fx", "keywords": ["exchange rate*", "forex"]}]
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    router = IntentRouter.from_file(str(path))
+    assert router.route("What is the forex position?").intent == "fx"
+    assert router.keyword_count == 2
@@ -0,0 +1,128 @@
+import pytest
+
+from knowledge_base import BM25Index, KnowledgeBase, parse_sections
+
+KB_MARKDOWN = """# Conversational Knowledge Base
+
+## What is the reserve requirement for commercial banks?
+Commercial banks must keep 5% of customer deposits as reserves with the Central Bank of Oman.
+
+## How do I open a savings account?
+Visit any licensed bank branch with your civil ID and proof of address to open a savings account.
+
+## What are the Central Bank office hours?
+The Central Bank of Oman is open Sunday to Thursday from 7:30 to 14:30.
+
+## How are Islamic windows supervised?
+Islamic windows of conventional banks follow the Islamic Banking Regulatory Framework.
+
+Q: What is the maximum consumer loan for salaried borrowers?
+A: Personal loans are capped at 50% of monthly salary in total instalments.
+
+## ما هي ساعات عمل البنك المركزي؟
+يعمل البنك المركزي العماني من الأحد إلى الخميس.
+"""
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    path = tmp_path / "kb.md"
+    path.write_text(KB_MARKDOWN, encoding="utf-8")
+    kb = KnowledgeBase(str(path), min_score=0.6, min_term_share=0.6)
+    assert kb.load() == 6
+    return kb
+
+
+def test_parse_sections_reads_headings_and_q_a_lines():
+    sections = parse_sections(KB_MARKDOWN)
+    loan = next(section for section in sections if "consumer loan" in section["question"])
+    assert loan["answer"] == "Personal loans are capped at 50% of monthly salary in total instalments."
+    assert loan["section"] == "How are Islamic windows supervised?"
+    # The top-level heading has no body and is not a section
+    assert all(section["question"] != "Conversational Knowledge Base" for section in sections)
+
+
+def test_exact_question_is_answered(knowledge_base):
+    match = knowledge_base.answer("What is the reserve requirement for commercial banks?")
+    assert match["question"] == "What is the reserve requirement for commercial banks?"
+    assert match["coverage"] == 1.0 and match["term_share"] == 1.0
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("reserve requirements of commercial banks", "What is the reserve requirement for commercial banks?"),
+    ("opening a savings account", "How do I open a savings account?"),
+    ("Central Bank office hours", "What are the Central Bank office hours?"),
+    ("maximum consumer loan for a salaried borrower", "What is the maximum consumer loan for salaried borrowers?"),
+    ("متى ساعات عمل البنك المركزي", "ما هي ساعات عمل البنك المركزي؟"),
+])
+def test_paraphrase_is_answered(knowledge_base, question, expected):
+    match = knowledge_base.answer(question)
+    assert match is not None and match["question"] == expected
+
+
+@pytest.mark.parametrize("question", [
+    "What is the mortgage requirement?",
+    "football windows",
+    "savings account",
+])
+def test_partial_overlap_is_not_answered(knowledge_base, question):
+    assert knowledge_base.answer(question) is None
+
+
+@pytest.mark.parametrize("question, near_miss", [
+    # Most words match a section, but the one that changes the question does not
+    ("How do I close a savings account?", 1),
+    ("How do I open a current account?", 1),
+    ("What is the reserve requirement for Islamic banks?", 0),
+    ("maximum mortgage loan for salaried borrowers", 4),
+])
+def test_near_miss_question_falls_through_to_vectara(knowledge_base, question, near_miss):
+    (_, coverage, doc_id), *_ = knowledge_base.index.search(knowledge_base._tokens(question))
+    assert doc_id == near_miss and coverage >= knowledge_base.min_score
+    assert knowledge_base.answer(question) is None
+
+
+@pytest.mark.parametrize("question", [
+    "What time does the football match start?",
+    "Can I get a mortgage for a house in Muscat?",
+    "",
+])
+def test_unrelated_question_is_not_answered(knowledge_base, question):
+    assert knowledge_base.answer(question) is None
+
+
+def test_coverage_is_relative_to_reference_text():
+    index = BM25Index(
+        [["reserve", "reserve", "reserve", "bank", "deposit"], ["savings", "account"]],
+        references=[["reserve", "bank"], ["savings", "account"]]
+    )
+    (_, partial, doc_id), = index.search(["reserve"], limit=1)
+    assert doc_id == 0 and partial < 0.8
+    (_, full, _), = index.search(["reserve", "bank"], limit=1)
+    assert full == pytest.approx(1.0)
+
+
+def test_missing_rare_terms_include_unknown_words():
+    index = BM25Index([["bank", "reserve"], ["bank", "savings"], ["bank", "loan"]])
+    assert index.missing_rare_terms({"bank", "reserve", "close"}, 0, common_share=0.5) == {"close"}
+    assert index.missing_rare_terms({"bank", "savings"}, 0, common_share=0.5) == {"savings"}
+
+
+def test_bm25_ranks_rarer_term_matches_higher():
+    index = BM25Index([["bank", "loan"], ["bank", "reserve"], ["bank", "savings"]])
+    ranked = index.search(["bank", "reserve"], limit=3)
+    assert ranked[0][2] == 1
+    assert index.idf("reserve") > index.idf("bank")
+
+
+def test_stats_count_hits_and_misses(knowledge_base):
+    knowledge_base.answer("How do I open a savings account?")
+    knowledge_base.answer("football windows")
+    stats = knowledge_base.stats()
+    assert (stats["hits"], stats["misses"], stats["sections"]) == (1, 1, 6)
+
+
+def test_missing_file_disables_local_answers(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "missing.md"))
+    assert kb.load() == 0
+    assert kb.answer("What is the reserve requirement?") is None
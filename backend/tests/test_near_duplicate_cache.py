@@ -0,0 +1,80 @@
+import pytest
+
+from near_duplicate_cache import NearDuplicateCache, fingerprint_tokens, hamming_distance, simhash
+from text_normalization import normalize_text
+
+SCOPE = ("corpus", "en", "", 5)
+
+
+@pytest.fixture
+def cache():
+    return NearDuplicateCache(max_distance=3, max_entries=100, ttl_seconds=600)
+
+
+def test_arabic_folding_and_punctuation():
+    assert normalize_text("ما هي متطلبات الإحتياطي؟") == normalize_text("ما هى متطلبات الاحتياطى")
+    assert normalize_text("Reserve  Requirements!") == "reserve requirements"
+
+
+def test_rephrasing_with_stopwords_and_case_is_a_hit(cache):
+    cache.set(SCOPE, "What are the reserve requirements for commercial banks?", "answer")
+    assert cache.get(SCOPE, "what are reserve requirements for the Commercial Banks") == "answer"
+
+
+def test_arabic_variant_spelling_is_a_hit(cache):
+    cache.set(SCOPE, "ما هي متطلبات الاحتياطي للبنوك التجارية؟", "answer")
+    assert cache.get(SCOPE, "ما هى متطلبات الإحتياطى للبنوك التجارية") == "answer"
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Can banks charge fees on savings accounts?", "Can banks not charge fees on savings accounts?"),
+    ("Banks must report liquidity monthly", "Banks must not report liquidity monthly"),
+    ("Is there a fee for early repayment?", "Is there no fee for early repayment?"),
+    ("هل يمكن للبنوك فرض رسوم على حسابات التوفير؟", "هل لا يمكن للبنوك فرض رسوم على حسابات التوفير؟"),
+])
+def test_negated_question_is_not_a_duplicate(cache, cached, asked):
+    cache.set(SCOPE, cached, "answer")
+    assert cache.get(SCOPE, asked) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("When was the reserve requirement changed?", "Why was the reserve requirement changed?"),
+    ("Who approves the capital adequacy report?", "How is the capital adequacy report approved?"),
+    ("Can banks charge fees on savings accounts?", "Must banks charge fees on savings accounts?"),
+    ("متى تم تغيير متطلبات الاحتياطي؟", "لماذا تم تغيير متطلبات الاحتياطي؟"),
+])
+def test_different_question_word_or_modal_is_not_a_duplicate(cache, cached, asked):
+    cache.set(SCOPE, cached, "answer")
+    assert cache.get(SCOPE, asked) is None
+
+
+def test_meaning_words_reach_the_fingerprint():
+    plain = simhash(fingerprint_tokens("Can banks charge fees on savings accounts?"))
+    negated = simhash(fingerprint_tokens("Can banks not charge fees on savings accounts?"))
+    assert "not" in fingerprint_tokens("Can banks not charge fees on savings accounts?")
+    assert hamming_distance(plain, negated) > 0
+
+
+def test_scope_separates_entries(cache):
+    cache.set(SCOPE, "reserve requirements for banks", "en answer")
+    assert cache.get(("corpus", "ar", "", 5), "reserve requirements for banks") is None
+
+
+def test_invalidate_by_scope(cache):
+    cache.set(SCOPE, "reserve requirements for banks", "a")
+    cache.set(("other", "en", "", 5), "reserve requirements for banks", "b")
+    assert cache.invalidate(lambda scope: scope[0] == "corpus") == 1
+    assert cache.get(SCOPE, "reserve requirements for banks") is None
+    assert cache.get(("other", "en", "", 5), "reserve requirements for banks") == "b"
+
+
+def test_stopword_only_question_is_not_cached(cache):
+    cache.set(SCOPE, "is it the?", "answer")
+    assert cache.get(SCOPE, "is it the?") is None
+    assert len(cache._entries) == 0
+
+
+def test_disabled_with_negative_distance():
+    cache = NearDuplicateCache(max_distance=-1)
+    cache.set(SCOPE, "reserve requirements", "answer")
+    assert cache.get(SCOPE, "reserve requirements") is None
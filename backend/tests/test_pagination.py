@@ -0,0 +1,105 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    position = (datetime(2026, 3, 1, 12, 30, 15, 123456), 42)
+    assert decode_cursor(encode_cursor(*position)) == position
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(datetime(2026, 3, 1), 7)
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm90aGluZw", encode_cursor(datetime(2026, 3, 1), 1)[:-3]])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+async def _sessions_with_messages(db, user_id, count, same_time=False):
+    """Sessions whose last activity is unique per session (or shared when same_time)"""
+    base = datetime(2026, 1, 1)
+    conversation_ids = []
+    async with db.AsyncSessionLocal() as session:
+        for index in range(count):
+            conversation_id = f"page_{uuid.uuid4().hex}"
+            activity = base if same_time else base + timedelta(minutes=index)
+            session.add(db.ChatSession(conversation_id=conversation_id, user_id=user_id, created_at=base, last_activity=activity))
+            session.add(db.ChatMessage(
+                conversation_id=conversation_id, user_message=f"question {index}", ai_response="answer",
+                language="en", created_at=activity
+            ))
+            conversation_ids.append(conversation_id)
+        await session.commit()
+    return conversation_ids
+
+
+async def _all_session_pages(db, user_id, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = await db.list_chat_sessions_page(user_id, limit=limit, cursor=cursor)
+        pages.append([row.ChatSession.conversation_id for row in rows])
+        if cursor is None:
+            return pages
+
+
+async def test_session_pages_cover_every_session_once_newest_first(db, make_user):
+    user_id = await make_user()
+    conversation_ids = await _sessions_with_messages(db, user_id, 7)
+
+    pages = await _all_session_pages(db, user_id, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [cid for page in pages for cid in page] == list(reversed(conversation_ids))
+
+
+async def test_session_pages_break_timestamp_ties_by_id(db, make_user):
+    user_id = await make_user()
+    conversation_ids = await _sessions_with_messages(db, user_id, 5, same_time=True)
+
+    flattened = [cid for page in await _all_session_pages(db, user_id, limit=2) for cid in page]
+    assert sorted(flattened) == sorted(conversation_ids)
+    assert len(flattened) == len(set(flattened))
+
+
+async def test_session_page_rows_carry_first_message_and_count(db, make_user):
+    user_id = await make_user()
+    (conversation_id,) = await _sessions_with_messages(db, user_id, 1)
+    await db.save_chat_message(conversation_id, "follow-up", "answer")
+
+    rows, cursor = await db.list_chat_sessions_page(user_id, limit=10)
+    assert cursor is None
+    assert (rows[0].first_message, rows[0].message_count) == ("question 0", 2)
+
+
+async def test_exact_page_size_has_no_next_cursor(db, make_user):
+    user_id = await make_user()
+    await _sessions_with_messages(db, user_id, 3)
+    rows, cursor = await db.list_chat_sessions_page(user_id, limit=3)
+    assert len(rows) == 3 and cursor is None
+
+
+async def test_message_pages_are_chronological_and_owner_only(db, make_user):
+    owner, stranger = await make_user(), await make_user()
+    conversation_id = f"page_{uuid.uuid4().hex}"
+    await db.create_chat_session(conversation_id, owner)
+    base = datetime(2026, 1, 1)
+    await db.save_chat_messages_batch([
+        {"conversation_id": conversation_id, "user_message": f"q{index}", "ai_response": "a",
+         "created_at": base + timedelta(seconds=index // 2)}  # pairs share a timestamp
+        for index in range(5)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        messages, cursor = await db.list_chat_messages_page(conversation_id, owner, limit=2, cursor=cursor)
+        seen.extend(message.user_message for message in messages)
+        if cursor is None:
+            break
+    assert seen == [f"q{index}" for index in range(5)]
+    assert await db.list_chat_messages_page(conversation_id, stranger, limit=2) is None
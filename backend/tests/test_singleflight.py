@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+class Upstream:
+    """Counts calls and blocks until released"""
+
+    def __init__(self, result="answer", error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    upstream = Upstream()
+    callers = [asyncio.create_task(flight.do("key", upstream)) for _ in range(5)]
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    results = await asyncio.gather(*callers)
+    assert upstream.calls == 1
+    assert [result for result, _ in results] == ["answer"] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+async def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    upstream = Upstream()
+    upstream.release.set()
+    await asyncio.gather(flight.do("a", upstream), flight.do("b", upstream))
+    assert upstream.calls == 2
+
+
+async def test_error_reaches_every_caller_and_is_not_cached():
+    flight = SingleFlight()
+    failing = Upstream(error=RuntimeError("upstream down"))
+    callers = [asyncio.create_task(flight.do("key", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    failing.release.set()
+
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    healthy = Upstream()
+    healthy.release.set()
+    assert await flight.do("key", healthy) == ("answer", False)
+
+
+async def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    upstream = Upstream()
+    leader = asyncio.create_task(flight.do("key", upstream))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", upstream))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    upstream.release.set()
+
+    assert await follower == ("answer", True)
+    assert upstream.calls == 1
+
+
+async def test_call_outlives_all_cancelled_callers_and_is_then_forgotten():
+    flight = SingleFlight()
+    upstream = Upstream()
+    callers = [asyncio.create_task(flight.do("key", upstream)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    assert flight.stats()["in_flight"] == 1
+
+    upstream.release.set()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert flight.stats()["in_flight"] == 0
+    assert upstream.calls == 1
+
@@ -0,0 +1,64 @@
+import io
+import json
+import logging
+
+import pytest
+import structlog
+
+import structured_logging
+from structured_logging import Payload, configure_logging, get_logger, shutdown_logging
+
+
+@pytest.fixture
+def reconfigure(monkeypatch):
+    """Configure logging from scratch inside the test; restore the suite's configuration afterwards"""
+    shutdown_logging()
+    yield
+    shutdown_logging()
+    monkeypatch.undo()
+    configure_logging()
+
+
+def captured_output():
+    """Swap the writer thread's stream for a buffer"""
+    buffer = io.StringIO()
+    for handler in structured_logging._listener.handlers:
+        handler.setStream(buffer)
+    return buffer
+
+
+def test_settings_are_read_when_configuring_not_at_import(reconfigure, monkeypatch):
+    # Set after the module was imported, as load_dotenv() does
+    monkeypatch.setenv("LOG_LEVEL", "WARNING")
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    monkeypatch.setenv("LOG_QUEUE_SIZE", "5")
+    monkeypatch.setenv("LOG_PAYLOAD_SAMPLE_RATE", "1")
+    monkeypatch.setenv("LOG_PAYLOAD_SAMPLING", "noisy=0")
+    monkeypatch.setenv("LOG_PAYLOAD_MAX_CHARS", "10")
+    structlog.reset_defaults()
+    configure_logging()
+
+    assert logging.getLogger().level == logging.WARNING
+    assert structured_logging._handler.queue.maxsize == 5
+    sampler = structured_logging.payload_sampler
+    assert (sampler.default_rate, sampler.rates, sampler.max_chars) == (1.0, {"noisy": 0.0}, 10)
+
+    buffer = captured_output()
+    logger = get_logger("test_structured_logging")
+    logger.info("hidden")
+    logger.warning("shown", body=Payload({"text": "x" * 50}))
+    shutdown_logging()
+
+    lines = buffer.getvalue().splitlines()
+    assert len(lines) == 1
+    event = json.loads(lines[0])
+    assert event["event"] == "shown"
+    assert event["level"] == "warning"
+    assert event["body"].startswith('{"text": "') and event["body"].endswith("(62 chars)")
+
+
+def test_explicit_arguments_override_environment(reconfigure, monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "WARNING")
+    structlog.reset_defaults()
+    configure_logging(level="debug")
+    assert logging.getLogger().level == logging.DEBUG
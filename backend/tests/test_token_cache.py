@@ -0,0 +1,83 @@
+import pytest
+
+from tests.conftest import FakeClock
+from token_cache import VerifiedTokenCache
+
+
+@pytest.fixture
+def wall_clock():
+    return FakeClock(now=1_700_000_000.4)
+
+
+@pytest.fixture
+def tokens(wall_clock):
+    return VerifiedTokenCache(max_entries=100, max_ttl_seconds=3600, max_revocations=100, max_token_lifetime=86400, clock=wall_clock)
+
+
+def claims(wall_clock, sub="user1", lifetime=86400):
+    issued = int(wall_clock.now)
+    return {"sub": sub, "iat": issued, "exp": issued + lifetime}
+
+
+def test_verified_token_is_served_from_cache(tokens, wall_clock):
+    token_claims = claims(wall_clock)
+    tokens.add("t1", token_claims)
+    assert tokens.get("t1") == token_claims
+    assert tokens.get("unknown") is None
+
+
+def test_cache_lifetime_is_bounded_by_max_ttl_and_token_exp(tokens, wall_clock):
+    assert tokens._ttl(claims(wall_clock, lifetime=86400)) == 3600
+    short = claims(wall_clock, lifetime=60)
+    assert tokens._ttl(short) == pytest.approx(short["exp"] - wall_clock.now)
+
+
+def test_expired_token_is_not_cached(tokens, wall_clock):
+    expired = claims(wall_clock, lifetime=-1)
+    tokens.add("t1", expired)
+    assert tokens.get("t1") is None
+
+
+def test_revoke_token_denylists_only_that_token(tokens, wall_clock):
+    first, second = claims(wall_clock), claims(wall_clock)
+    tokens.add("t1", first)
+    tokens.add("t2", second)
+
+    tokens.revoke_token("t1", first)
+    assert tokens.get("t1") is None
+    assert tokens.is_revoked("t1", first)
+    assert tokens.get("t2") == second
+    assert not tokens.is_revoked("t2", second)
+
+
+def test_revoke_user_covers_tokens_issued_earlier_in_the_same_second(tokens, wall_clock):
+    issued_this_second = claims(wall_clock)  # iat truncated to the current second
+    tokens.add("t1", issued_this_second)
+
+    wall_clock.advance(0.5)  # still the same second
+    tokens.revoke_user("user1")
+    assert tokens.get("t1") is None
+    assert tokens.is_revoked("t1", issued_this_second)
+
+
+def test_revoke_user_accepts_tokens_from_the_next_second(tokens, wall_clock):
+    tokens.revoke_user("user1")
+    wall_clock.advance(1)
+    fresh = claims(wall_clock)
+    assert not tokens.is_revoked("t2", fresh)
+    tokens.add("t2", fresh)
+    assert tokens.get("t2") == fresh
+
+
+def test_revoke_user_leaves_other_users_alone(tokens, wall_clock):
+    other = claims(wall_clock, sub="admin")
+    tokens.add("t1", other)
+    tokens.revoke_user("user1")
+    assert tokens.get("t1") == other
+
+
+def test_token_revocation_survives_disabled_verified_cache(wall_clock):
+    tokens = VerifiedTokenCache(max_entries=0, max_ttl_seconds=3600, max_revocations=100, max_token_lifetime=86400, clock=wall_clock)
+    token_claims = claims(wall_clock)
+    tokens.revoke_token("t1", token_claims)
+    assert tokens.is_revoked("t1", token_claims)
@@ -0,0 +1,84 @@
+from ttl_cache import TTLCache
+
+
+def test_get_returns_value_until_ttl_expires(clock):
+    cache = TTLCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+
+    clock.advance(59.9)
+    assert cache.get("a") == 1
+
+    clock.advance(0.1)
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    cache = TTLCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.set("short", 1, ttl=5)
+    cache.set("skipped", 2, ttl=0)
+
+    clock.advance(5)
+    assert cache.get("short") is None
+    assert "skipped" not in cache
+
+
+def test_lru_eviction_keeps_recently_used_entries(clock):
+    removed = []
+    cache = TTLCache(max_entries=2, ttl_seconds=60, clock=clock, on_remove=lambda key, value: removed.append(key))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+    assert removed == ["b"]
+
+
+def test_overwrite_refreshes_expiry(clock):
+    cache = TTLCache(max_entries=10, ttl_seconds=10, clock=clock)
+    cache.set("a", 1)
+    clock.advance(8)
+    cache.set("a", 2)
+    clock.advance(8)
+    assert cache.get("a") == 2
+
+
+def test_invalidate_pop_and_clear_notify_on_remove(clock):
+    removed = []
+    cache = TTLCache(max_entries=10, ttl_seconds=60, clock=clock, on_remove=lambda key, value: removed.append((key, value)))
+    cache.set(("corpus1", "q1"), "x")
+    cache.set(("corpus1", "q2"), "y")
+    cache.set(("corpus2", "q1"), "z")
+
+    assert cache.invalidate(lambda key: key[0] == "corpus1") == 2
+    assert cache.pop(("corpus2", "q1")) == "z"
+    assert cache.pop("missing") is None
+    assert sorted(removed) == [(("corpus1", "q1"), "x"), (("corpus1", "q2"), "y"), (("corpus2", "q1"), "z")]
+
+    cache.set("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.invalidations == 4
+
+
+def test_disabled_cache_stores_nothing(clock):
+    for cache in (TTLCache(0, 60, clock=clock), TTLCache(10, 0, clock=clock)):
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+def test_stats_hit_ratio(clock):
+    cache = TTLCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == round(2 / 3, 4)
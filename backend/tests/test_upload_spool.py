@@ -0,0 +1,66 @@
+import functools
+
+import httpx
+import pytest
+
+from upload_spool import UploadError, receive_body
+
+
+class StreamingRequest:
+    """The parts of a Starlette request receive_body reads"""
+
+    def __init__(self, blocks, headers=None):
+        self.blocks = blocks
+        self.headers = headers or {}
+        self.read = 0
+
+    async def stream(self):
+        for block in self.blocks:
+            self.read += 1
+            yield block
+
+
+async def test_body_within_limit_is_returned():
+    request = StreamingRequest([b'{"documents": ', b"[]}"])
+    assert await receive_body(request, max_bytes=100) == b'{"documents": []}'
+
+
+async def test_declared_oversize_body_is_refused_before_reading():
+    request = StreamingRequest([b"x" * 10], headers={"content-length": "101"})
+    with pytest.raises(UploadError) as raised:
+        await receive_body(request, max_bytes=100)
+    assert raised.value.status_code == 413
+    assert request.read == 0
+
+
+async def test_streamed_body_stops_at_limit():
+    # No (or a lying) Content-Length: reading stops at the first block past the limit
+    request = StreamingRequest([b"x" * 60] * 10, headers={"content-length": "10"})
+    with pytest.raises(UploadError) as raised:
+        await receive_body(request, max_bytes=100)
+    assert raised.value.status_code == 413
+    assert request.read == 2
+
+
+async def test_bulk_json_upload_over_limit_is_rejected(migrated_database, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "receive_body", functools.partial(receive_body, max_bytes=100))
+    main.app.dependency_overrides[main.get_current_identity] = lambda: {"id": 1, "username": "admin"}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            async def body():
+                for _ in range(10):
+                    yield b" " * 60
+
+            response = await client.post(
+                "/documents/bulk", content=body(), headers={"Content-Type": "application/json"}
+            )
+            assert response.status_code == 413
+
+            response = await client.post(
+                "/documents/bulk", content=b"{" + b" " * 200 + b"}", headers={"Content-Type": "application/json"}
+            )
+            assert response.status_code == 413
+    finally:
+        main.app.dependency_overrides.clear()
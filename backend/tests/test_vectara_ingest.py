@@ -0,0 +1,117 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+import pytest
+
+import vectara_client as vectara_module
+from vectara_client import VectaraClient
+
+# Paragraphs too long to share a chunk, so each becomes its own section
+PARAGRAPH = " ".join(["Banks hold reserves with the Central Bank of Oman."] * 25)
+DOCUMENT = "\n\n".join(f"{number}. {PARAGRAPH}" for number in range(5))
+
+
+class FakeCorpus:
+    """Indexed document ids, with the upload number that fails (1-based) if any"""
+
+    def __init__(self, fail_index_call=None):
+        self.documents = set()
+        self.index_calls = 0
+        self.fail_index_call = fail_index_call
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.path == "/v1/index":
+            self.index_calls += 1
+            if self.index_calls == self.fail_index_call:
+                return httpx.Response(503, json={"error": "unavailable"})
+            self.documents.add(body["document"]["document_id"])
+            return httpx.Response(200, json={"status": {"code": "OK"}})
+        if request.url.path == "/v1/delete-doc":
+            self.documents.discard(body["document_id"])
+            return httpx.Response(200, json={})
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def corpus():
+    return FakeCorpus()
+
+
+@pytest.fixture
+async def client(corpus, monkeypatch):
+    # One section per upload so every paragraph becomes its own part
+    monkeypatch.setattr(vectara_module, "VECTARA_INGEST_BATCH_SECTIONS", 1)
+    vectara = VectaraClient()
+    vectara.mock_mode = False
+    vectara.customer_id = vectara.corpus_id = "1"
+    vectara._client = httpx.AsyncClient(transport=httpx.MockTransport(corpus.handler))
+    yield vectara
+    await vectara.aclose()
+
+
+async def test_split_document_reports_every_part(client, corpus):
+    result = await client.ingest_document("doc", "Circular", DOCUMENT)
+    assert result["parts"] == sorted(corpus.documents)
+    assert len(result["parts"]) > 1
+    assert all(part.startswith("doc__part") for part in result["parts"])
+
+
+async def test_small_document_is_indexed_under_its_own_id(client, corpus):
+    result = await client.ingest_document("doc", "Circular", "One paragraph.")
+    assert result["parts"] == ["doc"]
+    assert corpus.documents == {"doc"}
+
+
+async def test_failed_upload_removes_parts_already_indexed(client, corpus):
+    corpus.fail_index_call = 3
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.ingest_document("doc", "Circular", DOCUMENT)
+    assert corpus.index_calls == 3
+    assert corpus.documents == set()
+
+
+async def test_delete_documents_reports_failures(client, corpus):
+    await client.ingest_document("doc", "Circular", DOCUMENT)
+    parts = sorted(corpus.documents)
+
+    def failing_handler(request):
+        if json.loads(request.content)["document_id"] == parts[0]:
+            return httpx.Response(500)
+        return corpus.handler(request)
+
+    await client.aclose()
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(failing_handler))
+    assert await client.delete_documents(parts) == [parts[0]]
+    assert corpus.documents == {parts[0]}
+
+
+async def test_reingested_copy_removes_replaced_parts(db, make_user, client, corpus, monkeypatch):
+    import ingestion_queue
+
+    monkeypatch.setattr(ingestion_queue, "vectara_client", client)
+    user_id = await make_user()
+    content_hash = db.document_content_hash(f"{DOCUMENT} {uuid.uuid4().hex}")
+
+    first = f"doc_{uuid.uuid4().hex}"
+    await db.claim_document(first, "circular.txt", "public", user_id, content_hash)
+    result = await client.ingest_document(first, "Circular", DOCUMENT)
+    await db.update_document_status(first, "processed", vectara_doc_id=first, vectara_parts=result["parts"])
+    assert await db.get_document_parts(first) == result["parts"]
+
+    second = f"doc_{uuid.uuid4().hex}"
+    claim = await db.claim_document(second, "circular.txt", "public", user_id, content_hash, force=True)
+    assert claim["replaces"] == first
+
+    queue = ingestion_queue.IngestionQueue(workers=1)
+    await queue.start()
+    queue.submit(second, "Circular", DOCUMENT, {}, replaces=claim["replaces"])
+    while (await db.get_document_status(first))["status"] != "replaced":
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+    assert corpus.documents and all(part.startswith(f"{second}__part") for part in corpus.documents)
+    assert await db.get_document_parts(first) == []
+    assert await db.get_document_parts(second) == sorted(corpus.documents)
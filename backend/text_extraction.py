@@ -0,0 +1,231 @@
+"""
+Text extraction for CBO Banking App PoC
+PDF and DOCX parsing runs in a process pool so CPU-bound work never blocks the event loop
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, List, Optional, Tuple
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "2"))
+# Worker processes are replaced after this many tasks, bounding leaks in the parsers
+EXTRACT_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACT_MAX_TASKS_PER_CHILD", "50"))
+# Wall-clock budget for extracting one file
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "120"))
+# PDF pages parsed per task; results stream back one range at a time
+EXTRACT_PAGES_PER_TASK = int(os.getenv("EXTRACT_PAGES_PER_TASK", "10"))
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "5000"))
+
+PDF = "pdf"
+DOCX = "docx"
+
+
+class ExtractionError(Exception):
+    """The file could not be turned into text (unsupported, corrupt, too large or too slow)"""
+
+
+def detect_format(filename: str, content_type: Optional[str], head: bytes) -> Optional[str]:
+    """PDF or DOCX from magic bytes, file extension and declared content type; None for anything else"""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if head.startswith(b"%PDF-"):
+        return PDF
+    if head.startswith(b"PK\x03\x04") and (
+        name.endswith(".docx") or "officedocument.wordprocessingml" in content_type
+    ):
+        return DOCX
+    return None
+
+
+# Worker-process functions: module level so they can be pickled
+
+def _pdf_page_count(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _pdf_pages(path: str, start: int, end: int) -> List[str]:
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    return [(reader.pages[number].extract_text() or "") for number in range(start, end)]
+
+
+def _docx_blocks(path: str) -> List[str]:
+    """Paragraph texts in order; heading styles become markdown headings for the chunker"""
+    from docx import Document
+    blocks = []
+    for paragraph in Document(path).paragraphs:
+        text = paragraph.text.strip()
+        if not text:
+            continue
+        style = paragraph.style.name if paragraph.style is not None else ""
+        if style.startswith("Heading") and style[7:].strip().isdigit():
+            text = "#" * min(int(style[7:].strip()), 6) + " " + text
+        elif style == "Title":
+            text = "# " + text
+        blocks.append(text)
+    return blocks
+
+
+class TextExtractor:
+    """
+    Process pool for document parsing. Pages stream back in order as ranges finish; a file that
+    exceeds its time budget gets the worker processes killed and the pool rebuilt (files being
+    parsed alongside it fail as well).
+    """
+
+    def __init__(
+        self,
+        workers: int = EXTRACT_WORKERS,
+        max_tasks_per_child: int = EXTRACT_MAX_TASKS_PER_CHILD,
+        timeout: float = EXTRACT_TIMEOUT_SECONDS,
+        pages_per_task: int = EXTRACT_PAGES_PER_TASK
+    ):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.pages_per_task = max(1, pages_per_task)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.files = 0
+        self.pages = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and DB pools is not safe
+            import multiprocessing
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self._pool
+
+    def _restart_pool(self) -> None:
+        """Kill the worker processes (a stuck parser cannot be cancelled) and start fresh on next use"""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        self.restarts += 1
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+
+    async def _call(self, deadline: float, function, *args):
+        loop = asyncio.get_running_loop()
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._get_pool(), function, *args), remaining)
+        except BrokenProcessPool:
+            self._restart_pool()
+            raise ExtractionError("Extraction worker crashed")
+
+    async def extract(self, path: str, kind: str) -> AsyncIterator[str]:
+        """Yield the document's text page by page (PDF) or in paragraph groups (DOCX)"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        self.files += 1
+        try:
+            if kind == PDF:
+                async for text in self._extract_pdf(path, deadline):
+                    yield text
+            elif kind == DOCX:
+                blocks = await self._call(deadline, _docx_blocks, path)
+                for start in range(0, len(blocks), 50):
+                    yield "\n\n".join(blocks[start:start + 50]) + "\n\n"
+            else:
+                raise ExtractionError(f"Unsupported document format: {kind}")
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.failures += 1
+            self._restart_pool()
+            logger.error(f"Text extraction of {path} exceeded {self.timeout}s")
+            raise ExtractionError(f"Text extraction exceeded {self.timeout:g} seconds")
+        except ImportError as e:
+            self.failures += 1
+            raise ExtractionError(f"{kind.upper()} support is not installed: {str(e)}")
+        except ExtractionError:
+            self.failures += 1
+            raise
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Text extraction of {path} failed: {str(e)}")
+            raise ExtractionError(f"Could not read {kind.upper()} file: {str(e)}")
+
+    async def _extract_pdf(self, path: str, deadline: float) -> AsyncIterator[str]:
+        page_count = await self._call(deadline, _pdf_page_count, path)
+        if page_count > EXTRACT_MAX_PAGES:
+            raise ExtractionError(f"PDF has {page_count} pages; the limit is {EXTRACT_MAX_PAGES}")
+
+        ranges: List[Tuple[int, int]] = [
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        ]
+        # Keep every worker busy, but never more than one range per worker ahead of the consumer
+        pending: List[asyncio.Task] = []
+        next_range = 0
+        try:
+            while next_range < len(ranges) or pending:
+                while next_range < len(ranges) and len(pending) < self.workers:
+                    start, end = ranges[next_range]
+                    pending.append(asyncio.create_task(self._call(deadline, _pdf_pages, path, start, end)))
+                    next_range += 1
+                pages = await pending.pop(0)
+                self.pages += len(pages)
+                for text in pages:
+                    if text.strip():
+                        yield text.rstrip() + "\n\n"
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "files": self.files,
+            "pages": self.pages,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "pool_restarts": self.restarts
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class ExtractedDocument:
+    """
+    Job content for a PDF/DOCX upload: iterating it extracts the spooled file's text in the
+    process pool. Closing it closes the upload.
+    """
+
+    def __init__(self, upload, kind: str, extractor: Optional[TextExtractor] = None):
+        self.upload = upload
+        self.kind = kind
+        self.extractor = extractor or text_extractor
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        path = await self.upload.materialize()
+        async for text in self.extractor.extract(path, self.kind):
+            yield text
+
+    def close(self) -> None:
+        self.upload.close()
+
+
+# Global extractor; worker processes start on first use
+text_extractor = TextExtractor()
@@ -0,0 +1,119 @@
+"""
+Text normalization for CBO Banking App PoC
+Arabic/English folding and tokenization shared by caching and matching code
+"""
+
+import re
+from typing import FrozenSet, List
+
+# Harakat, superscript alef and Quranic annotation marks
+ARABIC_DIACRITICS = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED]")
+ARABIC_TATWEEL = "\u0640"
+
+ARABIC_LETTER_FOLDING = {
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "ٱ": "ا",
+    "ى": "ي",
+    "ئ": "ي",
+    "ؤ": "و",
+    "ة": "ه",
+    # Arabic-Indic and Persian digits
+    "٠": "0", "١": "1", "٢": "2", "٣": "3", "٤": "4",
+    "٥": "5", "٦": "6", "٧": "7", "٨": "8", "٩": "9",
+    "۰": "0", "۱": "1", "۲": "2", "۳": "3", "۴": "4",
+    "۵": "5", "۶": "6", "۷": "7", "۸": "8", "۹": "9",
+}
+# str.translate looks up every character in Python; the regex only calls back on foldable ones
+ARABIC_FOLDABLE = re.compile("[" + "".join(ARABIC_LETTER_FOLDING) + "]")
+
+# Runs of letters/digits; anything else (including Arabic punctuation such as ، ؛ ؟) separates words
+WORD = re.compile(r"[^\W_]+")
+
+# Longest prefixes first: conjunction/preposition + definite article, then the article alone
+ARABIC_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+
+ENGLISH_STOPWORDS = frozenset("""
+a an the is are was were be been being am do does did doing have has had having
+i me my we our you your he she it its they them their this that these those
+what which who whom whose when where why how
+of in on at to for from by with about as into over under than then
+and or but if so not no nor can could would should will shall may might must
+please tell know want need any some there here just also
+""".split())
+
+# Stored in folded form (see fold_arabic)
+ARABIC_STOPWORDS = frozenset("""
+في من الي علي عن مع هل ما ماذا لماذا كيف متي اين اي
+هو هي هم هن انا نحن انت انتم هذا هذه ذلك تلك الذي التي الذين
+و او ثم ان كان كانت لا لم لن قد كل بعض عند غير
+يا ايها لو اذا حتي منذ بين
+""".split())
+
+STOPWORDS = ENGLISH_STOPWORDS | ARABIC_STOPWORDS
+
+# Stopwords that flip or redirect a question ("not", "when" vs "why", "can" vs "must"). Retrieval
+# can ignore them; anything deciding whether two questions are the same question must not.
+# "t" is the tail of a split contraction (don't -> don t); Arabic entries are in folded form
+NEGATION_WORDS = frozenset("not no nor never cannot t لا لم لن ليس غير".split())
+QUESTION_WORDS = frozenset("what which who whom whose when where why how هل ما ماذا لماذا كيف متي اين اي".split())
+MODAL_WORDS = frozenset("can could would should will shall may might must".split())
+MEANING_WORDS = NEGATION_WORDS | QUESTION_WORDS | MODAL_WORDS
+
+
+def fold_arabic(text: str) -> str:
+    """Strip diacritics/tatweel and fold alef, yaa, taa marbuta and digit variants"""
+    if text.isascii():
+        return text
+    text = ARABIC_DIACRITICS.sub("", text)
+    text = text.replace(ARABIC_TATWEEL, "")
+    return ARABIC_FOLDABLE.sub(lambda match: ARABIC_LETTER_FOLDING[match.group()], text)
+
+
+def words(text: str) -> List[str]:
+    """Case-folded, Arabic-folded words with punctuation dropped"""
+    return WORD.findall(fold_arabic(text.casefold()))
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold, fold Arabic variants and replace punctuation with single spaces"""
+    return " ".join(words(text))
+
+
+def strip_arabic_prefix(token: str) -> str:
+    """Light stemming: drop a leading definite article (with conjunction/preposition)"""
+    for prefix in ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 3:
+            return token[len(prefix):]
+    return token
+
+
+def strip_english_suffix(token: str) -> str:
+    """Light stemming: fold common inflections (banks, opening, opened, policies) onto one form"""
+    if not token.isascii() or not token.isalpha():
+        return token
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith("ed"):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(
+    text: str,
+    drop_stopwords: bool = False,
+    stem: bool = False,
+    keep: FrozenSet[str] = frozenset()
+) -> List[str]:
+    """Split normalized text into tokens; stopwords listed in `keep` survive drop_stopwords"""
+    tokens = words(text)
+    if drop_stopwords:
+        tokens = [token for token in tokens if token not in STOPWORDS or token in keep]
+    if stem:
+        tokens = [strip_arabic_prefix(token) for token in tokens]
+    return tokens
@@ -0,0 +1,96 @@
+"""
+Verified JWT cache for CBO Banking App PoC
+Skips signature verification for tokens already verified, with revocation for logout and disabled users
+"""
+
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional
+
+from ttl_cache import TTLCache
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+# Upper bound on how long a verified token is trusted without re-verifying (tokens live 24h)
+TOKEN_CACHE_MAX_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_MAX_TTL_SECONDS", "3600"))
+# Revocations are sized separately so disabling the cache never disables logout
+TOKEN_REVOCATION_MAX_ENTRIES = int(os.getenv("TOKEN_REVOCATION_MAX_ENTRIES", "100000"))
+# Revocations are remembered until the longest-lived token issued before them has expired
+TOKEN_MAX_LIFETIME_SECONDS = float(os.getenv("TOKEN_MAX_LIFETIME_SECONDS", str(24 * 3600)))
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+class VerifiedTokenCache:
+    """
+    Claims of verified tokens keyed by token digest, each expiring at the token's exp.
+
+    Revocation is per process: revoke_token denylists one token until it expires and
+    revoke_user rejects every token of a user issued before the revocation.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = TOKEN_CACHE_MAX_ENTRIES,
+        max_ttl_seconds: float = TOKEN_CACHE_MAX_TTL_SECONDS,
+        max_revocations: int = TOKEN_REVOCATION_MAX_ENTRIES,
+        max_token_lifetime: float = TOKEN_MAX_LIFETIME_SECONDS,
+        clock=time.time
+    ):
+        self._clock = clock
+        self._verified = TTLCache(max_entries, max_ttl_seconds)
+        self._denied = TTLCache(max_revocations, max_token_lifetime)
+        # username -> wall-clock time before which the user's tokens are rejected
+        self._not_before = TTLCache(max_revocations, max_token_lifetime)
+
+    def _ttl(self, claims: Dict[str, Any]) -> float:
+        exp = claims.get("exp")
+        if exp is None:
+            return self._verified.ttl_seconds
+        return min(float(exp) - self._clock(), self._verified.ttl_seconds)
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a previously verified, unrevoked and unexpired token"""
+        claims = self._verified.get(token_digest(token))
+        if claims is None or self._issued_before_revocation(claims):
+            return None
+        return claims
+
+    def add(self, token: str, claims: Dict[str, Any]) -> None:
+        ttl = self._ttl(claims)
+        if ttl > 0:
+            self._verified.set(token_digest(token), claims, ttl=ttl)
+
+    def _issued_before_revocation(self, claims: Dict[str, Any]) -> bool:
+        if not len(self._not_before):
+            return False
+        not_before = self._not_before.get(claims.get("sub"))
+        return not_before is not None and float(claims.get("iat", 0)) < not_before
+
+    def is_revoked(self, token: str, claims: Dict[str, Any]) -> bool:
+        return token_digest(token) in self._denied or self._issued_before_revocation(claims)
+
+    def revoke_token(self, token: str, claims: Dict[str, Any]) -> None:
+        """Reject this token from now on (logout)"""
+        digest = token_digest(token)
+        self._verified.pop(digest)
+        ttl = float(claims["exp"]) - self._clock() if claims.get("exp") is not None else None
+        if ttl is None or ttl > 0:
+            self._denied.set(digest, True, ttl=ttl)
+
+    def revoke_user(self, username: str) -> None:
+        """Reject every token issued to the user so far (user disabled or role changed)"""
+        # iat has one-second resolution; include tokens issued within the current second
+        self._not_before.set(username, float(int(self._clock()) + 1))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._verified.stats()
+        stats["revoked_tokens"] = len(self._denied)
+        stats["revoked_users"] = len(self._not_before)
+        return stats
+
+
+# Global verified-token cache instance
+verified_tokens = VerifiedTokenCache()
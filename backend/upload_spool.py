@@ -0,0 +1,256 @@
+"""
+Streaming multipart uploads for CBO Banking App PoC
+The request body is parsed as it arrives and the file part is spooled to a temp file in fixed-size chunks
+"""
+
+import asyncio
+import codecs
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator, Dict, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+from structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+# Files up to this size stay in memory; larger ones roll over to disk
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+# Form fields other than the file are small; anything larger is rejected
+UPLOAD_MAX_FIELD_BYTES = 4096
+
+
+class UploadError(Exception):
+    """Rejected upload; status_code is the HTTP status to answer with"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class SpooledUpload:
+    """
+    An uploaded file held in a SpooledTemporaryFile, with its size and SHA-256.
+    Iterating it asynchronously yields the decoded text in chunk_size pieces.
+    """
+
+    def __init__(self, chunk_size: int = UPLOAD_CHUNK_BYTES, spool_memory: int = UPLOAD_SPOOL_MEMORY_BYTES):
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_memory)
+        self.chunk_size = chunk_size
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.is_utf8 = True
+        self.head = b""
+        self.path: Optional[str] = None
+
+    def write(self, data: bytes) -> None:
+        if len(self.head) < 8:
+            self.head += data[:8 - len(self.head)]
+        self.size += len(data)
+        self._hash.update(data)
+        if self.is_utf8:
+            try:
+                self._utf8.decode(data)
+            except UnicodeDecodeError:
+                self.is_utf8 = False
+        self.file.write(data)
+
+    def finish(self) -> None:
+        if self.is_utf8:
+            try:
+                self._utf8.decode(b"", final=True)
+            except UnicodeDecodeError:
+                self.is_utf8 = False
+        self.file.seek(0)
+
+    @property
+    def content_hash(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def on_disk(self) -> bool:
+        return getattr(self.file, "_rolled", False)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        self.file.seek(0)
+        while True:
+            data = await asyncio.to_thread(self.file.read, self.chunk_size) if self.on_disk else self.file.read(self.chunk_size)
+            if not data:
+                break
+            text = decoder.decode(data)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    async def materialize(self) -> str:
+        """Copy the upload to a named temp file (for parsers in other processes) and return its path"""
+        if self.path is None:
+            suffix = os.path.splitext(self.filename or "")[1]
+            self.path = await asyncio.to_thread(self._copy_to_named_file, suffix)
+        return self.path
+
+    def _copy_to_named_file(self, suffix: str) -> str:
+        self.file.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as named:
+            try:
+                shutil.copyfileobj(self.file, named, self.chunk_size)
+            except BaseException:
+                os.unlink(named.name)
+                raise
+        return named.name
+
+    def close(self) -> None:
+        self.file.close()
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+async def receive_upload(
+    request,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_BYTES,
+    file_field: str = "file"
+):
+    """
+    Parse a multipart/form-data request as it streams in. Returns (SpooledUpload, form fields);
+    raises UploadError for a malformed body, a missing file or a body over max_bytes.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise UploadError(415, "Expected multipart/form-data")
+
+    # Refuse oversized uploads before reading anything when the client declares the size
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + 64 * 1024:
+        raise UploadError(413, f"Upload exceeds {max_bytes} bytes")
+
+    upload = SpooledUpload(chunk_size=chunk_size)
+    fields: Dict[str, str] = {}
+    part: Dict[str, object] = {}
+    header = {"field": b"", "value": b""}
+    errors = []
+    # File data parsed from the current slice, written after the (synchronous) parser returns
+    file_data = []
+    received = {"file": 0}
+
+    def on_part_begin():
+        part.clear()
+        part["headers"] = {}
+
+    def on_header_field(data, start, end):
+        header["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        header["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][header["field"].lower()] = header["value"]
+        header["field"] = header["value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        name = disposition.get(b"name", b"").decode("utf-8", "replace")
+        part["name"] = name
+        part["is_file"] = name == file_field and b"filename" in disposition
+        if part["is_file"]:
+            if upload.filename is not None:
+                errors.append(UploadError(400, "Only one file per upload"))
+                return
+            upload.filename = os.path.basename(disposition[b"filename"].decode("utf-8", "replace")) or "upload"
+            upload.content_type = part["headers"].get(b"content-type", b"application/octet-stream").decode("latin-1")
+        else:
+            part["value"] = b""
+
+    def on_part_data(data, start, end):
+        if errors:
+            return
+        if part.get("is_file"):
+            received["file"] += end - start
+            if received["file"] > max_bytes:
+                errors.append(UploadError(413, f"Upload exceeds {max_bytes} bytes"))
+                return
+            file_data.append(data[start:end])
+        else:
+            part["value"] += data[start:end]
+            if len(part["value"]) > UPLOAD_MAX_FIELD_BYTES:
+                errors.append(UploadError(413, f"Form field {part['name']} is too large"))
+
+    def on_part_end():
+        if not part.get("is_file") and "value" in part:
+            fields[part["name"]] = part["value"].decode("utf-8", "replace")
+
+    parser = MultipartParser(options[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished
+    })
+
+    async def flush_file_data():
+        for data in file_data:
+            if upload.on_disk:
+                await asyncio.to_thread(upload.write, data)
+            else:
+                upload.write(data)
+        file_data.clear()
+
+    try:
+        async for block in request.stream():
+            # Feed in chunk_size slices so a large network read never becomes one large write
+            for offset in range(0, len(block), chunk_size):
+                parser.write(block[offset:offset + chunk_size])
+                if errors:
+                    raise errors[0]
+                await flush_file_data()
+        parser.finalize()
+        await flush_file_data()
+        if errors:
+            raise errors[0]
+        if upload.filename is None:
+            raise UploadError(400, f"Missing file field '{file_field}'")
+    except UploadError:
+        upload.close()
+        raise
+    except Exception as e:
+        upload.close()
+        logger.error(f"Error parsing multipart upload: {str(e)}")
+        raise UploadError(400, "Malformed multipart body")
+
+    upload.finish()
+    return upload, fields
+
+
+async def receive_body(request, max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+    """
+    Read a whole (non-multipart) request body, e.g. a JSON document batch, refusing it with
+    UploadError(413) as soon as the declared or received size goes over max_bytes.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise UploadError(413, f"Body exceeds {max_bytes} bytes")
+
+    body = bytearray()
+    async for block in request.stream():
+        body += block
+        if len(body) > max_bytes:
+            raise UploadError(413, f"Body exceeds {max_bytes} bytes")
+    return bytes(body)
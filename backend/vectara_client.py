@@ -3,14 +3,75 @@ Vectara API Client for CBO Banking App PoC
 Handles document ingestion and RAG queries
 """
 
+import asyncio
 import httpx
 import json
-import logging
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Any, Union
 from datetime import datetime
 import os
+import uuid
+from ttl_cache import TTLCache
+from near_duplicate_cache import NearDuplicateCache
+from singleflight import SingleFlight
+from chunking import StreamingChunker, iter_slices
+from structured_logging import get_logger, Payload
+from metrics import track_vectara
+from request_timing import span
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+
+# API endpoint; point it at benchmarks/fake_vectara.py to exercise the HTTP path locally
+VECTARA_BASE_URL = os.getenv("VECTARA_BASE_URL", "https://api.vectara.io").rstrip("/")
+
+# Connection pool / timeout configuration for the shared HTTP client
+VECTARA_MAX_CONNECTIONS = int(os.getenv("VECTARA_MAX_CONNECTIONS", "100"))
+VECTARA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("VECTARA_MAX_KEEPALIVE_CONNECTIONS", "20"))
+VECTARA_KEEPALIVE_EXPIRY = float(os.getenv("VECTARA_KEEPALIVE_EXPIRY", "30"))
+VECTARA_HTTP2 = os.getenv("VECTARA_HTTP2", "false").lower() in ("1", "true", "yes")
+VECTARA_CONNECT_TIMEOUT = float(os.getenv("VECTARA_CONNECT_TIMEOUT", "5"))
+VECTARA_READ_TIMEOUT = float(os.getenv("VECTARA_READ_TIMEOUT", "30"))
+VECTARA_WRITE_TIMEOUT = float(os.getenv("VECTARA_WRITE_TIMEOUT", "30"))
+VECTARA_POOL_TIMEOUT = float(os.getenv("VECTARA_POOL_TIMEOUT", "5"))
+
+# Answer cache in front of create_chat/query (set either value to 0 to disable)
+VECTARA_CACHE_TTL_SECONDS = float(os.getenv("VECTARA_CACHE_TTL_SECONDS", "600"))
+VECTARA_CACHE_MAX_ENTRIES = int(os.getenv("VECTARA_CACHE_MAX_ENTRIES", "1000"))
+# Max SimHash Hamming distance for reusing an answer to a rephrased question (-1 disables)
+VECTARA_NEAR_DUP_MAX_DISTANCE = int(os.getenv("VECTARA_NEAR_DUP_MAX_DISTANCE", "3"))
+
+# Upper bounds for one /v1/index request; larger documents are uploaded as several part documents
+VECTARA_INGEST_BATCH_BYTES = int(os.getenv("VECTARA_INGEST_BATCH_BYTES", str(1024 * 1024)))
+VECTARA_INGEST_BATCH_SECTIONS = int(os.getenv("VECTARA_INGEST_BATCH_SECTIONS", "200"))
+
+# Chat ids handed out for cached answers; no upstream chat exists for them
+CACHED_CHAT_PREFIX = "cached_"
+
+# httpx/httpcore releases whose private pool attributes _pool_usage() was written against
+POOL_INTROSPECTION_VERSIONS = {"httpx": ("0.25.", "0.26.", "0.27."), "httpcore": ("1.0.",)}
+
+
+def _pool_usage(client: httpx.AsyncClient) -> Optional[Dict[str, int]]:
+    """
+    Connection and queue counts of the httpcore pool behind an httpx client.
+    httpx has no public pool API, so this reads private attributes; on any other
+    httpx/httpcore version it returns None rather than guessing.
+    """
+    try:
+        import httpcore
+    except ImportError:
+        return None
+    if not (httpx.__version__.startswith(POOL_INTROSPECTION_VERSIONS["httpx"])
+            and httpcore.__version__.startswith(POOL_INTROSPECTION_VERSIONS["httpcore"])):
+        return None
+    try:
+        pool = client._transport._pool
+        connections = list(pool.connections)
+        queued = sum(1 for request in pool._requests if request.is_queued())
+        idle = sum(1 for conn in connections if conn.is_idle())
+        active = sum(1 for conn in connections if not conn.is_idle() and not conn.is_closed())
+    except AttributeError:
+        return None
+    return {"connections": len(connections), "active": active, "idle": idle, "queued_requests": queued}
 
 class VectaraClient:
     """Client for interacting with Vectara API"""
@@ -19,7 +80,7 @@ class VectaraClient:
         self.customer_id = os.getenv("VECTARA_CUSTOMER_ID")
         self.corpus_id = os.getenv("VECTARA_CORPUS_ID") 
         self.api_key = os.getenv("VECTARA_API_KEY")
-        self.base_url = "https://api.vectara.io"
+        self.base_url = VECTARA_BASE_URL
         
         if not all([self.customer_id, self.corpus_id, self.api_key]):
             logger.warning("Vectara credentials not fully configured. Running in mock mode.")
@@ -35,52 +96,269 @@ class VectaraClient:
             "customer-id": self.customer_id or "",
             "x-api-key": self.api_key or ""
         }
+
+        # Shared keep-alive client, opened/closed through the FastAPI lifespan
+        self._client: Optional[httpx.AsyncClient] = None
+        # Whether the open client actually negotiates HTTP/2 (False when h2 is missing)
+        self.http2 = False
+
+        self.response_cache = TTLCache(VECTARA_CACHE_MAX_ENTRIES, VECTARA_CACHE_TTL_SECONDS)
+        self.near_duplicate_cache = NearDuplicateCache(
+            max_distance=VECTARA_NEAR_DUP_MAX_DISTANCE,
+            max_entries=VECTARA_CACHE_MAX_ENTRIES,
+            ttl_seconds=VECTARA_CACHE_TTL_SECONDS
+        )
+        # Identical concurrent requests share one upstream call
+        self.in_flight = SingleFlight()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client used for all Vectara calls"""
+        http2 = VECTARA_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("VECTARA_HTTP2 is enabled but the 'h2' package is not installed. Falling back to HTTP/1.1.")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=VECTARA_MAX_CONNECTIONS,
+            max_keepalive_connections=VECTARA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=VECTARA_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            connect=VECTARA_CONNECT_TIMEOUT,
+            read=VECTARA_READ_TIMEOUT,
+            write=VECTARA_WRITE_TIMEOUT,
+            pool=VECTARA_POOL_TIMEOUT
+        )
+        logger.info(f"Opening Vectara HTTP client (http2={http2}, max_connections={limits.max_connections}, max_keepalive={limits.max_keepalive_connections})")
+        self.http2 = http2
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+    async def start(self) -> None:
+        """Open the shared HTTP client"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and release pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Vectara HTTP client closed")
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, opening it lazily when used outside the app lifespan"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Snapshot of the connection pool, used to watch for saturation"""
+        stats = {
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "max_connections": VECTARA_MAX_CONNECTIONS,
+            "max_keepalive_connections": VECTARA_MAX_KEEPALIVE_CONNECTIONS,
+            "connections": 0,
+            "active": 0,
+            "idle": 0,
+            "queued_requests": 0
+        }
+        if not stats["open"]:
+            return stats
+
+        usage = _pool_usage(self._client)
+        if usage is None:
+            # Pool internals unknown for this httpx/httpcore version; report configuration only
+            for key in ("connections", "active", "idle", "queued_requests"):
+                stats[key] = None
+        else:
+            stats.update(usage)
+        return stats
+
+    async def _post(self, method: str, url: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST to Vectara on the shared client, recording latency and status under `method`"""
+        with span(f"vectara.{method}"), track_vectara(method) as call:
+            response = await self._get_client().post(url, json=payload, headers=self.headers)
+            call["status"] = str(response.status_code)
+            response.raise_for_status()
+            return response
+
+    def _cache_key(self, kind: str, query_text: str, language: str, metadata_filter: Optional[str], *extra: Any) -> tuple:
+        """Cache key: corpus, call kind, normalized query text, language and metadata filter"""
+        normalized_query = " ".join(query_text.casefold().split())
+        return (self.corpus_id, kind, normalized_query, language, metadata_filter or "") + extra
+
+    def _share_chat_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a cached chat response under a fresh chat id so sessions are never shared between users"""
+        if "id" not in result:
+            return result
+        return {**result, "id": f"{CACHED_CHAT_PREFIX}{uuid.uuid4().hex}"}
+
+    def invalidate_corpus_cache(self) -> int:
+        """Drop cached answers for this corpus (its content changed)"""
+        removed = self.response_cache.invalidate(lambda key: key[0] == self.corpus_id)
+        removed += self.near_duplicate_cache.invalidate(lambda scope: scope[0] == self.corpus_id)
+        if removed:
+            logger.info(f"Invalidated {removed} cached Vectara responses for corpus {self.corpus_id}")
+        return removed
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {
+            "exact": self.response_cache.stats(),
+            "near_duplicate": self.near_duplicate_cache.stats(),
+            "single_flight": self.in_flight.stats()
+        }
     
     async def ingest_document(
         self, 
         document_id: str,
         title: str,
-        content: str,
+        content: Union[str, Iterable[str], AsyncIterable[str]],
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Ingest a document into Vectara corpus
+        Ingest a document into Vectara corpus.
+        Content (a string or an iterable of text pieces) is streamed through the chunker into
+        sections; documents larger than one upload batch are indexed as numbered part documents.
+        The result lists the Vectara ids written ("parts"); callers record them so the document can be
+        deleted later. If any upload fails, the parts already written are deleted before the error is raised.
         """
         if self.mock_mode:
             return self._mock_ingest_response(document_id, title)
         
-        try:
-            url = f"{self.base_url}/v1/index"
-            
+        url = f"{self.base_url}/v1/index"
+        ingested_at = datetime.utcnow().isoformat()
+        parts: List[str] = []
+        responses: List[Dict[str, Any]] = []
+        batch: List[Dict[str, Any]] = []
+        batch_bytes = 0
+        section_count = 0
+        total_bytes = 0
+
+        async def upload(sections: List[Dict[str, Any]], part: Optional[int]) -> None:
+            doc_metadata = dict(metadata or {})
+            part_id = document_id
+            if part is not None:
+                part_id = f"{document_id}__part{part}"
+                doc_metadata.update({"parent_document_id": document_id, "part": part})
             payload = {
                 "customer_id": self.customer_id,
                 "corpus_id": self.corpus_id,
                 "document": {
-                    "document_id": document_id,
+                    "document_id": part_id,
                     "title": title,
-                    "metadata_json": json.dumps(metadata or {}),
-                    "section": [
-                        {
-                            "text": content,
-                            "metadata_json": json.dumps({
-                                "source": "cbo_document",
-                                "ingested_at": datetime.utcnow().isoformat()
-                            })
-                        }
-                    ]
+                    "metadata_json": json.dumps(doc_metadata),
+                    "section": sections
+                }
+            }
+            # Recorded before the call: a part whose upload timed out may still have been indexed
+            parts.append(part_id)
+            response = await self._post("ingest_document", url, payload)
+            responses.append(response.json())
+
+        try:
+            async for chunk in self._chunks(content):
+                section = {
+                    "text": chunk["text"],
+                    "metadata_json": json.dumps({
+                        "source": "cbo_document",
+                        "ingested_at": ingested_at,
+                        "chunk": chunk["index"],
+                        "start_offset": chunk["start"],
+                        "end_offset": chunk["end"],
+                        "heading": chunk["heading"]
+                    })
                 }
+                if chunk["heading"]:
+                    section["title"] = chunk["heading"]
+                size = len(json.dumps(section).encode("utf-8"))
+
+                if batch and (batch_bytes + size > VECTARA_INGEST_BATCH_BYTES
+                              or len(batch) >= VECTARA_INGEST_BATCH_SECTIONS):
+                    # Only one batch is held in memory; once a second is needed the document goes out in parts
+                    await upload(batch, len(parts))
+                    batch, batch_bytes = [], 0
+                batch.append(section)
+                batch_bytes += size
+                section_count += 1
+                total_bytes += size
+
+            if batch or not parts:
+                await upload(batch, len(parts) if parts else None)
+
+            logger.info(
+                f"Document {document_id} ingested successfully: {section_count} sections "
+                f"in {len(parts)} upload(s), {total_bytes} bytes"
+            )
+            return {
+                "status": "success",
+                "document_id": document_id,
+                "parts": parts,
+                "sections": section_count,
+                "bytes": total_bytes,
+                "responses": responses
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=self.headers)
-                response.raise_for_status()
-                
-                logger.info(f"Document {document_id} ingested successfully")
-                return response.json()
-                
-        except Exception as e:
-            logger.error(f"Error ingesting document {document_id}: {str(e)}")
+        except (Exception, asyncio.CancelledError) as e:
+            if parts:
+                # Don't leave half a document searchable; a retry or re-upload starts from scratch
+                logger.error(f"Error ingesting document {document_id} after uploading parts {parts}, removing them: {str(e)}")
+                leftover = await self.delete_documents(parts)
+                if leftover:
+                    logger.error(f"Parts {leftover} of failed document {document_id} are still indexed")
+            else:
+                logger.error(f"Error ingesting document {document_id}: {str(e)}")
             raise
+        finally:
+            if parts:
+                self.invalidate_corpus_cache()
+
+    async def delete_document(self, document_id: str) -> None:
+        """Delete one document (or one part of a split document) from the corpus"""
+        if self.mock_mode:
+            return
+        url = f"{self.base_url}/v1/delete-doc"
+        payload = {
+            "customer_id": self.customer_id,
+            "corpus_id": self.corpus_id,
+            "document_id": document_id
+        }
+        await self._post("delete_document", url, payload)
+
+    async def delete_documents(self, document_ids: Iterable[str]) -> List[str]:
+        """Delete several documents, e.g. the parts recorded for an upload; returns the ids that could not be deleted"""
+        failed = []
+        deleted = 0
+        for document_id in document_ids:
+            try:
+                await self.delete_document(document_id)
+                deleted += 1
+            except Exception as e:
+                logger.error(f"Error deleting document {document_id} from Vectara: {str(e)}")
+                failed.append(document_id)
+        if deleted:
+            self.invalidate_corpus_cache()
+        return failed
+
+    @staticmethod
+    async def _chunks(content: Union[str, Iterable[str], AsyncIterable[str]]) -> AsyncIterator[Dict[str, Any]]:
+        """Run sync or async content through the streaming chunker"""
+        chunker = StreamingChunker()
+        if isinstance(content, str):
+            content = iter_slices(content)
+        if hasattr(content, "__aiter__"):
+            async for piece in content:
+                for chunk in chunker.feed(piece):
+                    yield chunk
+        else:
+            for piece in content:
+                for chunk in chunker.feed(piece):
+                    yield chunk
+        for chunk in chunker.close():
+            yield chunk
     
     async def query(
         self,
@@ -95,6 +373,12 @@ class VectaraClient:
         if self.mock_mode:
             return self._mock_query_response(query_text, language)
         
+        cache_key = self._cache_key("query", query_text, language, metadata_filter, num_results)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Query served from cache: {query_text[:50]}...")
+            return cached
+        
         try:
             url = f"{self.base_url}/v1/query"
             
@@ -114,31 +398,33 @@ class VectaraClient:
                 ]
             }
             
-            async with httpx.AsyncClient() as client:
-                logger.info(f"Making Vectara API call to: {url}")
-                logger.info(f"Customer ID: {self.customer_id} (type: {type(self.customer_id)})")
-                logger.info(f"Corpus ID: {self.corpus_id} (type: {type(self.corpus_id)})")
-                logger.info(f"Payload: {json.dumps(payload, indent=2)}")
-                
+            client = self._get_client()
+            logger.debug("Vectara query request", url=url, corpus_id=self.corpus_id, payload=Payload(payload))
+            
+            with span("vectara.query"), track_vectara("query") as call:
                 response = await client.post(url, json=payload, headers=self.headers)
-                
-                logger.info(f"Vectara API response status: {response.status_code}")
-                
-                if response.status_code != 200:
-                    logger.error(f"Vectara API error: {response.status_code} - {response.text}")
-                    response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Vectara API response: {json.dumps(result, indent=2)}")
-                
-                # Check if we got actual search results
-                if result.get("responseSet") and result["responseSet"][0].get("response"):
-                    logger.info(f"Found {len(result['responseSet'][0]['response'])} search results")
-                else:
-                    logger.warning("No search results returned from Vectara")
-                
-                return result
-                
+                call["status"] = str(response.status_code)
+            
+            if response.status_code != 200:
+                logger.error(f"Vectara API error: {response.status_code} - {response.text}")
+                response.raise_for_status()
+            
+            result = response.json()
+            
+            # Check if we got actual search results
+            if result.get("responseSet") and result["responseSet"][0].get("response"):
+                logger.info(
+                    "Vectara query response",
+                    status=response.status_code,
+                    results=len(result["responseSet"][0]["response"]),
+                    payload=Payload(result)
+                )
+            else:
+                logger.warning("No search results returned from Vectara", status=response.status_code, payload=Payload(result))
+            
+            self.response_cache.set(cache_key, result)
+            return result
+            
         except Exception as e:
             logger.error(f"Error executing query: {str(e)}")
             raise
@@ -156,6 +442,39 @@ class VectaraClient:
         if self.mock_mode:
             return self._mock_chat_response(query_text, language)
         
+        cache_key = self._cache_key("chat", query_text, language, metadata_filter, max_summarized_results)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Chat answer served from cache for: {query_text[:50]}...")
+            return self._share_chat_response(cached)
+        
+        near_duplicate_scope = (self.corpus_id, language, metadata_filter or "", max_summarized_results)
+        cached = self.near_duplicate_cache.get(near_duplicate_scope, query_text)
+        if cached is not None:
+            logger.info(f"Chat answer served from near-duplicate cache for: {query_text[:50]}...")
+            self.response_cache.set(cache_key, cached)
+            return self._share_chat_response(cached)
+        
+        async def create_and_cache() -> Dict[str, Any]:
+            result = await self._create_chat_upstream(query_text, language, max_summarized_results, metadata_filter)
+            self.response_cache.set(cache_key, result)
+            self.near_duplicate_cache.set(near_duplicate_scope, query_text, result)
+            return result
+        
+        result, shared = await self.in_flight.do(cache_key, create_and_cache)
+        if shared:
+            logger.info(f"Chat answer shared with an identical in-flight request for: {query_text[:50]}...")
+            return self._share_chat_response(result)
+        return result
+    
+    async def _create_chat_upstream(
+        self,
+        query_text: str,
+        language: str,
+        max_summarized_results: int,
+        metadata_filter: str
+    ) -> Dict[str, Any]:
+        """Call the v2 Chat API, falling back to the legacy query API on failure"""
         try:
             url = f"{self.base_url}/v2/chats"
             
@@ -178,14 +497,12 @@ class VectaraClient:
                 }
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=self.headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Chat created successfully for: {query_text[:50]}...")
-                return result
-                
+            response = await self._post("create_chat", url, payload)
+            
+            result = response.json()
+            logger.info(f"Chat created successfully for: {query_text[:50]}...")
+            return result
+            
         except Exception as e:
             logger.error(f"Error creating chat: {str(e)}")
             # Fallback to legacy query API
@@ -204,6 +521,10 @@ class VectaraClient:
         if self.mock_mode:
             return self._mock_chat_response(query_text, language)
         
+        if chat_id.startswith(CACHED_CHAT_PREFIX):
+            # The conversation started from a cached answer, so there is no upstream chat to continue
+            return await self.create_chat(query_text, language, max_summarized_results)
+        
         try:
             url = f"{self.base_url}/v2/chats/{chat_id}/turns"
             
@@ -216,19 +537,102 @@ class VectaraClient:
                 }
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=self.headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Chat turn added successfully for: {query_text[:50]}...")
-                return result
-                
+            response = await self._post("add_chat_turn", url, payload)
+            
+            result = response.json()
+            logger.info(f"Chat turn added successfully for: {query_text[:50]}...")
+            return result
+            
         except Exception as e:
             logger.error(f"Error adding chat turn: {str(e)}")
             # Fallback to creating new chat
             return await self.create_chat(query_text, language, max_summarized_results)
 
+    async def stream_chat(
+        self,
+        query_text: str,
+        language: str = "en",
+        max_summarized_results: int = 5,
+        metadata_filter: str = "",
+        chat_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a chat answer using Vectara's v2 streaming generation.
+        Starts a new chat, or adds a turn when chat_id is given, and yields events:
+        {"type": "chat_info", "chat_id"}, {"type": "chunk", "text"}, {"type": "search_results", "search_results"}
+        """
+        if self.mock_mode:
+            async for event in self._mock_chat_stream(query_text, language):
+                yield event
+            return
+        
+        if chat_id and chat_id.startswith(CACHED_CHAT_PREFIX):
+            # The conversation started from a cached answer, so there is no upstream chat to continue
+            chat_id = None
+        
+        generation = {
+            "max_used_search_results": max_summarized_results,
+            "response_language": language,
+            "prompt_name": "vectara-summary-ext-24-05-sml"
+        }
+        if chat_id:
+            url = f"{self.base_url}/v2/chats/{chat_id}/turns"
+            payload = {"query": query_text, "generation": generation, "stream_response": True}
+        else:
+            url = f"{self.base_url}/v2/chats"
+            payload = {
+                "query": query_text,
+                "search": {
+                    "corpora": [
+                        {
+                            "customer_id": int(self.customer_id),
+                            "corpus_id": int(self.corpus_id),
+                            "metadata_filter": metadata_filter or ""
+                        }
+                    ],
+                    "limit": 10
+                },
+                "generation": generation,
+                "stream_response": True
+            }
+        
+        headers = {**self.headers, "Accept": "text/event-stream"}
+        client = self._get_client()
+        try:
+            with span("vectara.stream_chat"), track_vectara("stream_chat") as call:
+                async with client.stream("POST", url, json=payload, headers=headers) as response:
+                    call["status"] = str(response.status_code)
+                    response.raise_for_status()
+                
+                    data_lines: List[str] = []
+                    async for line in response.aiter_lines():
+                        if line.startswith("data:"):
+                            data_lines.append(line[5:].strip())
+                            continue
+                        if line or not data_lines:
+                            continue
+                    
+                        # Blank line terminates the event
+                        event = json.loads("\n".join(data_lines))
+                        data_lines = []
+                        event_type = event.get("type")
+                        if event_type == "generation_chunk":
+                            yield {"type": "chunk", "text": event.get("generation_chunk", "")}
+                        elif event_type == "search_results":
+                            yield {"type": "search_results", "search_results": event.get("search_results", [])}
+                        elif event_type == "chat_info":
+                            yield {"type": "chat_info", "chat_id": event.get("chat_id")}
+                        elif event_type == "error":
+                            raise RuntimeError(f"Vectara stream error: {event.get('messages') or event}")
+                        elif event_type == "end":
+                            break
+            
+            logger.info(f"Chat stream completed for: {query_text[:50]}...")
+        
+        except Exception as e:
+            logger.error(f"Error streaming chat: {str(e)}")
+            raise
+    
     async def generate_summary_legacy(
         self,
         query_text: str,
@@ -242,6 +646,20 @@ class VectaraClient:
         if self.mock_mode:
             return self._mock_summary_response(query_text, language)
         
+        flight_key = self._cache_key("summary", query_text, language, metadata_filter, max_summarized_results)
+        result, _ = await self.in_flight.do(
+            flight_key,
+            lambda: self._generate_summary_upstream(query_text, language, max_summarized_results, metadata_filter)
+        )
+        return result
+    
+    async def _generate_summary_upstream(
+        self,
+        query_text: str,
+        language: str,
+        max_summarized_results: int,
+        metadata_filter: str
+    ) -> Dict[str, Any]:
         try:
             url = f"{self.base_url}/v1/query"
             
@@ -268,14 +686,12 @@ class VectaraClient:
                 ]
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=self.headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Summary generated successfully for: {query_text[:50]}...")
-                return result
-                
+            response = await self._post("generate_summary_legacy", url, payload)
+            
+            result = response.json()
+            logger.info(f"Summary generated successfully for: {query_text[:50]}...")
+            return result
+            
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
             raise
@@ -285,6 +701,7 @@ class VectaraClient:
         return {
             "status": "success",
             "document_id": document_id,
+            "parts": [document_id],
             "title": title,
             "message": "Document ingested successfully (mock mode)",
             "timestamp": datetime.utcnow().isoformat()
@@ -343,6 +760,15 @@ class VectaraClient:
             "created_at": datetime.utcnow().isoformat()
         }
 
+    async def _mock_chat_stream(self, query_text: str, language: str) -> AsyncIterator[Dict[str, Any]]:
+        """Mock streaming events for chat, one word per chunk"""
+        response = self._mock_chat_response(query_text, language)
+        yield {"type": "chat_info", "chat_id": response["id"]}
+        words = response["turns"][0]["answer"].split(" ")
+        for index, word in enumerate(words):
+            yield {"type": "chunk", "text": word if index == 0 else f" {word}"}
+        yield {"type": "search_results", "search_results": []}
+
     def _mock_summary_response(self, query_text: str, language: str) -> Dict[str, Any]:
         """Mock response for summary generation"""
         if self.mock_mode:
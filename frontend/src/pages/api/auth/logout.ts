@@ -0,0 +1,34 @@
+import type { NextApiRequest, NextApiResponse } from 'next'
+
+export default async function handler(
+  req: NextApiRequest,
+  res: NextApiResponse
+) {
+  if (req.method !== 'POST') {
+    res.setHeader('Allow', 'POST')
+    return res.status(405).json({ detail: 'Method not allowed' })
+  }
+
+  const backendUrl = process.env.BACKEND_URL || 'http://localhost:8000'
+
+  // Require auth token from client
+  const authHeader = req.headers.authorization
+  if (!authHeader?.startsWith('Bearer ')) {
+    return res.status(401).json({ detail: 'Authorization required' })
+  }
+
+  try {
+    const response = await fetch(`${backendUrl}/auth/logout`, {
+      method: 'POST',
+      headers: {
+        'Authorization': authHeader,
+      },
+    })
+
+    const data = await response.json().catch(() => ({}))
+    return res.status(response.status).json(data)
+  } catch (error) {
+    console.error('auth/logout API error:', error)
+    return res.status(500).json({ detail: 'Internal server error' })
+  }
+}
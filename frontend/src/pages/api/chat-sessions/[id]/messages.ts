@@ -0,0 +1,41 @@
+import type { NextApiRequest, NextApiResponse } from 'next'
+
+export default async function handler(
+  req: NextApiRequest,
+  res: NextApiResponse
+) {
+  const backendUrl = process.env.BACKEND_URL || 'http://localhost:8000'
+
+  // Require auth token from client
+  const authHeader = req.headers.authorization
+  if (!authHeader?.startsWith('Bearer ')) {
+    return res.status(401).json({ detail: 'Authorization required' })
+  }
+
+  const { id } = req.query
+  if (!id || typeof id !== 'string') {
+    return res.status(400).json({ detail: 'Invalid session id' })
+  }
+
+  try {
+    if (req.method === 'GET') {
+      // Forward pagination parameters (limit, cursor)
+      const queryIndex = req.url?.indexOf('?') ?? -1
+      const query = queryIndex >= 0 ? req.url!.slice(queryIndex) : ''
+      const response = await fetch(`${backendUrl}/chat-sessions/${encodeURIComponent(id)}/messages${query}`, {
+        headers: {
+          'Authorization': authHeader,
+        },
+      })
+
+      const data = await response.json().catch(() => ({}))
+      return res.status(response.status).json(data)
+    }
+
+    res.setHeader('Allow', 'GET')
+    return res.status(405).json({ detail: 'Method not allowed' })
+  } catch (error) {
+    console.error('chat-sessions/[id]/messages API error:', error)
+    return res.status(500).json({ detail: 'Internal server error' })
+  }
+}
@@ -14,7 +14,10 @@ export default async function handler(
 
   try {
     if (req.method === 'GET') {
-      const response = await fetch(`${backendUrl}/chat-sessions`, {
+      // Forward pagination parameters (limit, cursor)
+      const queryIndex = req.url?.indexOf('?') ?? -1
+      const query = queryIndex >= 0 ? req.url!.slice(queryIndex) : ''
+      const response = await fetch(`${backendUrl}/chat-sessions${query}`, {
         headers: {
           'Authorization': authHeader,
         },
@@ -56,6 +56,12 @@ export default async function handler(
       }),
     })
 
+    // Keep the backend timing breakdown visible in browser devtools
+    for (const header of ['server-timing', 'x-request-id']) {
+      const value = response.headers.get(header)
+      if (value) res.setHeader(header, value)
+    }
+
     if (!response.ok) {
       const errorData = await response.json()
       return res.status(response.status).json({ 
@@ -55,28 +55,21 @@ export default async function handler(
 
     const backendUrl = process.env.BACKEND_URL || 'http://localhost:8000'
 
-    // Read file content (prefer text; fallback to base64 for binaries)
-    let content: string
-    try {
-      content = fs.readFileSync(file.filepath, 'utf-8')
-    } catch (e) {
-      const buf = fs.readFileSync(file.filepath)
-      const b64 = (buf as Buffer).toString('base64')
-      content = `[binary:${file.mimetype || 'application/octet-stream'};base64]\n${b64}`
-    }
-
-    // 1) Upload the document to backend as JSON
-    const uploadResp = await fetch(`${backendUrl}/documents/upload`, {
+    // 1) Forward the file to the backend as multipart; PDF/DOCX text is extracted server-side
+    const upload = new FormData()
+    upload.append(
+      'file',
+      new Blob([fs.readFileSync(file.filepath)], { type: file.mimetype || 'application/octet-stream' }),
+      file.originalFilename || 'upload'
+    )
+    upload.append('classification', 'public')
+
+    const uploadResp = await fetch(`${backendUrl}/documents/upload-file`, {
       method: 'POST',
       headers: {
-        'Content-Type': 'application/json',
         'Authorization': authHeader,
       },
-      body: JSON.stringify({
-        filename: file.originalFilename || 'upload',
-        content,
-        classification: 'public',
-      }),
+      body: upload,
     })
 
     // Clean up temporary file
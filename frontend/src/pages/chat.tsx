@@ -79,6 +79,8 @@ export default function ChatPage() {
   const [copiedMessageId, setCopiedMessageId] = useState<string | null>(null)
   const [showFilters, setShowFilters] = useState(false)
   const [chatSessions, setChatSessions] = useState<ChatSession[]>([])
+  const [sessionsCursor, setSessionsCursor] = useState<string | null>(null)
+  const [isLoadingMoreSessions, setIsLoadingMoreSessions] = useState(false)
   const [currentSessionId, setCurrentSessionId] = useState<string | null>(null)
   const [showSummary, setShowSummary] = useState(false)
   const [summaryText, setSummaryText] = useState('')
@@ -91,6 +93,9 @@ export default function ChatPage() {
   const fileInputRef = useRef<HTMLInputElement>(null)
   const messagesEndRef = useRef<HTMLDivElement>(null)
   const inputRef = useRef<HTMLInputElement>(null)
+  // Session whose messages may be shown, and the message load in flight for it
+  const activeSessionRef = useRef<string | null>(null)
+  const messagesLoadRef = useRef<AbortController | null>(null)
   const router = useRouter()
 
   // Generate chat title from first user message
@@ -102,30 +107,44 @@ export default function ChatPage() {
     return firstMessage.substring(0, maxLength) + '...'
   }, [])
 
-  // Load chat sessions from database with localStorage fallback
+  // Fetch one page of chat sessions (messages are loaded when a session is opened); null on failure
+  const fetchChatSessionsPage = useCallback(async (cursor: string | null): Promise<{ sessions: ChatSession[], nextCursor: string | null } | null> => {
+    const token = localStorage.getItem('token')
+    if (!token) return null
+
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+    const response = await fetch(`/api/chat-sessions${query}`, {
+      headers: {
+        'Authorization': `Bearer ${token}`
+      }
+    })
+    if (!response.ok) return null
+
+    const data = await response.json()
+    return {
+      sessions: data.sessions.map((session: any) => ({
+        ...session,
+        createdAt: new Date(session.createdAt),
+        updatedAt: new Date(session.updatedAt),
+      })),
+      nextCursor: data.next_cursor ?? null
+    }
+  }, [])
+
+  // Load the first page of chat sessions from database with localStorage fallback
   const loadChatSessions = useCallback(async (): Promise<ChatSession[]> => {
     try {
       const token = localStorage.getItem('token')
       if (!token) return []
 
-      // Try to load from database first
-      const response = await fetch('/api/chat-sessions', {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      })
-
-      if (response.ok) {
-        const data = await response.json()
-        const dbSessions = data.sessions.map((session: any) => ({
-          ...session,
-          createdAt: new Date(session.createdAt),
-          updatedAt: new Date(session.updatedAt),
-        }))
+      // Try to load from database first; later pages are fetched on scroll / "load more"
+      const page = await fetchChatSessionsPage(null)
+      if (page) {
+        setSessionsCursor(page.nextCursor)
 
         // Save to localStorage as backup
-        localStorage.setItem('chat_sessions', JSON.stringify(dbSessions))
-        return dbSessions
+        localStorage.setItem('chat_sessions', JSON.stringify(page.sessions))
+        return page.sessions
       } else {
         // Fallback to localStorage if database fails
         console.warn('Database unavailable, using localStorage fallback')
@@ -136,8 +155,97 @@ export default function ChatPage() {
       // Fallback to localStorage
       return loadChatSessionsFromStorage()
     }
+  }, [fetchChatSessionsPage])
+
+  // Append the next page of chat sessions; sessions already shown are kept if it fails
+  const loadMoreChatSessions = useCallback(async () => {
+    if (!sessionsCursor || isLoadingMoreSessions) return
+
+    setIsLoadingMoreSessions(true)
+    try {
+      const page = await fetchChatSessionsPage(sessionsCursor)
+      if (!page) {
+        console.warn('Could not load more chat sessions')
+        return
+      }
+      setSessionsCursor(page.nextCursor)
+      setChatSessions(prev => {
+        const known = new Set(prev.map(s => s.id))
+        const updated = [...prev, ...page.sessions.filter(s => !known.has(s.id))]
+        saveChatSessions(updated)
+        return updated
+      })
+    } catch (e) {
+      console.error('Error loading more chat sessions:', e)
+    } finally {
+      setIsLoadingMoreSessions(false)
+    }
+  }, [sessionsCursor, isLoadingMoreSessions, fetchChatSessionsPage])
+
+  // Fetch the next sessions page when the history list is scrolled near its end
+  const handleSessionsScroll = (e: React.UIEvent<HTMLDivElement>) => {
+    const list = e.currentTarget
+    if (list.scrollHeight - list.scrollTop - list.clientHeight < 48) {
+      loadMoreChatSessions()
+    }
+  }
+
+  // Load all messages of a session from the database, page by page
+  const loadSessionMessages = useCallback(async (sessionId: string, signal?: AbortSignal): Promise<Message[] | null> => {
+    try {
+      const token = localStorage.getItem('token')
+      if (!token) return null
+
+      const loaded: Message[] = []
+      let cursor: string | null = null
+      do {
+        const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+        const response = await fetch(`/api/chat-sessions/${encodeURIComponent(sessionId)}/messages${query}`, {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          },
+          signal
+        })
+        if (!response.ok) return null
+        const data = await response.json()
+        loaded.push(...data.messages)
+        cursor = data.next_cursor ?? null
+      } while (cursor)
+
+      return loaded
+    } catch (e) {
+      if (!signal?.aborted) {
+        console.error('Error loading chat messages from database:', e)
+      }
+      return null
+    }
   }, [])
 
+  // Show a session's messages, fetching them from the database if not loaded yet
+  const openSessionMessages = useCallback(async (session: ChatSession) => {
+    // A newer selection supersedes any load still in flight
+    activeSessionRef.current = session.id
+    messagesLoadRef.current?.abort()
+    messagesLoadRef.current = null
+
+    setMessages(session.messages)
+    if (session.messages.length > 0) return
+
+    const controller = new AbortController()
+    messagesLoadRef.current = controller
+    const loaded = await loadSessionMessages(session.id, controller.signal)
+    if (messagesLoadRef.current === controller) {
+      messagesLoadRef.current = null
+    }
+    if (loaded && loaded.length > 0) {
+      setChatSessions(prev => prev.map(s => s.id === session.id ? { ...s, messages: loaded } : s))
+      // Only show them if the user is still on this session
+      if (activeSessionRef.current === session.id) {
+        setMessages(loaded)
+      }
+    }
+  }, [loadSessionMessages])
+
   // Fallback function to load from localStorage
   const loadChatSessionsFromStorage = (): ChatSession[] => {
     try {
@@ -401,7 +509,7 @@ export default function ChatPage() {
         const currentSession = sessions.find(s => s.id === storedCurrentSessionId)
         if (currentSession) {
           setCurrentSessionId(storedCurrentSessionId)
-          setMessages(currentSession.messages)
+          openSessionMessages(currentSession)
           setConversationId(storedCurrentSessionId)
         }
       } else {
@@ -416,7 +524,7 @@ export default function ChatPage() {
     }
 
     checkAuth()
-  }, [router, language, loadChatSessions, createNewChatSession])
+  }, [router, language, loadChatSessions, createNewChatSession, openSessionMessages])
 
   useEffect(() => {
     scrollToBottom()
@@ -439,6 +547,10 @@ export default function ChatPage() {
     }
   }, [messages, currentSessionId, updateCurrentSession])
 
+  useEffect(() => {
+    activeSessionRef.current = currentSessionId
+  }, [currentSessionId])
+
   useEffect(() => {
     if (conversationId) {
       localStorage.setItem('conversation_id', conversationId)
@@ -779,7 +891,9 @@ export default function ChatPage() {
     setChatSessions(updatedSessions)
     saveChatSessions(updatedSessions)
 
-    // Switch to new session
+    // Switch to new session; a message load still running for the previous one must not land here
+    activeSessionRef.current = newSession.id
+    messagesLoadRef.current?.abort()
     setCurrentSessionId(newSession.id)
     setConversationId(newSession.id)
     setMessages([])
@@ -797,7 +911,7 @@ export default function ChatPage() {
     if (session) {
       setCurrentSessionId(sessionId)
       setConversationId(sessionId)
-      setMessages(session.messages)
+      openSessionMessages(session)
       setSelectedFilters([])
       setSelectedFile(null)
       setInputValue('')
@@ -828,7 +942,7 @@ export default function ChatPage() {
           const next = [...remaining].sort((a, b) => new Date(b.updatedAt).getTime() - new Date(a.updatedAt).getTime())[0]
           setCurrentSessionId(next.id)
           setConversationId(next.id)
-          setMessages(next.messages)
+          openSessionMessages(next)
           localStorage.setItem('current_session_id', next.id)
           localStorage.setItem('conversation_id', next.id)
         } else {
@@ -960,7 +1074,7 @@ export default function ChatPage() {
         </div>
 
         {/* Chat History List */}
-        <div className="absolute left-[22px] top-[219.53px] bottom-[24px] w-[264px] overflow-y-auto scrollbar-cbo pr-1">
+        <div className="absolute left-[22px] top-[219.53px] bottom-[24px] w-[264px] overflow-y-auto scrollbar-cbo pr-1" onScroll={handleSessionsScroll}>
           {chatSessions.length === 0 ? (
             <div
               className="font-['Source_Sans_Pro:Regular',_sans-serif] leading-[0] not-italic opacity-60 text-[#17365f] text-[20px] text-nowrap"
@@ -1000,6 +1114,17 @@ export default function ChatPage() {
                     </button>
                   </div>
                 ))}
+              {sessionsCursor && (
+                <button
+                  onClick={loadMoreChatSessions}
+                  disabled={isLoadingMoreSessions}
+                  className="w-full text-center px-3 py-2 text-[#17365f] text-[16px] opacity-70 hover:opacity-100 disabled:opacity-40"
+                >
+                  {isLoadingMoreSessions
+                    ? (language === 'ar' ? 'جارٍ التحميل...' : 'Loading...')
+                    : (language === 'ar' ? 'عرض المزيد' : 'Load more')}
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -18,6 +18,15 @@ export const getUserInfo = () => {
 
 export const logout = () => {
   if (typeof window === 'undefined') return
+  const token = localStorage.getItem('token')
+  if (token) {
+    // Revoke the token server-side; keepalive lets the request finish after navigation
+    fetch('/api/auth/logout', {
+      method: 'POST',
+      headers: { 'Authorization': `Bearer ${token}` },
+      keepalive: true,
+    }).catch(() => {})
+  }
   localStorage.removeItem('token')
   localStorage.removeItem('user_info')
   window.location.href = '/login'